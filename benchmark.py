@@ -0,0 +1,808 @@
+"""
+Бенчмарки для DatabaseManager на синтетических данных.
+
+Usage: python benchmark.py <name> [options]
+"""
+
+import argparse
+import csv
+import math
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from database import (
+    ROLLUP_PERIODS,
+    TRACKERS,
+    DatabaseManager,
+    backup_database_to_zip,
+)
+from export import export_records
+from importer import import_records
+from incremental_backup import create_incremental_backup
+import reporting
+from reporting import period_report, period_report_columns, shift_report
+
+
+def day_to_int(day: date) -> int:
+    """Unix timestamp начала дня (как QDate.startOfDay().toSecsSinceEpoch())."""
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def build_synthetic_db(db_path: str, years: int, entries_per_day: int) -> tuple:
+    """Fills a fresh database with random entries, returns (first_day, last_day)."""
+    db = DatabaseManager(db_path)
+    for i in range(10):
+        db.add_project(f"Project {i}")
+    projects = db.get_all_projects_with_ids()
+    first_day = date.today() - timedelta(days=365 * years)
+    for tracker in TRACKERS:
+        db.add_billing_record(tracker, day_to_int(first_day), random.randint(500, 2000))
+
+    rng = random.Random(42)
+    rows = []
+    for offset in range(365 * years + 1):
+        date_int = day_to_int(first_day + timedelta(days=offset))
+        for _ in range(rng.randint(0, entries_per_day)):
+            rows.append(
+                (
+                    rng.choice(projects)["id"],
+                    rng.randint(0, 8),
+                    rng.randint(0, 59),
+                    rng.choice(TRACKERS),
+                    date_int,
+                    "",
+                )
+            )
+    with db.get_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO time_worked (project, hours, minutes, tracker, date, day_note)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+    db.close()
+    return first_day, date.today()
+
+
+def timed(func, *args, repeat: int = 3) -> float:
+    """Best wall time of several runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_period(args):
+    """Per-day loop (old Period Cost report) vs single range query."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        first_day, last_day = build_synthetic_db(
+            db_path, args.years, args.entries_per_day
+        )
+        db = DatabaseManager(db_path)
+        start_int, end_int = day_to_int(first_day), day_to_int(last_day)
+
+        def per_day_loop():
+            current = first_day
+            while current <= last_day:
+                db.get_time_worked_by_date(day_to_int(current))
+                current += timedelta(days=1)
+
+        loop_time = timed(per_day_loop, repeat=1)
+        range_time = timed(db.get_time_worked_by_range, start_int, end_int)
+
+        days = (last_day - first_day).days + 1
+        print(f"Period of {days} days, {args.years} years")
+        print(f"  per-day loop : {loop_time * 1000:10.1f} ms")
+        print(f"  range query  : {range_time * 1000:10.1f} ms")
+        print(f"  speedup      : {loop_time / range_time:10.1f}x")
+
+
+class ConnectPerCall(DatabaseManager):
+    """Старое поведение: новое соединение на каждый вызов."""
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+
+
+def bench_connection(args):
+    """Per-call latency of typical DatabaseManager calls, old vs pooled connection."""
+    for label, manager_class in (
+        ("connect per call", ConnectPerCall),
+        ("pooled connection", DatabaseManager),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            first_day, _ = build_synthetic_db(db_path, 1, 4)
+            date_int = day_to_int(first_day)
+
+            db = manager_class(db_path)
+            project_id = db.get_project_id_by_name("Project 0")
+            calls = {
+                "get_time_worked_by_date": lambda: db.get_time_worked_by_date(date_int),
+                "get_billing": db.get_billing,
+                "save_time_worked": lambda: db.save_time_worked(
+                    project_id, 1, 0, "LogWork", date_int
+                ),
+            }
+            print(label)
+            for name, call in calls.items():
+                started = time.perf_counter()
+                for _ in range(args.calls):
+                    call()
+                per_call = (time.perf_counter() - started) / args.calls
+                print(f"  {name:24}: {per_call * 1e6:10.1f} us/call")
+            db.close()
+
+
+# Запросы, которые должны идти по индексам, а не сканировать таблицу
+INDEXED_QUERIES = {
+    "time_worked by date": (
+        "SELECT id FROM time_worked WHERE date = ?",
+        (0,),
+    ),
+    "daily_totals by range": (
+        "SELECT cost FROM daily_totals WHERE date BETWEEN ? AND ?",
+        (0, 0),
+    ),
+    "time_worked by project": (
+        "DELETE FROM time_worked WHERE project = ?",
+        (0,),
+    ),
+    "billing by tracker": (
+        """
+        SELECT hour_cost FROM billing
+        WHERE tracker = ? AND started_at <= ?
+        ORDER BY started_at DESC LIMIT 1
+        """,
+        ("LogWork", 0),
+    ),
+}
+
+
+def bench_plans(args):
+    """Prints EXPLAIN QUERY PLAN for hot queries and fails on full table scans."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        conn = db.get_connection()
+        scans = []
+        for name, (query, params) in INDEXED_QUERIES.items():
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            details = [row[3] for row in plan]
+            print(f"{name}:")
+            for detail in details:
+                print(f"  {detail}")
+            if any(detail.startswith("SCAN ") for detail in details):
+                scans.append(name)
+        db.close()
+    if scans:
+        raise SystemExit(f"Full table scan in: {', '.join(scans)}")
+
+
+def dir_size(path: str) -> int:
+    """Total size of all files under path, in bytes."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def bench_backup(args):
+    """Full zip backups vs incremental deduplicated backups of a growing DB."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build_synthetic_db(db_path, args.years, 4)
+        db = DatabaseManager(db_path)
+        project_id = db.get_project_id_by_name("Project 0")
+        full_dir = os.path.join(tmp, "full")
+        store_dir = os.path.join(tmp, "store")
+
+        full_time = incremental_time = 0.0
+        for run in range(args.runs):
+            # Между бэкапами — один рабочий день новых записей
+            for _ in range(5):
+                db.save_time_worked(
+                    project_id, 1, 30, "LogWork", day_to_int(date.today()), "note"
+                )
+
+            started = time.perf_counter()
+            backup_database_to_zip(db_path, full_dir)
+            full_time += time.perf_counter() - started
+
+            started = time.perf_counter()
+            create_incremental_backup(db_path, store_dir)
+            incremental_time += time.perf_counter() - started
+            # Имена бэкапов уникальны с точностью до секунды
+            time.sleep(1)
+        db.close()
+
+        print(f"{args.runs} backups of {os.path.getsize(db_path) / 1024:.0f} KB DB")
+        print(
+            f"  full zip    : {full_time:8.2f} s, "
+            f"{dir_size(full_dir) / 1024:10.0f} KB on disk"
+        )
+        print(
+            f"  incremental : {incremental_time:8.2f} s, "
+            f"{dir_size(store_dir) / 1024:10.0f} KB on disk"
+        )
+
+
+def bench_export(args):
+    """Peak memory of streaming export for a small and the full date range."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = DatabaseManager(db_path)
+        db.add_project("Project 0")
+        db.add_billing_record("LogWork", 0, 1000)
+        project_id = db.get_project_id_by_name("Project 0")
+        first_day = date.today() - timedelta(days=args.rows // 20)
+        day_ints = [
+            day_to_int(first_day + timedelta(days=offset))
+            for offset in range(args.rows // 20 + 1)
+        ]
+
+        # Строки генерируются на лету, чтобы и сама база строилась без списка
+        started = time.perf_counter()
+        with db.get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO time_worked
+                    (project, hours, minutes, tracker, date, day_note)
+                VALUES (?, ?, ?, 'LogWork', ?, ?)
+                """,
+                (
+                    (project_id, i % 8, i % 60, day_ints[i // 20], f"note {i}")
+                    for i in range(args.rows)
+                ),
+            )
+            conn.commit()
+        print(f"Built {args.rows} rows in {time.perf_counter() - started:.1f} s")
+
+        for fmt in ("csv", "jsonl"):
+            output_path = os.path.join(tmp, f"export.{fmt}")
+            for label, end_int in (
+                ("10% of rows", day_ints[len(day_ints) // 10]),
+                ("all rows", None),
+            ):
+                started = time.perf_counter()
+                exported = export_records(db, output_path, fmt, end_int=end_int)
+                elapsed = time.perf_counter() - started
+                # Память — отдельным прогоном, tracemalloc замедляет экспорт
+                tracemalloc.start()
+                export_records(db, output_path, fmt, end_int=end_int)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(
+                    f"  {fmt:5} {label:12}: {exported:9} rows, {elapsed:7.2f} s, "
+                    f"peak {peak / (1024 * 1024):6.2f} MB"
+                )
+        db.close()
+
+
+def bench_import(args):
+    """Per-row save_time_worked vs bulk import of an exported CSV."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = os.path.join(tmp, "source.db")
+        build_synthetic_db(source_path, args.years, 4)
+        source = DatabaseManager(source_path)
+        csv_path = os.path.join(tmp, "export.csv")
+        rows = export_records(source, csv_path)
+        source.close()
+
+        # Старый путь: по одной записи через save_time_worked
+        db = DatabaseManager(os.path.join(tmp, "per_row.db"))
+        projects = {}
+        sample = min(rows, args.sample)
+        with open(csv_path, encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            started = time.perf_counter()
+            for record, _ in zip(reader, range(sample)):
+                name = record["project"]
+                if name not in projects:
+                    db.add_project(name)
+                    projects[name] = db.get_project_id_by_name(name)
+                db.save_time_worked(
+                    projects[name],
+                    int(record["hours"]),
+                    int(record["minutes"]),
+                    record["tracker"],
+                    day_to_int(date.fromisoformat(record["date"])),
+                    record["note"],
+                )
+            per_row = sample / (time.perf_counter() - started)
+        db.close()
+
+        db = DatabaseManager(os.path.join(tmp, "bulk.db"))
+        result = import_records(db, csv_path)
+        totals_ok = (
+            db.get_connection()
+            .execute(
+                "SELECT SUM(total_minutes) = (SELECT SUM(hours * 60 + minutes) "
+                "FROM time_worked) FROM daily_totals"
+            )
+            .fetchone()[0]
+        )
+        db.close()
+
+        print(f"  save_time_worked : {per_row:10.0f} rows/s ({sample} rows)")
+        print(f"  bulk import      : {result.rows_per_sec:10.0f} rows/s ({rows} rows)")
+        print(f"  daily_totals consistent: {bool(totals_ok)}")
+
+
+def synthetic_records(count: int, entries_per_day: int = 8) -> list:
+    """Period report rows (as from get_time_worked_by_range), sorted by date."""
+    rng = random.Random(42)
+    first_day = day_to_int(date(2000, 1, 1))
+    records = []
+    for i in range(count):
+        hours, minutes = rng.randint(0, 8), rng.randint(0, 59)
+        records.append(
+            {
+                "date": first_day + i // entries_per_day * 86400,
+                "tracker": TRACKERS[i % 2],
+                "project_name": f"Project {rng.randint(0, 9)}",
+                "hours": hours,
+                "minutes": minutes,
+                "cost": (hours * 60 + minutes) * 1000 / 60,
+            }
+        )
+    return records
+
+
+def reports_match(expected, actual, ordered: bool = True) -> bool:
+    """
+    Same days, lines and totals; costs may differ only by summation order.
+    With ordered=False tracker and project totals may come in any order.
+    """
+
+    def close(a: float, b: float) -> bool:
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+    if len(expected.days) != len(actual.days):
+        return False
+    for day, other in zip(expected.days, actual.days):
+        if day.date_int != other.date_int or not close(day.cost, other.cost):
+            return False
+        for line, other_line in zip(
+            expected.day_lines(day), actual.day_lines(other), strict=True
+        ):
+            if (line.tracker, line.project_name, line.minutes) != (
+                other_line.tracker,
+                other_line.project_name,
+                other_line.minutes,
+            ) or not close(line.cost, other_line.cost):
+                return False
+    totals = (lambda d: list(d.items())) if ordered else dict
+    return (
+        close(expected.total_cost, actual.total_cost)
+        and totals(expected.tracker_minutes) == totals(actual.tracker_minutes)
+        and totals(expected.project_minutes) == totals(actual.project_minutes)
+    )
+
+
+def bench_numpy(args):
+    """Differential check and speed of the NumPy period report path."""
+    if reporting.numpy_module() is None:
+        print("NumPy is not installed, only the pure-Python path is available.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        first_day, last_day = build_synthetic_db(db_path, args.years, 4)
+        db = DatabaseManager(db_path)
+        # Несколько смен ставок, чтобы проверить поиск эффективной ставки
+        rng = random.Random(7)
+        for _ in range(20):
+            day = first_day + timedelta(days=rng.randint(-30, 365 * args.years))
+            db.add_billing_record(
+                rng.choice(TRACKERS), day_to_int(day), rng.randint(500, 3000)
+            )
+        start_int, end_int = day_to_int(first_day), day_to_int(last_day)
+
+        reference = period_report(db.get_time_worked_by_range(start_int, end_int))
+        columns = db.get_period_columns(start_int, end_int)
+        rates = db.get_rates()
+        python_report = period_report_columns(*columns, rates, use_numpy=False)
+        numpy_report = period_report_columns(*columns, rates, use_numpy=True)
+        db.close()
+
+    ok = reports_match(reference, python_report) and reports_match(
+        reference, numpy_report
+    )
+    print(f"  {len(columns[0])} rows, reports identical: {ok}")
+
+    # Скорость на синтетических колонках большего размера
+    records = synthetic_records(args.rows)
+    columns = (
+        [rec["date"] for rec in records],
+        [rec["tracker"] for rec in records],
+        [rec["project_name"] for rec in records],
+        [rec["hours"] * 60 + rec["minutes"] for rec in records],
+    )
+    del records
+    python_time = timed(lambda: period_report_columns(*columns, rates, use_numpy=False))
+    numpy_time = timed(lambda: period_report_columns(*columns, rates, use_numpy=True))
+    print(
+        f"  {args.rows} rows: python {python_time:.3f} s, numpy {numpy_time:.3f} s "
+        f"({python_time / numpy_time:.1f}x)"
+    )
+    if not ok:
+        raise SystemExit(1)
+
+
+def bench_period_delta(args):
+    """Full recompute vs edge-delta updates while the period start moves."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        first_day, last_day = build_synthetic_db(db_path, args.years, 4)
+        db = DatabaseManager(db_path)
+        # Записи по 0 минут (так их создаёт таймер) у проекта и трекера без
+        # другого времени — в отчёте они должны остаться, как при пересчёте
+        db.add_project("Timer")
+        timer_project = db.get_project_id_by_name("Timer")
+        for offset in range(300, 430, 3):
+            db.save_time_worked(
+                timer_project,
+                0,
+                0,
+                "Idle",
+                day_to_int(first_day + timedelta(days=offset)),
+            )
+
+        def load(start_int: int, end_int: int):
+            return period_report_columns(
+                *db.get_period_columns(start_int, end_int), db.get_rates()
+            )
+
+        # Старт периода «прокручивают» по дню вперёд и назад, конец — на месяц
+        rng = random.Random(1)
+        start = first_day + timedelta(days=365)
+        end = last_day
+        ranges = []
+        for _ in range(args.steps):
+            start += timedelta(days=rng.choice((-1, 1)))
+            if rng.random() < 0.1:
+                end += timedelta(days=rng.choice((-30, 30)))
+            ranges.append((day_to_int(start), day_to_int(end)))
+
+        started = time.perf_counter()
+        full = [load(*period_range) for period_range in ranges]
+        full_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        report, report_range, shifted = None, None, []
+        for period_range in ranges:
+            report = shift_report(report, report_range, *period_range, load)
+            report_range = period_range
+            shifted.append(report)
+        delta_time = time.perf_counter() - started
+        db.close()
+
+    ok = all(
+        reports_match(expected, actual, ordered=False)
+        for expected, actual in zip(full, shifted)
+    )
+    print(f"  {args.steps} range changes over {args.years} years")
+    print(f"  full recompute : {full_time / args.steps * 1000:8.2f} ms per change")
+    print(f"  edge delta     : {delta_time / args.steps * 1000:8.2f} ms per change")
+    print(f"  results identical: {ok}")
+    if not ok:
+        raise SystemExit(1)
+
+
+def synthetic_notes(count: int, rng: random.Random) -> list:
+    """Notes from a Zipf-distributed vocabulary, some with ticket ids."""
+    syllables = ["ka", "ro", "te", "mi", "lo", "su", "na", "pe", "di", "vo"]
+    words = list(
+        {
+            "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+            for _ in range(5000)
+        }
+    )
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    notes = []
+    for _ in range(count):
+        note = " ".join(rng.choices(words, weights, k=rng.randint(3, 12)))
+        if rng.random() < 0.3:
+            note += f" TICKET-{rng.randint(1, 100_000)}"
+        notes.append(note)
+    return notes, words
+
+
+def bench_fts(args):
+    """Full-text note search vs LIKE scan over a large database."""
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Заметки загружаются обычным импортом: большой импорт снимает
+        # триггеры и индексирует новые записи одним INSERT ... SELECT
+        notes, words = synthetic_notes(args.rows, rng)
+        first_day = date.today() - timedelta(days=args.rows // 8)
+        csv_path = os.path.join(tmp, "notes.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["date", "project", "tracker", "hours", "note"])
+            for i, note in enumerate(notes):
+                day = first_day + timedelta(days=i // 8)
+                writer.writerow(
+                    [day.isoformat(), f"Project {i % 10}", "LogWork", 1, note]
+                )
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        started = time.perf_counter()
+        import_records(db, csv_path)
+        print(
+            f"  {args.rows} notes imported and indexed in {time.perf_counter() - started:.1f} s"
+        )
+
+        # Одиночная запись: триггер добавляет её в индекс
+        project_id = db.get_project_id_by_name("Project 0")
+        day_int = day_to_int(date.today())
+        save_time = timed(
+            lambda: [
+                db.save_time_worked(project_id, 1, 0, "UpWork", day_int, note)
+                for note in notes[:200]
+            ]
+        )
+        print(f"  single save with indexing: {save_time / 200 * 1000:.2f} ms")
+
+        queries = [
+            ("ticket id", f"TICKET-{rng.randint(1, 100_000)}"),
+            ("rare word", words[-1]),
+            ("two words", f"{words[50]} {words[200]}"),
+            ("prefix", words[300][:3] + "*"),
+            ("common word", words[0]),
+        ]
+        print(f"  {'query':12} {'matches':>9} {'page 1, ms':>11} {'page 20, ms':>12}")
+        for title, text in queries:
+            total, _ = db.search_notes(text)
+            first_page = timed(db.search_notes, text, 50, 0, repeat=5)
+            late_page = timed(db.search_notes, text, 50, 950, repeat=5)
+            print(
+                f"  {title:12} {total:9} {first_page * 1000:11.2f} "
+                f"{late_page * 1000:12.2f}"
+            )
+
+        text = queries[0][1]
+        like_scan = timed(
+            lambda: db.get_connection()
+            .execute(
+                "SELECT id FROM time_worked WHERE day_note LIKE ? LIMIT 50",
+                (f"%{text}%",),
+            )
+            .fetchall()
+        )
+        print(f"  LIKE scan for '{text}': {like_scan * 1000:.1f} ms")
+        db.close()
+
+
+def rollups_by_group_by(db: DatabaseManager, table: str) -> list:
+    """Строки get_rollups(), посчитанные GROUP BY по daily_totals без сводок."""
+    period_sql = ROLLUP_PERIODS[table].format(date="dt.date")
+    cursor = db.get_connection().execute(
+        f"""
+        SELECT {period_sql} AS period, dt.tracker, p.project_name,
+               SUM(dt.total_minutes), SUM(dt.cost)
+        FROM daily_totals dt
+        JOIN projects p ON dt.project = p.id
+        GROUP BY 1, dt.tracker, dt.project
+        ORDER BY 1, p.id, dt.tracker
+        """
+    )
+    return [
+        {
+            "period": row[0],
+            "tracker": row[1],
+            "project_name": row[2],
+            "minutes": row[3],
+            "cost": row[4],
+        }
+        for row in cursor.fetchall()
+    ]
+
+
+def rollups_match(db: DatabaseManager) -> bool:
+    """Weekly and monthly summaries equal a GROUP BY recomputation."""
+    for table in ROLLUP_PERIODS:
+        expected = rollups_by_group_by(db, table)
+        actual = db.get_rollups(table)
+        if len(expected) != len(actual):
+            return False
+        for want, got in zip(expected, actual):
+            if (
+                want["period"],
+                want["tracker"],
+                want["project_name"],
+                want["minutes"],
+            ) != (got["period"], got["tracker"], got["project_name"], got["minutes"]):
+                return False
+            if not math.isclose(want["cost"], got["cost"], abs_tol=1e-6):
+                return False
+    return True
+
+
+def bench_dashboard(args):
+    """Dashboard from weekly/monthly summaries vs GROUP BY, plus a diff check."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        first_day, _ = build_synthetic_db(db_path, args.years, 8)
+        db = DatabaseManager(db_path)
+
+        print(f"  dashboard over {args.years} years")
+        print(f"  {'group by':8} {'rows':>7} {'summary, ms':>12} {'GROUP BY, ms':>13}")
+        for table in ROLLUP_PERIODS:
+            rows = len(db.get_rollups(table))
+            summary_time = timed(
+                lambda: reporting.dashboard(db.get_rollups(table)), repeat=5
+            )
+            group_by_time = timed(
+                lambda: reporting.dashboard(rollups_by_group_by(db, table))
+            )
+            print(
+                f"  {table.split('_')[0]:8} {rows:7} {summary_time * 1000:12.2f} "
+                f"{group_by_time * 1000:13.2f}"
+            )
+
+        # Случайные правки: сводки должны совпадать с пересчётом
+        rng = random.Random(3)
+        projects = [proj["id"] for proj in db.get_all_projects_with_ids()]
+        entry_ids = [
+            row[0] for row in db.get_connection().execute("SELECT id FROM time_worked")
+        ]
+        started = time.perf_counter()
+        for _ in range(args.writes):
+            action = rng.random()
+            day_int = day_to_int(first_day + timedelta(days=rng.randint(0, 400)))
+            if action < 0.4 or not entry_ids:
+                db.save_time_worked(
+                    rng.choice(projects),
+                    rng.randint(0, 8),
+                    rng.randint(0, 59),
+                    rng.choice(TRACKERS),
+                    day_int,
+                )
+                entry_ids.append(
+                    db.get_connection()
+                    .execute("SELECT MAX(id) FROM time_worked")
+                    .fetchone()[0]
+                )
+            elif action < 0.7:
+                db.update_time_worked(
+                    rng.choice(entry_ids),
+                    rng.choice(projects),
+                    rng.randint(0, 8),
+                    rng.randint(0, 59),
+                    rng.choice(TRACKERS),
+                )
+            elif action < 0.98:
+                entry_ids.remove(entry_id := rng.choice(entry_ids))
+                db.delete_time_worked(entry_id)
+            else:
+                db.add_billing_record(
+                    rng.choice(TRACKERS), day_int, rng.randint(500, 2000)
+                )
+        write_time = time.perf_counter() - started
+        ok = rollups_match(db)
+        db.close()
+
+    print(
+        f"  {args.writes} random writes: {write_time / args.writes * 1000:.2f} ms each"
+    )
+    print(f"  summaries identical to GROUP BY: {ok}")
+    if not ok:
+        raise SystemExit(1)
+
+
+def bench_startup(args):
+    """Launch-to-first-paint and launch-to-ready times of main.py (offscreen)."""
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", WORKTIME_STARTUP_TIMING="1")
+    with tempfile.TemporaryDirectory() as tmp:
+        # База в рабочем каталоге, как у обычного запуска
+        build_synthetic_db(os.path.join(tmp, "WTBase.db"), args.years, 4)
+        wall, paint, ready = [], [], []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, main_path],
+                cwd=tmp,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            wall.append((time.perf_counter() - started) * 1000)
+            # Строки "first paint: N ms" и "ready: N ms" от main.py
+            times = {}
+            for line in output.splitlines():
+                key, _, value = line.partition(": ")
+                if key in ("first paint", "ready"):
+                    times[key] = float(value.split()[0])
+            paint.append(times["first paint"])
+            ready.append(times["ready"])
+
+    print(f"  {args.runs} launches, median over runs (ms after main.py start)")
+    print(f"  first paint     : {statistics.median(paint):8.0f} ms")
+    print(f"  ready (DB, tab) : {statistics.median(ready):8.0f} ms")
+    print(f"  process wall    : {statistics.median(wall):8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Work time tracker benchmarks")
+    subparsers = parser.add_subparsers(dest="name", required=True)
+
+    period = subparsers.add_parser("period", help="Period Cost report queries")
+    period.add_argument("--years", type=int, default=5)
+    period.add_argument("--entries-per-day", type=int, default=4)
+    period.set_defaults(func=bench_period)
+
+    connection = subparsers.add_parser(
+        "connection", help="Per-call latency of DatabaseManager methods"
+    )
+    connection.add_argument("--calls", type=int, default=500)
+    connection.set_defaults(func=bench_connection)
+
+    plans = subparsers.add_parser("plans", help="Check query plans use indexes")
+    plans.set_defaults(func=bench_plans)
+
+    backup = subparsers.add_parser("backup", help="Full vs incremental backups")
+    backup.add_argument("--years", type=int, default=5)
+    backup.add_argument("--runs", type=int, default=10)
+    backup.set_defaults(func=bench_backup)
+
+    export = subparsers.add_parser("export", help="Streaming export memory use")
+    export.add_argument("--rows", type=int, default=1_000_000)
+    export.set_defaults(func=bench_export)
+
+    import_ = subparsers.add_parser("import", help="Per-row vs bulk import")
+    import_.add_argument("--years", type=int, default=10)
+    import_.add_argument("--sample", type=int, default=2000)
+    import_.set_defaults(func=bench_import)
+
+    numpy_report = subparsers.add_parser(
+        "numpy", help="NumPy vs pure-Python period report (differential check)"
+    )
+    numpy_report.add_argument("--years", type=int, default=5)
+    numpy_report.add_argument("--rows", type=int, default=1_000_000)
+    numpy_report.set_defaults(func=bench_numpy)
+
+    period_delta = subparsers.add_parser(
+        "period-delta", help="Edge-delta period report updates"
+    )
+    period_delta.add_argument("--years", type=int, default=5)
+    period_delta.add_argument("--steps", type=int, default=200)
+    period_delta.set_defaults(func=bench_period_delta)
+
+    fts = subparsers.add_parser("fts", help="Full-text note search latency")
+    fts.add_argument("--rows", type=int, default=1_000_000)
+    fts.set_defaults(func=bench_fts)
+
+    dashboard = subparsers.add_parser(
+        "dashboard", help="Dashboard from summaries vs GROUP BY"
+    )
+    dashboard.add_argument("--years", type=int, default=10)
+    dashboard.add_argument("--writes", type=int, default=2000)
+    dashboard.set_defaults(func=bench_dashboard)
+
+    startup = subparsers.add_parser("startup", help="Time to first paint of main.py")
+    startup.add_argument("--years", type=int, default=5)
+    startup.add_argument("--runs", type=int, default=10)
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
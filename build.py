@@ -1,63 +1,356 @@
+"""
+Сборка WorkTimeTracker через PyInstaller.
+
+--onefile — один исполняемый файл; при каждом запуске он распаковывает
+Qt во временный каталог, поэтому стартует медленнее.
+--onedir — каталог с исполняемым файлом и библиотеками, запускается сразу.
+
+Из сборки исключаются модули Qt, кроме QtCore/QtGui/QtWidgets, а из
+onedir-сборки ещё и ненужные плагины и переводы Qt. ICO пересоздаётся из
+PNG только при изменении PNG (по SHA-256).
+
+Usage: python build.py [--onefile | --onedir] [--benchmark [--runs N] [--skip-build]]
+"""
+
+import argparse
+import hashlib
 import os
+import re
+import shutil
+import statistics
 import subprocess
 import sys
+import tempfile
+import time
+
+APP_NAME = "WorkTimeTracker"
+MODES = ("onefile", "onedir")
+
+PNG_PATH = "images/main_icon.png"
+ICON_PATH = "images/main_icon.ico"
+# SHA-256 PNG, из которого сделан ICON_PATH
+ICON_HASH_PATH = "build/main_icon.png.sha256"
+ICON_SIZES = [(256, 256), (128, 128), (64, 64), (48, 48), (32, 32), (16, 16)]
+
+# Приложение использует только QtCore, QtGui и QtWidgets
+EXCLUDED_QT_MODULES = (
+    "Qt3DAnimation",
+    "Qt3DCore",
+    "Qt3DExtras",
+    "Qt3DInput",
+    "Qt3DLogic",
+    "Qt3DRender",
+    "QtBluetooth",
+    "QtCharts",
+    "QtDataVisualization",
+    "QtDBus",
+    "QtDesigner",
+    "QtHelp",
+    "QtMultimedia",
+    "QtMultimediaWidgets",
+    "QtNetwork",
+    "QtNfc",
+    "QtOpenGL",
+    "QtOpenGLWidgets",
+    "QtPdf",
+    "QtPdfWidgets",
+    "QtPositioning",
+    "QtPrintSupport",
+    "QtQml",
+    "QtQuick",
+    "QtQuick3D",
+    "QtQuickWidgets",
+    "QtRemoteObjects",
+    "QtSensors",
+    "QtSerialPort",
+    "QtSpatialAudio",
+    "QtSql",
+    "QtSvg",
+    "QtSvgWidgets",
+    "QtTest",
+    "QtTextToSpeech",
+    "QtWebChannel",
+    "QtWebEngineCore",
+    "QtWebEngineQuick",
+    "QtWebEngineWidgets",
+    "QtWebSockets",
+    "QtXml",
+)
+
+# Плагины Qt, без которых окно не откроется; остальные (imageformats,
+# iconengines, generic, ...) удаляются из onedir-сборки — картинки только PNG
+QT_PLUGINS_KEEP = (
+    "platforms",
+    "platformthemes",
+    "platforminputcontexts",
+    "styles",
+    "xcbglintegrations",
+    "wayland-",
+)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ensure_icon() -> str | None:
+    """
+    Returns the ICO path, regenerating it from the PNG only when the
+    PNG content changed since the last build. None if there is no icon.
+    """
+    if not os.path.exists(PNG_PATH):
+        if os.path.exists(ICON_PATH):
+            return ICON_PATH
+        print(f"Error: neither {ICON_PATH} nor {PNG_PATH} found!")
+        return None
+
+    png_hash = file_sha256(PNG_PATH)
+    if os.path.exists(ICON_PATH) and os.path.exists(ICON_HASH_PATH):
+        with open(ICON_HASH_PATH, encoding="utf-8") as f:
+            if f.read().strip() == png_hash:
+                print(f"{ICON_PATH} is up to date")
+                return ICON_PATH
+
+    print(f"Creating {ICON_PATH} from {PNG_PATH}...")
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Error: Pillow not installed. Install with: pip install Pillow")
+        # Старая иконка лучше, чем никакой
+        return ICON_PATH if os.path.exists(ICON_PATH) else None
+
+    with Image.open(PNG_PATH) as img:
+        img.save(ICON_PATH, format="ICO", sizes=ICON_SIZES)
+    os.makedirs(os.path.dirname(ICON_HASH_PATH), exist_ok=True)
+    with open(ICON_HASH_PATH, "w", encoding="utf-8") as f:
+        f.write(png_hash)
+    print(f"Created {ICON_PATH} from PNG")
+    return ICON_PATH
+
+
+def bundle_path(mode: str) -> str:
+    """The executable (onefile) or the app directory (onedir) of a build."""
+    return os.path.join("dist", mode, APP_NAME)
+
+
+def executable_path(mode: str) -> str:
+    suffix = ".exe" if sys.platform == "win32" else ""
+    if mode == "onedir":
+        return os.path.join(bundle_path(mode), APP_NAME + suffix)
+    return bundle_path(mode) + suffix
+
 
+def _qt_library_module(file_name: str) -> str | None:
+    """libQt6Pdf.so.6 / Qt6Pdf.dll → "QtPdf", None for other files."""
+    match = re.match(r"(?:lib)?Qt6(\w+?)\.(?:so|dll|dylib)", file_name)
+    return f"Qt{match.group(1)}" if match else None
 
-def build_app():
-    # Проверяем существование иконки
-    icon_path = "images/main_icon.ico"
-    if not os.path.exists(icon_path):
-        print(f"Warning: Icon file {icon_path} not found!")
-        print("Creating ICO file from PNG...")
-
-        try:
-            from PIL import Image
-
-            png_path = "images/main_icon.png"
-            if os.path.exists(png_path):
-                img = Image.open(png_path)
-                img.save(
-                    icon_path,
-                    format="ICO",
-                    sizes=[
-                        (256, 256),
-                        (128, 128),
-                        (64, 64),
-                        (48, 48),
-                        (32, 32),
-                        (16, 16),
-                    ],
-                )
-                print(f"Created {icon_path} from PNG")
-            else:
-                print(f"Error: PNG file {png_path} also not found!")
-                return
-        except ImportError:
-            print("Error: Pillow not installed. Install with: pip install Pillow")
-            return
-
-    # Команда сборки
+
+def prune_qt_files(app_dir: str) -> int:
+    """
+    Removes unused Qt plugins and translations from an onedir build,
+    then Qt libraries of excluded modules that no remaining binary
+    references (they were pulled in only by removed plugins).
+    Returns bytes freed.
+    """
+    freed = 0
+    for root, dirs, _ in os.walk(app_dir):
+        if os.path.basename(root) != "Qt6":
+            continue
+        unused = []
+        plugins_dir = os.path.join(root, "plugins")
+        if os.path.isdir(plugins_dir):
+            unused += [
+                os.path.join(plugins_dir, name)
+                for name in os.listdir(plugins_dir)
+                if not name.startswith(QT_PLUGINS_KEEP)
+            ]
+        # Переводы Qt не загружаются: QTranslator в приложении не используется
+        unused.append(os.path.join(root, "translations"))
+        for path in unused:
+            if os.path.isdir(path):
+                freed += dir_size(path)
+                shutil.rmtree(path)
+        dirs.clear()
+
+    binaries = [
+        os.path.join(root, name)
+        for root, _, files in os.walk(app_dir)
+        for name in files
+        if not os.path.islink(os.path.join(root, name))
+        and re.search(r"\.(so|dll|pyd|dylib)(\.|$)", name)
+    ]
+    candidates = {
+        path: os.path.basename(path).split(".")[0].encode()
+        for path in binaries
+        if _qt_library_module(os.path.basename(path)) in EXCLUDED_QT_MODULES
+    }
+    # Библиотека нужна, пока её имя встречается в другой оставшейся библиотеке
+    removed = True
+    while removed:
+        removed = False
+        remaining = [path for path in binaries if os.path.exists(path)]
+        for path, name in list(candidates.items()):
+            referenced = False
+            for other in remaining:
+                if other != path:
+                    with open(other, "rb") as f:
+                        if name in f.read():
+                            referenced = True
+                            break
+            if not referenced:
+                freed += os.path.getsize(path)
+                os.remove(path)
+                del candidates[path]
+                removed = True
+                break
+
+    # Ссылки на удалённые библиотеки
+    for root, _, files in os.walk(app_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.islink(path) and not os.path.exists(path):
+                os.remove(path)
+    return freed
+
+
+def dir_size(path: str) -> int:
+    """Size of a file or a directory tree; symlinks are not counted."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+        if not os.path.islink(os.path.join(root, name))
+    )
+
+
+def build_app(mode: str = "onefile") -> bool:
+    icon_path = ensure_icon()
+    if icon_path is None:
+        return False
+
+    # Команда сборки; spec и временные файлы — в build/<mode>
     cmd = [
-        "pyinstaller",
-        "--onefile",
+        sys.executable,
+        "-m",
+        "PyInstaller",
+        f"--{mode}",
         "--windowed",
-        f"--icon={icon_path}",
+        "--noconfirm",
+        f"--icon={os.path.abspath(icon_path)}",
         "--add-data",
-        "images:images",
+        f"{os.path.abspath('images')}:images",
         "--name",
-        "WorkTimeTracker",  # Имя выходного файла
-        "main.py",
+        APP_NAME,
+        "--distpath",
+        os.path.join("dist", mode),
+        "--workpath",
+        os.path.join("build", mode),
+        "--specpath",
+        os.path.join("build", mode),
     ]
+    for module in EXCLUDED_QT_MODULES:
+        cmd += ["--exclude-module", f"PyQt6.{module}"]
+    cmd.append("main.py")
 
     print(f"Running: {' '.join(cmd)}")
     result = subprocess.run(cmd)
 
-    if result.returncode == 0:
-        print("\nBuild successful!")
-        print(f"Executable: dist/WorkTimeTracker.exe")
-    else:
+    if result.returncode != 0:
         print("\nBuild failed!")
+        return False
+    if mode == "onedir":
+        freed = prune_qt_files(bundle_path(mode))
+        print(f"Removed unused Qt plugins and translations ({freed / 1e6:.1f} MB)")
+    print("\nBuild successful!")
+    print(f"Executable: {executable_path(mode)}")
+    return True
+
+
+def launch_time(executable: str) -> float:
+    """
+    Seconds from process start until the first work day tab is shown.
+    WORKTIME_STARTUP_TIMING makes the app quit as soon as it is ready.
+    """
+    env = dict(os.environ, WORKTIME_STARTUP_TIMING="1")
+    if sys.platform.startswith("linux") and not (
+        env.get("DISPLAY") or env.get("WAYLAND_DISPLAY")
+    ):
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    # Пустой рабочий каталог: каждый запуск создаёт новую базу
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        subprocess.run(
+            [os.path.abspath(executable)],
+            cwd=tmp,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        return time.perf_counter() - started
+
+
+def benchmark(modes, runs: int):
+    """Prints launch-to-window time and bundle size of each built mode."""
+    print(f"\n{'mode':8} {'size, MB':>9} {'launch → window, ms (median)':>30}")
+    for mode in modes:
+        executable = executable_path(mode)
+        if not os.path.exists(executable):
+            print(f"{mode:8} not built ({executable} not found)")
+            continue
+        times = [launch_time(executable) for _ in range(runs)]
+        print(
+            f"{mode:8} {dir_size(bundle_path(mode)) / 1e6:9.1f} "
+            f"{statistics.median(times) * 1000:30.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Build {APP_NAME} with PyInstaller")
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument(
+        "--onefile",
+        dest="mode",
+        action="store_const",
+        const="onefile",
+        help="Single executable (default)",
+    )
+    mode_group.add_argument(
+        "--onedir",
+        dest="mode",
+        action="store_const",
+        const="onedir",
+        help="Directory bundle, starts faster",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Measure launch time and size (both modes unless one is given)",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--skip-build", action="store_true", help="Benchmark existing builds"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        modes = [args.mode] if args.mode else list(MODES)
+    else:
+        modes = [args.mode or "onefile"]
+    if not args.skip_build:
+        for mode in modes:
+            if not build_app(mode):
+                raise SystemExit(1)
+    if args.benchmark:
+        benchmark(modes, args.runs)
 
 
 if __name__ == "__main__":
-    build_app()
+    main()
@@ -0,0 +1,170 @@
+"""
+Простые диаграммы для дашборда, рисуются QPainter (без QtCharts).
+"""
+
+import math
+from typing import Callable, List
+
+from PyQt6.QtCore import QRectF, Qt
+from PyQt6.QtGui import QColor, QFontMetrics, QPainter
+from PyQt6.QtWidgets import QSizePolicy, QToolTip, QWidget
+
+BAR_COLOR = QColor("#4f81bd")
+HOVER_COLOR = QColor("#2c6f2e")
+GRID_COLOR = QColor("#d0d0d0")
+# Число горизонтальных линий сетки
+GRID_LINES = 4
+
+
+def nice_ceiling(value: float) -> float:
+    """Rounds a maximum up to 1, 2 or 5 × 10^n, so the grid gets round labels."""
+    if value <= 0:
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+class BarChart(QWidget):
+    """
+    Столбчатая диаграмма: подписи снизу, значения по сетке слева.
+    Подписи, которые не помещаются, пропускаются; точное значение
+    столбца показывается во всплывающей подсказке.
+    """
+
+    MARGIN = 8
+
+    def __init__(self, title: str = "", parent=None):
+        super().__init__(parent)
+        self._title = title
+        self._labels: List[str] = []
+        self._values: List[float] = []
+        self._format: Callable[[float], str] = str
+        self._hovered = -1
+        self.setMouseTracking(True)
+        self.setMinimumHeight(180)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def set_title(self, title: str):
+        self._title = title
+        self.update()
+
+    def set_data(
+        self,
+        labels: List[str],
+        values: List[float],
+        format_value: Callable[[float], str] = str,
+    ):
+        self._labels = list(labels)
+        self._values = list(values)
+        self._format = format_value
+        self._hovered = -1
+        self.update()
+
+    def _plot_rect(self, metrics: QFontMetrics) -> QRectF:
+        top = self.MARGIN + (metrics.height() + self.MARGIN if self._title else 0)
+        left = self.MARGIN + max(
+            metrics.horizontalAdvance(self._format(value))
+            for value in (0, nice_ceiling(max(self._values, default=0)))
+        )
+        bottom = self.height() - self.MARGIN - metrics.height()
+        return QRectF(
+            left + self.MARGIN,
+            top,
+            max(self.width() - left - 2 * self.MARGIN, 1),
+            max(bottom - top, 1),
+        )
+
+    def _bar_at(self, x: float) -> int:
+        plot = self._plot_rect(QFontMetrics(self.font()))
+        if not self._values or not plot.left() <= x < plot.right():
+            return -1
+        index = int((x - plot.left()) * len(self._values) / plot.width())
+        return min(index, len(self._values) - 1)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        metrics = QFontMetrics(self.font())
+        if self._title:
+            painter.drawText(
+                QRectF(0, self.MARGIN, self.width(), metrics.height()),
+                Qt.AlignmentFlag.AlignHCenter,
+                self._title,
+            )
+        plot = self._plot_rect(metrics)
+        if not self._values:
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, "No data")
+            return
+
+        # Сетка и значения слева
+        top_value = nice_ceiling(max(self._values))
+        previous = None
+        for line in range(GRID_LINES + 1):
+            y = plot.bottom() - plot.height() * line / GRID_LINES
+            painter.setPen(GRID_COLOR)
+            painter.drawLine(int(plot.left()), int(y), int(plot.right()), int(y))
+            # Мелкие значения округляются форматом до одинаковых подписей
+            text = self._format(top_value * line / GRID_LINES)
+            if text == previous:
+                continue
+            previous = text
+            painter.setPen(self.palette().text().color())
+            painter.drawText(
+                QRectF(0, y - metrics.height() / 2, plot.left() - 4, metrics.height()),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                text,
+            )
+
+        # Столбцы
+        slot = plot.width() / len(self._values)
+        gap = min(slot * 0.2, 8)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for index, value in enumerate(self._values):
+            height = plot.height() * max(value, 0) / top_value
+            painter.setBrush(HOVER_COLOR if index == self._hovered else BAR_COLOR)
+            painter.drawRect(
+                QRectF(
+                    plot.left() + index * slot + gap / 2,
+                    plot.bottom() - height,
+                    max(slot - gap, 1),
+                    height,
+                )
+            )
+
+        # Подписи снизу: каждая n-я, чтобы не налезали друг на друга
+        painter.setPen(self.palette().text().color())
+        widest = max(metrics.horizontalAdvance(label) for label in self._labels)
+        every = max(1, math.ceil((widest + 6) / slot))
+        for index in range(0, len(self._labels), every):
+            painter.drawText(
+                QRectF(
+                    plot.left() + (index + 0.5) * slot - widest / 2 - 3,
+                    plot.bottom() + 2,
+                    widest + 6,
+                    metrics.height(),
+                ),
+                Qt.AlignmentFlag.AlignHCenter,
+                self._labels[index],
+            )
+
+    def mouseMoveEvent(self, event):
+        index = self._bar_at(event.position().x())
+        if index != self._hovered:
+            self._hovered = index
+            self.update()
+        if index >= 0:
+            QToolTip.showText(
+                event.globalPosition().toPoint(),
+                f"{self._labels[index]}: {self._format(self._values[index])}",
+                self,
+            )
+        else:
+            QToolTip.hideText()
+
+    def leaveEvent(self, event):
+        self._hovered = -1
+        self.update()
+        super().leaveEvent(event)
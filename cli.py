@@ -0,0 +1,211 @@
+"""
+Командная строка для работы с базой без GUI.
+
+Использует DatabaseManager напрямую и не импортирует PyQt6, поэтому
+запускается быстро и подходит для cron и shell-скриптов.
+Модули экспорта, импорта и бэкапов загружаются только нужной команде.
+
+Usage: python -m cli [--db WTBase.db] {log,report,export,import,backup,projects} ...
+"""
+
+import argparse
+import sys
+from datetime import date, datetime
+
+from database import TRACKERS, DatabaseManager, backup_database_to_zip
+from reporting import format_minutes, period_report_columns
+
+
+def parse_day(value: str) -> int:
+    """YYYY-MM-DD или DD.MM.YYYY → Unix timestamp начала дня."""
+    try:
+        if "." in value:
+            day = datetime.strptime(value, "%d.%m.%Y").date()
+        else:
+            day = date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value}")
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def today() -> int:
+    return parse_day(date.today().isoformat())
+
+
+def format_day(date_int: int) -> str:
+    return datetime.fromtimestamp(date_int).strftime("%d.%m.%Y (%a)")
+
+
+def cmd_log(db: DatabaseManager, args) -> int:
+    project_id = db.get_project_id_by_name(args.project)
+    if project_id is None:
+        print(f"Unknown project: {args.project} (add it with 'projects add')")
+        return 1
+    total_minutes = round(args.hours * 60) + args.minutes
+    if total_minutes <= 0:
+        print("Nothing to log: time must be positive")
+        return 1
+    hours, minutes = divmod(total_minutes, 60)
+    if not db.save_time_worked(
+        project_id, hours, minutes, args.tracker, args.date, args.note
+    ):
+        return 1
+    print(f"Logged {hours}ч {minutes}мин on {args.project} ({format_day(args.date)})")
+    return 0
+
+
+def cmd_report(db: DatabaseManager, args) -> int:
+    if args.start > args.end:
+        print("Start date must be ≤ end date")
+        return 1
+    report = period_report_columns(
+        *db.get_period_columns(args.start, args.end), db.get_rates()
+    )
+    if not report.days:
+        print("No work records found in the selected period.")
+        return 0
+
+    for day in report.days:
+        print(format_day(day.date_int))
+        for line in report.day_lines(day):
+            print(
+                f"  • {line.project_name} | {line.tracker} | "
+                f"{format_minutes(line.minutes)} → ₽{line.cost:.2f}"
+            )
+
+    print()
+    for title, totals in (
+        ("Trackers", report.tracker_minutes),
+        ("Projects", report.project_minutes),
+    ):
+        print(f"{title}:")
+        for name, minutes in totals.items():
+            print(f"  {name}: {format_minutes(minutes)}")
+    print(f"Total cost: ₽{report.total_cost:.2f}")
+    return 0
+
+
+def cmd_export(db: DatabaseManager, args) -> int:
+    from export import export_records
+
+    exported = export_records(
+        db, args.output, args.format, args.table, args.start, args.end
+    )
+    return 0 if exported is not None else 1
+
+
+def cmd_import(db: DatabaseManager, args) -> int:
+    from importer import import_records
+
+    result = import_records(db, args.input, args.format, args.tracker)
+    return 0 if result is not None else 1
+
+
+def cmd_backup(db: DatabaseManager, args) -> int:
+    if args.incremental:
+        from incremental_backup import DEFAULT_STORE_DIR, backup_and_prune
+
+        path = backup_and_prune(
+            db.db_path,
+            args.dir or DEFAULT_STORE_DIR,
+            compression=args.compression,
+            level=args.level,
+        )
+    else:
+        path = backup_database_to_zip(
+            db.db_path,
+            args.dir or "backups",
+            compression=args.compression,
+            level=args.level,
+        )
+    return 0 if path else 1
+
+
+def cmd_projects(db: DatabaseManager, args) -> int:
+    if args.action == "list":
+        for proj in db.get_all_projects_with_ids():
+            print(f"{proj['id']:5}  {proj['name']}")
+        return 0
+    if args.action == "add":
+        ok = db.add_project(args.name)
+    elif args.action == "rename":
+        ok = db.update_project(args.id, args.name)
+    else:
+        ok = db.delete_project(args.id)
+    if not ok:
+        print(f"Failed to {args.action} project")
+    return 0 if ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m cli", description="Work time tracker command line"
+    )
+    parser.add_argument("--db", default="WTBase.db", help="Database file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    log = subparsers.add_parser("log", help="Log time worked")
+    log.add_argument("project")
+    log.add_argument("hours", type=float, help="Hours, may be fractional (1.5)")
+    log.add_argument("--minutes", type=int, default=0)
+    log.add_argument("--tracker", choices=TRACKERS, default=TRACKERS[0])
+    log.add_argument("--date", type=parse_day, default=today(), help="Default: today")
+    log.add_argument("--note", default="")
+    log.set_defaults(func=cmd_log)
+
+    report = subparsers.add_parser("report", help="Cost report for a period")
+    report.add_argument("--from", dest="start", type=parse_day, required=True)
+    report.add_argument("--to", dest="end", type=parse_day, default=today())
+    report.set_defaults(func=cmd_report)
+
+    export = subparsers.add_parser("export", help="Export records to a file")
+    export.add_argument("output", help="Output file (.csv, .jsonl or .parquet)")
+    export.add_argument("--format", choices=("csv", "jsonl", "parquet"))
+    export.add_argument(
+        "--table", choices=("time_worked", "billing"), default="time_worked"
+    )
+    export.add_argument("--from", dest="start", type=parse_day)
+    export.add_argument("--to", dest="end", type=parse_day)
+    export.set_defaults(func=cmd_export)
+
+    import_ = subparsers.add_parser("import", help="Import records from a file")
+    import_.add_argument("input", help="Input file (.csv or .jsonl)")
+    import_.add_argument("--format", choices=("csv", "jsonl"))
+    import_.add_argument("--tracker", help="Tracker for rows without one")
+    import_.set_defaults(func=cmd_import)
+
+    backup = subparsers.add_parser("backup", help="Back up the database")
+    backup.add_argument(
+        "--incremental", action="store_true", help="Deduplicated backup + pruning"
+    )
+    backup.add_argument("--dir", help="Backup directory or store")
+    backup.add_argument("--compression", choices=("deflate", "zstd"), default="deflate")
+    backup.add_argument("--level", type=int, default=6)
+    backup.set_defaults(func=cmd_backup)
+
+    projects = subparsers.add_parser("projects", help="List and edit projects")
+    project_actions = projects.add_subparsers(dest="action")
+    projects.set_defaults(func=cmd_projects, action="list")
+    project_actions.add_parser("list")
+    add = project_actions.add_parser("add")
+    add.add_argument("name")
+    rename = project_actions.add_parser("rename")
+    rename.add_argument("id", type=int)
+    rename.add_argument("name")
+    delete = project_actions.add_parser("delete")
+    delete.add_argument("id", type=int)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    db = DatabaseManager(args.db)
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,504 @@
 import sqlite3
 import os
-import zipfile
-from typing import List, Optional
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
 
+# Трекеры времени; общие для GUI, CLI и бенчмарков
+TRACKERS = ["LogWork", "UpWork"]
+
+# Размер порции при сжатии снимка базы в архив
+BACKUP_CHUNK_SIZE = 1024 * 1024
+# Сколько страниц копирует за шаг SQLite backup API
+BACKUP_PAGES_PER_STEP = 1024
+
+
+def rate_sql(tracker: str, date: str) -> str:
+    """
+    SQL-выражение ставки трекера на дату, те же правила, что у RateResolver:
+    последняя ставка с started_at <= date, иначе самая ранняя, иначе 0.
+    """
+    return f"""
+        COALESCE(
+            (SELECT b.hour_cost FROM billing b
+             WHERE b.tracker = {tracker} AND b.started_at <= {date}
+             ORDER BY b.started_at DESC, b.id DESC LIMIT 1),
+            (SELECT b.hour_cost FROM billing b
+             WHERE b.tracker = {tracker}
+             ORDER BY b.started_at, b.id LIMIT 1),
+            0
+        )"""
+
+
+def _add_to_daily_totals_sql(row: str) -> str:
+    """Добавляет запись time_worked (NEW/OLD) в daily_totals."""
+    return f"""
+        INSERT INTO daily_totals (date, tracker, project, entries, total_minutes)
+        VALUES ({row}.date, {row}.tracker, {row}.project, 1,
+                {row}.hours * 60 + {row}.minutes)
+        ON CONFLICT (date, tracker, project) DO UPDATE SET
+            entries = entries + 1,
+            total_minutes = total_minutes + excluded.total_minutes;
+        UPDATE daily_totals
+        SET cost = total_minutes * {rate_sql(f"{row}.tracker", f"{row}.date")} / 60.0
+        WHERE date = {row}.date AND tracker = {row}.tracker AND project = {row}.project;
+    """
+
+
+def _remove_from_daily_totals_sql(row: str) -> str:
+    """Вычитает запись time_worked (NEW/OLD) из daily_totals."""
+    return f"""
+        UPDATE daily_totals
+        SET entries = entries - 1,
+            total_minutes = total_minutes - ({row}.hours * 60 + {row}.minutes),
+            cost = (total_minutes - ({row}.hours * 60 + {row}.minutes))
+                   * {rate_sql(f"{row}.tracker", f"{row}.date")} / 60.0
+        WHERE date = {row}.date AND tracker = {row}.tracker AND project = {row}.project;
+        DELETE FROM daily_totals
+        WHERE date = {row}.date AND tracker = {row}.tracker AND project = {row}.project
+          AND entries <= 0;
+    """
+
+
+def _reprice_daily_totals_sql(row: str) -> str:
+    """Пересчитывает стоимость по трекеру после изменения его ставок."""
+    return f"""
+        UPDATE daily_totals
+        SET cost = total_minutes
+                   * {rate_sql("daily_totals.tracker", "daily_totals.date")} / 60.0
+        WHERE tracker = {row}.tracker;
+    """
+
+
+# Полный пересчёт daily_totals из time_worked
+REBUILD_DAILY_TOTALS_SQL = (
+    "DELETE FROM daily_totals",
+    f"""
+    INSERT INTO daily_totals (date, tracker, project, entries, total_minutes, cost)
+    SELECT tw.date, tw.tracker, tw.project, COUNT(*),
+           SUM(tw.hours * 60 + tw.minutes),
+           SUM(tw.hours * 60 + tw.minutes) * {rate_sql("tw.tracker", "tw.date")} / 60.0
+    FROM time_worked tw
+    GROUP BY tw.date, tw.tracker, tw.project
+    """,
+)
+
+
+# Сводки daily_totals по неделям и месяцам: {таблица: SQL начала периода}.
+# Неделя — дата её понедельника (YYYY-MM-DD), месяц — YYYY-MM.
+ROLLUP_PERIODS = {
+    "weekly_totals": "date({date}, 'unixepoch', 'localtime', 'weekday 0', '-6 days')",
+    "monthly_totals": "strftime('%Y-%m', {date}, 'unixepoch', 'localtime')",
+}
+
+
+def _add_to_rollups_sql(days: str, minutes: str, cost: str, row: str) -> str:
+    """
+    Прибавляет к сводкам периода строки daily_totals (NEW/OLD) изменение
+    числа дней, минут и стоимости; опустевшие периоды удаляются.
+    """
+    statements = []
+    for table, period_sql in ROLLUP_PERIODS.items():
+        period = period_sql.format(date=f"{row}.date")
+        statements.append(
+            f"""
+        INSERT INTO {table} (period, tracker, project, days, total_minutes, cost)
+        VALUES ({period}, {row}.tracker, {row}.project, {days}, {minutes}, {cost})
+        ON CONFLICT (period, tracker, project) DO UPDATE SET
+            days = days + excluded.days,
+            total_minutes = total_minutes + excluded.total_minutes,
+            cost = cost + excluded.cost;
+        DELETE FROM {table}
+        WHERE period = {period} AND tracker = {row}.tracker
+          AND project = {row}.project AND days <= 0;
+            """
+        )
+    return "".join(statements)
+
+
+def _rollup_table_sql(table: str) -> str:
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            period TEXT NOT NULL,
+            tracker TEXT NOT NULL,
+            project INTEGER NOT NULL,
+            days INTEGER NOT NULL DEFAULT (0),
+            total_minutes INTEGER NOT NULL DEFAULT (0),
+            cost REAL NOT NULL DEFAULT (0),
+            PRIMARY KEY (period, tracker, project)
+        ) WITHOUT ROWID
+    """
+
+
+# Полный пересчёт сводок по периодам из daily_totals
+REBUILD_ROLLUPS_SQL = tuple(
+    statement
+    for table, period_sql in ROLLUP_PERIODS.items()
+    for statement in (
+        f"DELETE FROM {table}",
+        f"""
+        INSERT INTO {table} (period, tracker, project, days, total_minutes, cost)
+        SELECT {period_sql.format(date="dt.date")}, dt.tracker, dt.project,
+               COUNT(*), SUM(dt.total_minutes), SUM(dt.cost)
+        FROM daily_totals dt
+        GROUP BY 1, 2, 3
+        """,
+    )
+)
+
+
+# Полнотекстовый индекс заметок: строка notes_fts с rowid = time_worked.id
+def _add_to_notes_fts_sql(row: str) -> str:
+    return f"""
+    INSERT INTO notes_fts (rowid, day_note, project_name)
+    VALUES (
+        {row}.id,
+        COALESCE({row}.day_note, ''),
+        (SELECT project_name FROM projects WHERE id = {row}.project)
+    );
+    """
+
+
+def index_notes_sql(after_id: int = 0) -> str:
+    """Indexes time_worked entries with id > after_id (all by default)."""
+    return f"""
+    INSERT INTO notes_fts (rowid, day_note, project_name)
+    SELECT tw.id, COALESCE(tw.day_note, ''), p.project_name
+    FROM time_worked tw
+    LEFT JOIN projects p ON tw.project = p.id
+    WHERE tw.id > {int(after_id)}
+    """
+
+
+# Маркеры совпадений в highlight()/snippet(); заменяются на разметку в GUI
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+# Миграции схемы. Миграция с номером N (позиция в списке + 1) применяется,
+# если PRAGMA user_version базы меньше N; после неё user_version = N.
+MIGRATIONS = [
+    # 1: покрывающие индексы для выборок по дате, проекту и трекеру
+    (
+        """
+        CREATE INDEX IF NOT EXISTS idx_time_worked_date
+        ON time_worked (date, tracker, project, hours, minutes)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_time_worked_project
+        ON time_worked (project)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_billing_tracker_started
+        ON billing (tracker, started_at DESC, hour_cost)
+        """,
+    ),
+    # 2: итоги по дням, поддерживаемые триггерами
+    (
+        """
+        CREATE TABLE IF NOT EXISTS daily_totals (
+            date INTEGER NOT NULL,
+            tracker TEXT NOT NULL,
+            project INTEGER NOT NULL,
+            entries INTEGER NOT NULL DEFAULT (0),
+            total_minutes INTEGER NOT NULL DEFAULT (0),
+            cost REAL NOT NULL DEFAULT (0),
+            PRIMARY KEY (date, tracker, project)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_worked_insert_totals
+        AFTER INSERT ON time_worked
+        BEGIN
+            {_add_to_daily_totals_sql("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_worked_delete_totals
+        AFTER DELETE ON time_worked
+        BEGIN
+            {_remove_from_daily_totals_sql("OLD")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_worked_update_totals
+        AFTER UPDATE OF project, hours, minutes, tracker, date ON time_worked
+        BEGIN
+            {_remove_from_daily_totals_sql("OLD")}
+            {_add_to_daily_totals_sql("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_billing_insert_totals
+        AFTER INSERT ON billing
+        BEGIN
+            {_reprice_daily_totals_sql("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_billing_delete_totals
+        AFTER DELETE ON billing
+        BEGIN
+            {_reprice_daily_totals_sql("OLD")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_billing_update_totals
+        AFTER UPDATE ON billing
+        BEGIN
+            {_reprice_daily_totals_sql("OLD")}
+            {_reprice_daily_totals_sql("NEW")}
+        END
+        """,
+        *REBUILD_DAILY_TOTALS_SQL,
+    ),
+    # 3: запущенный таймер (не больше одного), время копится в строке time_worked
+    (
+        """
+        CREATE TABLE IF NOT EXISTS running_timer (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            entry INTEGER NOT NULL
+                REFERENCES time_worked (id) ON DELETE CASCADE,
+            started_at INTEGER NOT NULL,
+            base_minutes INTEGER NOT NULL DEFAULT (0)
+        )
+        """,
+    ),
+    # 4: полнотекстовый поиск по заметкам и названиям проектов
+    (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5 (
+            day_note, project_name,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_worked_insert_fts
+        AFTER INSERT ON time_worked
+        BEGIN
+            {_add_to_notes_fts_sql("NEW")}
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_time_worked_delete_fts
+        AFTER DELETE ON time_worked
+        BEGIN
+            DELETE FROM notes_fts WHERE rowid = OLD.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_time_worked_update_fts
+        AFTER UPDATE OF day_note, project ON time_worked
+        BEGIN
+            DELETE FROM notes_fts WHERE rowid = OLD.id;
+            {_add_to_notes_fts_sql("NEW")}
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_projects_rename_fts
+        AFTER UPDATE OF project_name ON projects
+        BEGIN
+            UPDATE notes_fts SET project_name = NEW.project_name
+            WHERE rowid IN (SELECT id FROM time_worked WHERE project = NEW.id);
+        END
+        """,
+        "DELETE FROM notes_fts",
+        index_notes_sql(),
+    ),
+    # 5: сводки по неделям и месяцам, поддерживаемые триггерами daily_totals
+    (
+        *(_rollup_table_sql(table) for table in ROLLUP_PERIODS),
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_totals_insert_rollups
+        AFTER INSERT ON daily_totals
+        BEGIN
+            {_add_to_rollups_sql("1", "NEW.total_minutes", "NEW.cost", "NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_totals_delete_rollups
+        AFTER DELETE ON daily_totals
+        BEGIN
+            {_add_to_rollups_sql("-1", "-OLD.total_minutes", "-OLD.cost", "OLD")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_totals_update_rollups
+        AFTER UPDATE OF total_minutes, cost ON daily_totals
+        BEGIN
+            {_add_to_rollups_sql(
+                "0",
+                "NEW.total_minutes - OLD.total_minutes",
+                "NEW.cost - OLD.cost",
+                "NEW",
+            )}
+        END
+        """,
+        *REBUILD_ROLLUPS_SQL,
+    ),
+    # 6: удаление из time_worked проверяет ссылку running_timer.entry
+    ("CREATE INDEX IF NOT EXISTS idx_running_timer_entry ON running_timer (entry)",),
+]
+
+
+def fts_query(text: str) -> str:
+    """
+    User input → FTS5 query: every word must match, a word ending with *
+    matches as a prefix ("tick*" finds "ticket"). Quotes make FTS5
+    operators in the input literal.
+    """
+    terms = []
+    for term in text.split():
+        word = term.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if term.endswith("*") else f'"{word}"')
+    return " ".join(terms)
+
+
+class RateResolver:
+    """
+    Эффективные ставки из таблицы billing.
+    Для каждого трекера хранит отсортированные по started_at массивы,
+    ставка на дату ищется двоичным поиском.
+    """
+
+    def __init__(self, billing_records: List[dict]):
+        self._started_at = {}
+        self._hour_costs = {}
+        for rec in sorted(
+            billing_records, key=lambda r: (r["tracker"], r["started_at"], r["id"])
+        ):
+            self._started_at.setdefault(rec["tracker"], []).append(rec["started_at"])
+            self._hour_costs.setdefault(rec["tracker"], []).append(rec["hour_cost"])
+
+    def rate_for(self, tracker: str, date_int: int) -> Optional[int]:
+        """
+        Returns the hour cost of the tracker in effect on date_int.
+        Dates before the first rate use the earliest known rate,
+        None if the tracker has no rates at all.
+        """
+        started_at = self._started_at.get(tracker)
+        if not started_at:
+            return None
+        index = bisect_right(started_at, date_int) - 1
+        return self._hour_costs[tracker][max(index, 0)]
+
+    def schedule(self, tracker: str) -> tuple:
+        """(started_at, hour_costs) of a tracker, sorted by start date."""
+        return self._started_at.get(tracker, []), self._hour_costs.get(tracker, [])
+
+
+@dataclass
+class DaySnapshot:
+    """Записи за один день и ставки трекеров, действующие в этот день."""
+
+    date_int: int
+    entries: List[dict]
+    rates: Dict[str, Optional[int]]
+
+
+@dataclass
+class NoteMatch:
+    """Найденная запись; в note и project_name совпадения между MATCH_START и MATCH_END."""
+
+    entry_id: int
+    date_int: int
+    tracker: str
+    hours: int
+    minutes: int
+    project_name: str
+    note: str
+
+
 class DatabaseManager:
     """
     Управляет подключением к SQLite и предоставляет методы
     для работы с таблицами приложения.
     """
 
+    # Настройки, применяемые один раз к каждому новому соединению
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA mmap_size = 134217728",
+        "PRAGMA foreign_keys = ON",
+    )
+
+    # Сколько последних дней держать в кэше снимков
+    DAY_CACHE_SIZE = 64
+    # До стольких совпадений поиск по заметкам ранжирует их по bm25
+    SEARCH_RANK_LIMIT = 5000
+
     def __init__(self, db_path: str = "WTBase.db"):
         self.db_path = db_path
+        # Долгоживущие соединения, по одному на поток: {thread id: connection}
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        # Кэш ставок, сбрасывается при изменении таблицы billing
+        self._rates = None
+        # LRU-кэш снимков дней: {date_int: (marker, DaySnapshot)}, где marker —
+        # change_marker() на момент чтения; снимок с другим маркером устарел
+        self._day_cache = OrderedDict()
+        self._day_cache_lock = threading.Lock()
+        # Счётчик записей через этот менеджер (для автоматических бэкапов)
+        self.change_count = 0
+        # Отдельное соединение только для PRAGMA data_version
+        self._version_conn = None
         self.init_database()
 
     def get_connection(self):
-        """Возвращает новое соединение с базой данных."""
-        return sqlite3.connect(self.db_path)
+        """
+        Возвращает соединение текущего потока.
+        Соединение открывается и настраивается один раз, затем переиспользуется.
+        """
+        thread_id = threading.get_ident()
+        conn = self._connections.get(thread_id)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            with self._connections_lock:
+                self._connections[thread_id] = conn
+        return conn
+
+    def close(self):
+        """Закрывает все открытые соединения (вызывается при выходе из приложения)."""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            if self._version_conn is not None:
+                connections.append(self._version_conn)
+                self._version_conn = None
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Database error (close): {e}")
+
+    def data_version(self) -> int:
+        """
+        Returns PRAGMA data_version of a dedicated connection.
+        The value changes after any commit made by other connections,
+        including this manager's own per-thread connections and other processes.
+        """
+        if self._version_conn is None:
+            self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def change_marker(self) -> tuple:
+        """
+        Changes after any write to the database: (change_count, data_version()).
+        Cached results built under a different marker may be stale.
+        """
+        return self.change_count, self.data_version()
 
     def init_database(self):
         """Создаёт необходимые таблицы при первом запуске."""
@@ -64,6 +545,28 @@ class DatabaseManager:
 
             conn.commit()
 
+        self.migrate()
+
+    def migrate(self):
+        """
+        Применяет недостающие миграции из MIGRATIONS.
+        Каждая миграция выполняется в отдельной транзакции вместе
+        с обновлением PRAGMA user_version.
+        """
+        conn = self.get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            try:
+                conn.execute("BEGIN")
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"Database error (migration {number}): {e}")
+                raise
+
     def get_projects(self) -> List[str]:
         """
         Returns a list of project names from the projects table.
@@ -121,11 +624,103 @@ class DatabaseManager:
                     (tracker, started_at, hour_cost),
                 )
                 conn.commit()
+                self.change_count += 1
+                self._rates = None
+                self.invalidate_day()
                 return True
         except sqlite3.Error as e:
             print(f"Database error (add_billing_record): {e}")
             return False
 
+    def delete_billing_record(self, record_id: int) -> bool:
+        """
+        Deletes a billing record by its ID.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM billing WHERE id = ?", (record_id,))
+                conn.commit()
+                self.change_count += 1
+                self._rates = None
+                self.invalidate_day()
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Database error (delete_billing_record): {e}")
+            return False
+
+    def get_rates(self) -> RateResolver:
+        """
+        Returns the rate resolver built from the billing table.
+        The table is read once and cached until billing changes.
+        """
+        rates = self._rates
+        if rates is None:
+            rates = self._rates = RateResolver(self.get_billing())
+        return rates
+
+    def get_day_snapshot(self, date_int: int) -> DaySnapshot:
+        """
+        Returns entries and effective rates for a date.
+        Snapshots are kept in an LRU cache until the database changes,
+        including writes from other processes.
+        """
+        with self._day_cache_lock:
+            snapshot = self._cached_day(date_int)
+            if snapshot is not None:
+                self._day_cache.move_to_end(date_int)
+                return snapshot
+
+        # Маркер берётся до чтения: если запись произойдёт во время чтения,
+        # снимок не попадёт в кэш
+        marker = self.change_marker()
+        entries = self.get_time_worked_by_date(date_int)
+        rates = self.get_rates()
+        snapshot = DaySnapshot(
+            date_int=date_int,
+            entries=entries,
+            rates={
+                rec["tracker"]: rates.rate_for(rec["tracker"], date_int)
+                for rec in entries
+            },
+        )
+        with self._day_cache_lock:
+            if self.change_marker() == marker:
+                self._day_cache[date_int] = (marker, snapshot)
+                while len(self._day_cache) > self.DAY_CACHE_SIZE:
+                    self._day_cache.popitem(last=False)
+        return snapshot
+
+    def peek_day_snapshot(self, date_int: int) -> Optional[DaySnapshot]:
+        """Returns the cached snapshot of a date if it is still up to date."""
+        with self._day_cache_lock:
+            return self._cached_day(date_int)
+
+    def _cached_day(self, date_int: int) -> Optional[DaySnapshot]:
+        """Cached snapshot of a date, dropped if the database has changed since."""
+        cached = self._day_cache.get(date_int)
+        if cached is None:
+            return None
+        marker, snapshot = cached
+        if marker != self.change_marker():
+            del self._day_cache[date_int]
+            return None
+        return snapshot
+
+    def invalidate_day(self, date_int: Optional[int] = None):
+        """Drops the cached snapshot of a date, or of all dates if None."""
+        with self._day_cache_lock:
+            if date_int is None:
+                self._day_cache.clear()
+            else:
+                self._day_cache.pop(date_int, None)
+
+    def _get_entry_date(self, cursor, entry_id: int) -> Optional[int]:
+        """Returns the date of a time_worked entry."""
+        cursor.execute("SELECT date FROM time_worked WHERE id = ?", (entry_id,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+
     def get_time_worked_by_date(self, date_int: int) -> List[dict]:
         """
         Returns a list of time worked records for a specific date.
@@ -158,6 +753,174 @@ class DatabaseManager:
             print(f"Database error (get_time_worked_by_date): {e}")
             return []
 
+    def get_time_worked_by_range(self, start_int: int, end_int: int) -> List[dict]:
+        """
+        Returns time worked totals for every day in [start_int, end_int],
+        grouped by date, tracker and project, in a single query.
+        Reads the daily_totals summary, cost is already priced.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT dt.date, dt.tracker, p.project_name,
+                           dt.total_minutes / 60, dt.total_minutes % 60, dt.cost
+                    FROM daily_totals dt
+                    JOIN projects p ON dt.project = p.id
+                    WHERE dt.date BETWEEN ? AND ?
+                    ORDER BY dt.date, p.id, dt.tracker
+                """,
+                    (start_int, end_int),
+                )
+                rows = cursor.fetchall()
+                return [
+                    {
+                        "date": row[0],
+                        "tracker": row[1],
+                        "project_name": row[2],
+                        "hours": row[3],
+                        "minutes": row[4],
+                        "cost": row[5],
+                    }
+                    for row in rows
+                ]
+        except sqlite3.Error as e:
+            print(f"Database error (get_time_worked_by_range): {e}")
+            return []
+
+    def get_period_columns(self, start_int: int, end_int: int) -> tuple:
+        """
+        Returns the daily_totals rows of [start_int, end_int] as columns
+        (dates, trackers, project names, minutes), in the same order as
+        get_time_worked_by_range. Used by the vectorized period report.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT dt.date, dt.tracker, p.project_name, dt.total_minutes
+                    FROM daily_totals dt
+                    JOIN projects p ON dt.project = p.id
+                    WHERE dt.date BETWEEN ? AND ?
+                    ORDER BY dt.date, p.id, dt.tracker
+                """,
+                    (start_int, end_int),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    return [], [], [], []
+                return tuple(list(column) for column in zip(*rows))
+        except sqlite3.Error as e:
+            print(f"Database error (get_period_columns): {e}")
+            return [], [], [], []
+
+    def search_notes(self, text: str, limit: int = 50, offset: int = 0) -> tuple:
+        """
+        Full-text search over notes and project names.
+        Up to SEARCH_RANK_LIMIT matches are ordered by relevance (bm25); for
+        broader queries ranking every match is too slow, so the newest
+        entries come first and the count stops at SEARCH_RANK_LIMIT + 1.
+        Returns (number of matches, NoteMatch list of the page);
+        (0, []) for an empty query or on error.
+        """
+        query = fts_query(text)
+        if not query:
+            return 0, []
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT COUNT(*) FROM (
+                        SELECT rowid FROM notes_fts WHERE notes_fts MATCH ? LIMIT ?
+                    )
+                """,
+                    (query, self.SEARCH_RANK_LIMIT + 1),
+                )
+                total = cursor.fetchone()[0]
+                order = (
+                    "notes_fts.rank"
+                    if total <= self.SEARCH_RANK_LIMIT
+                    else "notes_fts.rowid DESC"
+                )
+                cursor.execute(
+                    f"""
+                    SELECT tw.id, tw.date, tw.tracker, tw.hours, tw.minutes,
+                           highlight(notes_fts, 1, :start, :end),
+                           snippet(notes_fts, 0, :start, :end, '…', 16)
+                    FROM notes_fts
+                    JOIN time_worked tw ON tw.id = notes_fts.rowid
+                    WHERE notes_fts MATCH :query
+                    ORDER BY {order}
+                    LIMIT :limit OFFSET :offset
+                """,
+                    {
+                        "query": query,
+                        "start": MATCH_START,
+                        "end": MATCH_END,
+                        "limit": limit,
+                        "offset": offset,
+                    },
+                )
+                return total, [NoteMatch(*row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Database error (search_notes): {e}")
+            return 0, []
+
+    def get_rollups(self, table: str, since: Optional[str] = None) -> List[dict]:
+        """
+        Returns the rows of a period summary (a table of ROLLUP_PERIODS),
+        from the period `since` (YYYY-MM-DD / YYYY-MM) on, ordered by period.
+        Each row: period, tracker, project_name, minutes, cost.
+        """
+        if table not in ROLLUP_PERIODS:
+            raise ValueError(f"Unknown rollup table: {table}")
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""
+                    SELECT r.period, r.tracker, p.project_name, r.total_minutes, r.cost
+                    FROM {table} r
+                    JOIN projects p ON r.project = p.id
+                    WHERE r.period >= ?
+                    ORDER BY r.period, p.id, r.tracker
+                """,
+                    (since or "",),
+                )
+                return [
+                    {
+                        "period": row[0],
+                        "tracker": row[1],
+                        "project_name": row[2],
+                        "minutes": row[3],
+                        "cost": row[4],
+                    }
+                    for row in cursor.fetchall()
+                ]
+        except sqlite3.Error as e:
+            print(f"Database error (get_rollups): {e}")
+            return []
+
+    def rebuild_daily_totals(self) -> bool:
+        """
+        Recomputes the daily_totals summary from time_worked,
+        and the weekly and monthly summaries from it.
+        Used to repair the summary if it ever gets out of sync.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                for statement in REBUILD_DAILY_TOTALS_SQL + REBUILD_ROLLUPS_SQL:
+                    cursor.execute(statement)
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error (rebuild_daily_totals): {e}")
+            return False
+
     def save_time_worked(
         self,
         project_id: int,
@@ -182,6 +945,8 @@ class DatabaseManager:
                     (project_id, hours, minutes, tracker, date_int, day_note),
                 )
                 conn.commit()
+                self.change_count += 1
+                self.invalidate_day(date_int)
                 return True
         except sqlite3.Error as e:
             print(f"Database error (save_time_worked): {e}")
@@ -202,6 +967,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                date_int = self._get_entry_date(cursor, entry_id)
                 cursor.execute(
                     """
                     UPDATE time_worked
@@ -211,6 +977,8 @@ class DatabaseManager:
                     (project_id, hours, minutes, tracker, day_note, entry_id),
                 )
                 conn.commit()
+                self.change_count += 1
+                self.invalidate_day(date_int)
                 return True
         except sqlite3.Error as e:
             print(f"Database error (update_time_worked): {e}")
@@ -223,13 +991,150 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                date_int = self._get_entry_date(cursor, entry_id)
                 cursor.execute("DELETE FROM time_worked WHERE id = ?", (entry_id,))
                 conn.commit()
+                self.change_count += 1
+                self.invalidate_day(date_int)
                 return True
         except sqlite3.Error as e:
             print(f"Database error (delete_time_worked): {e}")
             return False
 
+    def _get_running_timer(self, cursor) -> Optional[dict]:
+        cursor.execute(
+            """
+            SELECT rt.entry, rt.started_at, rt.base_minutes,
+                   tw.date, tw.tracker, tw.project, p.project_name
+            FROM running_timer rt
+            JOIN time_worked tw ON rt.entry = tw.id
+            LEFT JOIN projects p ON tw.project = p.id
+            """
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            "entry_id": row[0],
+            "started_at": row[1],
+            "base_minutes": row[2],
+            "date": row[3],
+            "tracker": row[4],
+            "project_id": row[5],
+            "project_name": row[6],
+        }
+
+    def start_timer(
+        self, project_id: int, tracker: str, date_int: int, started_at: int
+    ) -> Optional[dict]:
+        """
+        Starts the timer for a project and tracker on a date.
+        Time is added to the first entry of that project and tracker on the
+        date; the entry is created if there is none.
+        Returns the timer, or None on error or if a timer is already running.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, hours * 60 + minutes FROM time_worked
+                    WHERE date = ? AND project = ? AND tracker = ?
+                    ORDER BY id LIMIT 1
+                """,
+                    (date_int, project_id, tracker),
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(
+                        """
+                        INSERT INTO time_worked (project, hours, minutes, tracker, date, day_note)
+                        VALUES (?, 0, 0, ?, ?, '')
+                    """,
+                        (project_id, tracker, date_int),
+                    )
+                    row = (cursor.lastrowid, 0)
+                cursor.execute(
+                    """
+                    INSERT INTO running_timer (id, entry, started_at, base_minutes)
+                    VALUES (1, ?, ?, ?)
+                """,
+                    (row[0], started_at, row[1]),
+                )
+                timer = self._get_running_timer(cursor)
+                conn.commit()
+                self.change_count += 1
+                self.invalidate_day(date_int)
+                return timer
+        except sqlite3.Error as e:
+            print(f"Database error (start_timer): {e}")
+            return None
+
+    def resume_timer(self, started_at: int) -> Optional[dict]:
+        """
+        Returns the timer left running by the previous session (closed or
+        crashed), continuing from the time saved at its last checkpoint.
+        Time while the application was not running is not counted.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    UPDATE running_timer
+                    SET started_at = ?,
+                        base_minutes = (
+                            SELECT hours * 60 + minutes FROM time_worked
+                            WHERE id = running_timer.entry
+                        )
+                """,
+                    (started_at,),
+                )
+                timer = self._get_running_timer(cursor)
+                conn.commit()
+                return timer
+        except sqlite3.Error as e:
+            print(f"Database error (resume_timer): {e}")
+            return None
+
+    def checkpoint_timer(self, timer: dict, elapsed_minutes: int) -> bool:
+        """Saves the time of the running timer to its entry (one UPDATE)."""
+        try:
+            with self.get_connection() as conn:
+                conn.execute(
+                    "UPDATE time_worked SET hours = ?, minutes = ? WHERE id = ?",
+                    (
+                        *divmod(timer["base_minutes"] + elapsed_minutes, 60),
+                        timer["entry_id"],
+                    ),
+                )
+                conn.commit()
+                self.invalidate_day(timer["date"])
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error (checkpoint_timer): {e}")
+            return False
+
+    def stop_timer(self, timer: dict, elapsed_minutes: int) -> bool:
+        """Saves the final time of the running timer and removes it."""
+        try:
+            with self.get_connection() as conn:
+                conn.execute(
+                    "UPDATE time_worked SET hours = ?, minutes = ? WHERE id = ?",
+                    (
+                        *divmod(timer["base_minutes"] + elapsed_minutes, 60),
+                        timer["entry_id"],
+                    ),
+                )
+                conn.execute("DELETE FROM running_timer")
+                conn.commit()
+                self.change_count += 1
+                self.invalidate_day(timer["date"])
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error (stop_timer): {e}")
+            return False
+
     def get_project_id_by_name(self, project_name: str) -> int:
         """
         Возвращает ID проекта по имени.
@@ -258,6 +1163,7 @@ class DatabaseManager:
                     (project_name.strip(),),
                 )
                 conn.commit()
+                self.change_count += 1
                 return True
         except sqlite3.IntegrityError:
             # UNIQUE constraint failed
@@ -278,6 +1184,9 @@ class DatabaseManager:
                     (new_name.strip(), project_id),
                 )
                 conn.commit()
+                self.change_count += 1
+                # Имя проекта входит в снимки дней
+                self.invalidate_day()
                 return cursor.rowcount > 0
         except sqlite3.IntegrityError:
             # UNIQUE constraint: another project with same name exists
@@ -301,6 +1210,8 @@ class DatabaseManager:
                 # Затем сам проект
                 cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
                 conn.commit()
+                self.change_count += 1
+                self.invalidate_day()
                 return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"Database error (delete_project): {e}")
@@ -319,41 +1230,147 @@ class DatabaseManager:
             return []
 
 
-def backup_database_to_zip(db_path: str, backup_dir: str = "backups") -> str | None:
+def snapshot_database(
+    db_path: str,
+    snapshot_path: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    """
+    Копирует базу в snapshot_path через SQLite backup API порциями
+    по BACKUP_PAGES_PER_STEP страниц и проверяет копию PRAGMA integrity_check.
+
+    :param progress: Необязательный колбэк progress(copied_pages, total_pages)
+    :return: Результат integrity_check ("ok")
+    :raises sqlite3.DatabaseError: Если копия не прошла проверку
+    """
+
+    def on_pages(status: int, remaining: int, total: int):
+        if progress is not None and total:
+            progress(total - remaining, total)
+
+    with closing(sqlite3.connect(db_path)) as src, closing(
+        sqlite3.connect(snapshot_path)
+    ) as dst:
+        src.backup(dst, pages=BACKUP_PAGES_PER_STEP, progress=on_pages)
+        check = dst.execute("PRAGMA integrity_check").fetchone()[0]
+    if check != "ok":
+        raise sqlite3.DatabaseError(f"integrity_check failed: {check}")
+    return check
+
+
+def backup_database_to_zip(
+    db_path: str,
+    backup_dir: str = "backups",
+    progress: Optional[Callable[[int, int], None]] = None,
+    compression: str = "deflate",
+    level: int = 6,
+) -> str | None:
     """
-    Создаёт ZIP-архив с копией SQLite-базы данных.
+    Создаёт архив с согласованной копией SQLite-базы данных.
+
+    Снимок делается через SQLite backup API порциями по BACKUP_PAGES_PER_STEP
+    страниц, поэтому запись в базу между порциями не блокируется, а данные
+    из WAL-журнала попадают в копию. Снимок проверяется
+    PRAGMA integrity_check и только затем сжимается.
 
     :param db_path: Путь к файлу базы данных (например, 'worktime.db')
     :param backup_dir: Директория для хранения резервных копий
+    :param progress: Необязательный колбэк progress(done, total), в процентах
+    :param compression: "deflate" — ZIP-архив, "zstd" — файл .db.zst
+        (нужен пакет zstandard, без него используется deflate)
+    :param level: Уровень сжатия (deflate 0-9, zstd 1-22)
     :return: Путь к созданному архиву или None при ошибке
     """
     if not os.path.exists(db_path):
         print(f"Ошибка: файл базы {db_path} не найден.")
         return None
 
+    # Нужны только для бэкапа — не замедляем запуск CLI
+    import tempfile
+    import zipfile
+
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            print("zstandard not installed, using deflate instead.")
+            print("Install with: pip install zstandard")
+            compression = "deflate"
+
     # Создаём папку для бэкапов, если её нет
     os.makedirs(backup_dir, exist_ok=True)
 
     # Генерируем имя архива с временной меткой
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-    archive_name = f"worktime_backup_{timestamp}.zip"
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    extension = ".db.zst" if compression == "zstd" else ".zip"
+    archive_name = f"worktime_backup_{timestamp}{extension}"
     archive_path = os.path.join(backup_dir, archive_name)
 
+    # Снимок базы во временном файле рядом с архивами
+    snapshot_fd, snapshot_path = tempfile.mkstemp(suffix=".db", dir=backup_dir)
+    os.close(snapshot_fd)
+
+    def report(percent: int):
+        if progress is not None:
+            progress(percent, 100)
+
+    def compress(snapshot, dst, total: int):
+        # Сжимаем снимок частями, сообщая о прогрессе
+        done = 0
+        while chunk := snapshot.read(BACKUP_CHUNK_SIZE):
+            dst.write(chunk)
+            done += len(chunk)
+            report(50 + int(done * 50 / total))
+
+    started = time.perf_counter()
     try:
-        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            # Добавляем сам файл БД
-            zipf.write(db_path, arcname=os.path.basename(db_path))
+        # Копирование страниц — первая половина работы
+        check = snapshot_database(
+            db_path, snapshot_path, lambda done, total: report(done * 50 // total)
+        )
+        report(50)
+
+        total = os.path.getsize(snapshot_path)
+        with open(snapshot_path, "rb") as snapshot:
+            if compression == "zstd":
+                compressor = zstandard.ZstdCompressor(level=level)
+                with open(archive_path, "wb") as archive, compressor.stream_writer(
+                    archive
+                ) as dst:
+                    compress(snapshot, dst, total)
+            else:
+                with zipfile.ZipFile(
+                    archive_path, "w", zipfile.ZIP_DEFLATED, compresslevel=level
+                ) as zipf:
+                    with zipf.open(
+                        os.path.basename(db_path), "w", force_zip64=True
+                    ) as dst:
+                        compress(snapshot, dst, total)
 
-            # Опционально: добавляем файл с метаданными
-            meta_content = f"""Backup created at: {datetime.now().isoformat()}
+                    # Опционально: добавляем файл с метаданными
+                    meta_content = f"""Backup created at: {datetime.now().isoformat()}
 Database file: {os.path.basename(db_path)}
 Source path: {os.path.abspath(db_path)}
+Integrity check: {check}
 """
-            zipf.writestr("backup_info.txt", meta_content)
+                    zipf.writestr("backup_info.txt", meta_content)
 
+        elapsed = time.perf_counter() - started
+        size_mb = total / (1024 * 1024)
         print(f"Резервная копия успешно создана: {archive_path}")
+        print(
+            f"{size_mb:.2f} MB за {elapsed:.2f} с "
+            f"({size_mb / elapsed if elapsed else 0:.2f} MB/s)"
+        )
         return archive_path
 
     except Exception as e:
         print(f"Ошибка при создании архива: {e}")
+        # Не оставляем недописанный архив
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
         return None
+
+    finally:
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
@@ -0,0 +1,278 @@
+"""
+Потоковый экспорт данных в CSV, JSON Lines и Parquet.
+
+Записи читаются курсором порциями по EXPORT_BATCH_SIZE строк (fetchmany)
+и сразу пишутся в файл, поэтому память не зависит от размера выборки.
+Parquet доступен, если установлен pyarrow.
+
+Usage: python export.py output.{csv,jsonl,parquet} [--from DATE] [--to DATE]
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+from datetime import date, datetime
+from typing import Callable, Iterator, List, Optional
+
+from database import DatabaseManager
+
+EXPORT_BATCH_SIZE = 5000
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+
+TIME_WORKED_COLUMNS = (
+    "id",
+    "date",
+    "project",
+    "tracker",
+    "hours",
+    "minutes",
+    "hour_cost",
+    "cost",
+    "note",
+)
+BILLING_COLUMNS = ("id", "tracker", "started_at", "hour_cost")
+
+
+def format_for_path(path: str) -> Optional[str]:
+    """Export format by file extension, None if unsupported."""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _iso_day(date_int: int) -> str:
+    return datetime.fromtimestamp(date_int).date().isoformat()
+
+
+def _range_filter(start_int: Optional[int], end_int: Optional[int]) -> tuple:
+    conditions, params = [], []
+    if start_int is not None:
+        conditions.append("tw.date >= ?")
+        params.append(start_int)
+    if end_int is not None:
+        conditions.append("tw.date <= ?")
+        params.append(end_int)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def count_rows(
+    db: DatabaseManager,
+    table: str = "time_worked",
+    start_int: Optional[int] = None,
+    end_int: Optional[int] = None,
+) -> int:
+    """Number of rows an export will write (used for progress)."""
+    if table == "billing":
+        query, params = "SELECT COUNT(*) FROM billing", []
+    else:
+        where, params = _range_filter(start_int, end_int)
+        query = f"SELECT COUNT(*) FROM time_worked tw {where}"
+    return db.get_connection().execute(query, params).fetchone()[0]
+
+
+def iter_time_worked(
+    db: DatabaseManager,
+    start_int: Optional[int] = None,
+    end_int: Optional[int] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[List[tuple]]:
+    """
+    Yields batches of time_worked rows in TIME_WORKED_COLUMNS order,
+    with the project name, the tracker rate on that day and the entry cost.
+    """
+    rates = db.get_rates()
+    where, params = _range_filter(start_int, end_int)
+    cursor = db.get_connection().execute(
+        f"""
+        SELECT tw.id, tw.date, p.project_name, tw.tracker,
+               tw.hours, tw.minutes, tw.day_note
+        FROM time_worked tw
+        LEFT JOIN projects p ON tw.project = p.id
+        {where}
+        ORDER BY tw.date, tw.id
+        """,
+        params,
+    )
+    try:
+        # Строки идут по датам: дату и ставки пересчитываем только при смене дня
+        current_date, day, day_rates = None, "", {}
+        while rows := cursor.fetchmany(batch_size):
+            batch = []
+            for entry_id, date_int, project, tracker, hours, minutes, note in rows:
+                if date_int != current_date:
+                    current_date, day, day_rates = date_int, _iso_day(date_int), {}
+                hour_cost = day_rates.get(tracker)
+                if hour_cost is None:
+                    hour_cost = day_rates[tracker] = (
+                        rates.rate_for(tracker, date_int) or 0
+                    )
+                batch.append(
+                    (
+                        entry_id,
+                        day,
+                        project,
+                        tracker,
+                        hours,
+                        minutes,
+                        hour_cost,
+                        round((hours * 60 + minutes) * hour_cost / 60, 2),
+                        note or "",
+                    )
+                )
+            yield batch
+    finally:
+        cursor.close()
+
+
+def iter_billing(
+    db: DatabaseManager, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[List[tuple]]:
+    """Yields batches of billing rows in BILLING_COLUMNS order."""
+    cursor = db.get_connection().execute(
+        "SELECT id, tracker, started_at, hour_cost FROM billing "
+        "ORDER BY tracker, started_at, id"
+    )
+    try:
+        while rows := cursor.fetchmany(batch_size):
+            yield [
+                (record_id, tracker, _iso_day(started_at), hour_cost)
+                for record_id, tracker, started_at, hour_cost in rows
+            ]
+    finally:
+        cursor.close()
+
+
+def _write_csv(batches, columns, output_path: str, on_batch: Callable):
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            on_batch(len(batch))
+
+
+def _write_jsonl(batches, columns, output_path: str, on_batch: Callable):
+    with open(output_path, "w", encoding="utf-8") as f:
+        for batch in batches:
+            f.writelines(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+                for row in batch
+            )
+            on_batch(len(batch))
+
+
+def _write_parquet(batches, columns, output_path: str, on_batch: Callable):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for batch in batches:
+            table = pa.Table.from_arrays(
+                [pa.array(values) for values in zip(*batch)], names=list(columns)
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            on_batch(len(batch))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export_records(
+    db: DatabaseManager,
+    output_path: str,
+    fmt: Optional[str] = None,
+    table: str = "time_worked",
+    start_int: Optional[int] = None,
+    end_int: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> int | None:
+    """
+    Экспортирует time_worked (за период [start_int, end_int]) или billing в файл.
+
+    :param fmt: "csv", "jsonl" или "parquet"; по умолчанию — по расширению файла
+    :param progress: Необязательный колбэк progress(done, total), в строках
+    :return: Количество выгруженных строк или None при ошибке
+    """
+    fmt = fmt or format_for_path(output_path)
+    if fmt not in WRITERS:
+        print(f"Unsupported export format: {fmt or output_path}")
+        return None
+    if fmt == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        print("Parquet export needs pyarrow. Install with: pip install pyarrow")
+        return None
+
+    if table == "billing":
+        columns, batches = BILLING_COLUMNS, iter_billing(db, batch_size)
+    else:
+        columns = TIME_WORKED_COLUMNS
+        batches = iter_time_worked(db, start_int, end_int, batch_size)
+
+    total = count_rows(db, table, start_int, end_int) if progress else 0
+    done = 0
+
+    def on_batch(rows: int):
+        nonlocal done
+        done += rows
+        if progress is not None:
+            progress(done, total)
+
+    try:
+        WRITERS[fmt](batches, columns, output_path, on_batch)
+        print(f"Exported {done} rows to {output_path}")
+        return done
+    except Exception as e:
+        print(f"Ошибка при экспорте: {e}")
+        # Не оставляем недописанный файл
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return None
+    finally:
+        batches.close()
+
+
+def parse_day(value: str) -> int:
+    """YYYY-MM-DD → Unix timestamp начала дня."""
+    day = date.fromisoformat(value)
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export work time records")
+    parser.add_argument("output", help="Output file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--db", default="WTBase.db")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="Output format")
+    parser.add_argument(
+        "--table", choices=("time_worked", "billing"), default="time_worked"
+    )
+    parser.add_argument("--from", dest="start", type=parse_day, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=parse_day, help="YYYY-MM-DD")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    try:
+        exported = export_records(
+            db,
+            args.output,
+            args.format,
+            args.table,
+            args.start,
+            args.end,
+            batch_size=args.batch_size,
+        )
+    finally:
+        db.close()
+    if exported is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
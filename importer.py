@@ -0,0 +1,317 @@
+"""
+Массовый импорт записей времени из CSV и JSON Lines.
+
+Файл читается построчно, строки пачками по IMPORT_BATCH_SIZE попадают
+через executemany во временную таблицу, а в time_worked переносятся
+одним INSERT ... SELECT. Весь импорт — одна транзакция. Повторы по
+(date, project, tracker, note) — и в самом файле, и уже в базе — пропускаются.
+При больших импортах индексы и триггеры time_worked снимаются на время
+вставки и пересоздаются в конце, daily_totals пересчитывается целиком,
+а новые записи добавляются в полнотекстовый индекс notes_fts.
+
+Понимает файлы из export.py, а также колонки project_name, day_note,
+description, дробные часы (1.5) и даты YYYY-MM-DD, DD.MM.YYYY или Unix time.
+
+Usage: python importer.py input.{csv,jsonl} [--db WTBase.db] [--tracker UpWork]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from database import REBUILD_DAILY_TOTALS_SQL, DatabaseManager, index_notes_sql
+
+IMPORT_BATCH_SIZE = 5000
+# С этого числа новых строк индексы и триггеры снимаются на время вставки
+DEFER_INDEXES_MIN_ROWS = 10_000
+FORMATS = {".csv": "csv", ".jsonl": "jsonl"}
+
+# Имена колонок во входных файлах: {поле: допустимые заголовки}
+COLUMN_ALIASES = {
+    "date": ("date", "day"),
+    "project": ("project", "project_name"),
+    "tracker": ("tracker",),
+    "hours": ("hours",),
+    "minutes": ("minutes",),
+    "note": ("note", "day_note", "description", "memo"),
+}
+
+
+@dataclass
+class ImportResult:
+    read: int
+    inserted: int
+    duplicates: int
+    skipped: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def format_for_path(path: str) -> Optional[str]:
+    """Import format by file extension, None if unsupported."""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def parse_date(value) -> int:
+    """YYYY-MM-DD, DD.MM.YYYY or a Unix timestamp → start of that day."""
+    if isinstance(value, (int, float)) or str(value).strip().isdigit():
+        day = datetime.fromtimestamp(int(value)).date()
+    else:
+        value = str(value).strip()[:10]
+        if "." in value:
+            day = datetime.strptime(value, "%d.%m.%Y").date()
+        else:
+            day = date.fromisoformat(value)
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def _field(record: dict, name: str):
+    for alias in COLUMN_ALIASES[name]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _iter_records(f: io.TextIOBase, fmt: str) -> Iterator[dict]:
+    if fmt == "csv":
+        for record in csv.DictReader(f):
+            yield {(key or "").strip().lower(): value for key, value in record.items()}
+    else:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield {key.lower(): value for key, value in record.items()}
+
+
+class _ProjectIds:
+    """Project name → id, loaded once; unknown projects are created on first use."""
+
+    def __init__(self, cursor):
+        # Через cursor импорта: методы DatabaseManager делают commit
+        # на том же соединении и разорвали бы транзакцию импорта
+        self._cursor = cursor
+        self._ids: Dict[str, int] = {
+            name: project_id
+            for project_id, name in cursor.execute(
+                "SELECT id, project_name FROM projects"
+            )
+        }
+        self.created = 0
+
+    def get(self, name: str) -> int:
+        project_id = self._ids.get(name)
+        if project_id is None:
+            self._cursor.execute(
+                "INSERT INTO projects (project_name) VALUES (?)", (name,)
+            )
+            project_id = self._ids[name] = self._cursor.lastrowid
+            self.created += 1
+        return project_id
+
+
+def _defer_indexes(cursor) -> List[str]:
+    """Drops indexes and triggers of time_worked, returns their SQL to recreate."""
+    cursor.execute(
+        """
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = 'time_worked' AND type IN ('index', 'trigger')
+          AND sql IS NOT NULL
+        """
+    )
+    deferred = cursor.fetchall()
+    for kind, name, _ in deferred:
+        cursor.execute(f"DROP {kind.upper()} {name}")
+    return [sql for _, _, sql in deferred]
+
+
+def import_records(
+    db: DatabaseManager,
+    input_path: str,
+    fmt: Optional[str] = None,
+    tracker: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportResult | None:
+    """
+    Импортирует записи time_worked из файла одной транзакцией.
+
+    :param fmt: "csv" или "jsonl"; по умолчанию — по расширению файла
+    :param tracker: Трекер для строк без колонки tracker
+    :param progress: Необязательный колбэк progress(done, total), в процентах
+    :return: Итоги импорта или None при ошибке (база не меняется)
+    """
+    fmt = fmt or format_for_path(input_path)
+    if fmt not in ("csv", "jsonl"):
+        print(f"Unsupported import format: {fmt or input_path}")
+        return None
+
+    def report(percent: int):
+        if progress is not None:
+            progress(percent, 100)
+
+    started = time.perf_counter()
+    size = max(os.path.getsize(input_path), 1)
+    read = skipped = 0
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        conn.execute("BEGIN")
+        cursor.execute(
+            """
+            CREATE TEMP TABLE import_staging (
+                project INTEGER, hours INTEGER, minutes INTEGER,
+                tracker TEXT, date INTEGER, day_note TEXT
+            )
+            """
+        )
+        projects = _ProjectIds(cursor)
+
+        # Чтение файла — первые 80% работы
+        with open(input_path, "rb") as raw:
+            f = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            batch = []
+            for record in _iter_records(f, fmt):
+                read += 1
+                try:
+                    project = str(_field(record, "project") or "").strip()
+                    row_tracker = str(_field(record, "tracker") or tracker or "")
+                    if not project or not row_tracker.strip():
+                        raise ValueError("project and tracker are required")
+                    total_minutes = round(
+                        float(_field(record, "hours") or 0) * 60
+                        + float(_field(record, "minutes") or 0)
+                    )
+                    if total_minutes < 0:
+                        raise ValueError("negative time")
+                    date_int = parse_date(_field(record, "date"))
+                    row = (
+                        # Последним, чтобы не создать проект для битой строки
+                        projects.get(project),
+                        total_minutes // 60,
+                        total_minutes % 60,
+                        row_tracker.strip(),
+                        date_int,
+                        str(_field(record, "note") or "").strip(),
+                    )
+                except (TypeError, ValueError) as e:
+                    skipped += 1
+                    print(f"Skipped record {read}: {e}")
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    cursor.executemany(
+                        "INSERT INTO import_staging VALUES (?, ?, ?, ?, ?, ?)", batch
+                    )
+                    batch = []
+                    report(raw.tell() * 80 // size)
+            cursor.executemany(
+                "INSERT INTO import_staging VALUES (?, ?, ?, ?, ?, ?)", batch
+            )
+        report(80)
+
+        # Первая строка каждого ключа, которой ещё нет в базе
+        cursor.execute(
+            """
+            CREATE TEMP TABLE import_new AS
+            SELECT s.* FROM import_staging s
+            WHERE s.rowid IN (
+                SELECT MIN(rowid) FROM import_staging
+                GROUP BY date, project, tracker, day_note
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM time_worked tw
+                WHERE tw.date = s.date AND tw.tracker = s.tracker
+                  AND tw.project = s.project
+                  AND COALESCE(tw.day_note, '') = s.day_note
+            )
+            ORDER BY s.date
+            """
+        )
+        inserted = cursor.execute("SELECT COUNT(*) FROM import_new").fetchone()[0]
+        report(85)
+
+        # Вставленные записи получат id больше last_id
+        last_id = cursor.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM time_worked"
+        ).fetchone()[0]
+        deferred = _defer_indexes(cursor) if inserted >= DEFER_INDEXES_MIN_ROWS else []
+        cursor.execute(
+            """
+            INSERT INTO time_worked (project, hours, minutes, tracker, date, day_note)
+            SELECT project, hours, minutes, tracker, date, day_note FROM import_new
+            """
+        )
+        if deferred:
+            for statement in deferred:
+                cursor.execute(statement)
+            # Триггеры не видели вставку — пересчитываем сводку
+            # и добавляем новые записи в полнотекстовый индекс
+            for statement in REBUILD_DAILY_TOTALS_SQL:
+                cursor.execute(statement)
+            cursor.execute(index_notes_sql(last_id))
+        report(95)
+
+        staged = read - skipped
+        conn.commit()
+        db.change_count += 1
+        db.invalidate_day()
+        report(100)
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Ошибка при импорте: {e}")
+        return None
+    finally:
+        # Соединение потока живёт всю сессию: временные таблицы
+        # не должны мешать следующему импорту
+        for table in ("import_staging", "import_new"):
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    result = ImportResult(
+        read=read,
+        inserted=inserted,
+        duplicates=staged - inserted,
+        skipped=skipped,
+        seconds=time.perf_counter() - started,
+    )
+    print(
+        f"Imported {result.inserted} of {result.read} records "
+        f"({result.duplicates} duplicates, {result.skipped} skipped, "
+        f"{projects.created} new projects) "
+        f"in {result.seconds:.2f} s, {result.rows_per_sec:.0f} rows/s"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import work time records")
+    parser.add_argument("input", help="Input file (.csv or .jsonl)")
+    parser.add_argument("--db", default="WTBase.db")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())))
+    parser.add_argument("--tracker", help="Tracker for rows without one")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    try:
+        result = import_records(
+            db, args.input, args.format, args.tracker, batch_size=args.batch_size
+        )
+    finally:
+        db.close()
+    if result is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
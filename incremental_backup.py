@@ -0,0 +1,466 @@
+"""
+Инкрементальные резервные копии базы с дедупликацией.
+
+Снимок базы (SQLite backup API) режется на блоки по CHUNK_PAGES страниц.
+Каждый блок хранится один раз, сжатым, под именем своего SHA-256
+в backups/store/objects. Снимок описывается манифестом в
+backups/store/manifests — списком хэшей блоков. SQLite меняет страницы
+на месте, поэтому очередной бэкап записывает только изменённые блоки.
+Блоки сжимаются zlib (deflate) или zstd; при восстановлении кодек
+определяется по заголовку блока, так что в одном хранилище могут быть оба.
+
+Usage: python incremental_backup.py {backup,list,restore,prune} [options]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from database import snapshot_database
+
+DEFAULT_STORE_DIR = os.path.join("backups", "store")
+# Страниц SQLite в одном блоке хранилища
+CHUNK_PAGES = 16
+COMPRESS_LEVEL = 6
+# Первые байты кадра zstd; блоки zlib с них начинаться не могут
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+MANIFEST_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S"
+# Сколько ждать, пока другой бэкап или очистка освободят хранилище, с
+STORE_LOCK_TIMEOUT = 600
+
+# Политика хранения «дед-отец-сын» по умолчанию
+KEEP_DAILY = 7
+KEEP_WEEKLY = 4
+KEEP_MONTHLY = 12
+
+
+def _objects_dir(store_dir: str) -> str:
+    return os.path.join(store_dir, "objects")
+
+
+def _manifests_dir(store_dir: str) -> str:
+    return os.path.join(store_dir, "manifests")
+
+
+def _object_path(store_dir: str, digest: str) -> str:
+    return os.path.join(_objects_dir(store_dir), digest[:2], digest)
+
+
+def _read_manifest(manifest_path: str) -> dict:
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_backups(store_dir: str = DEFAULT_STORE_DIR) -> List[str]:
+    """Returns manifest paths, oldest first."""
+    manifests_dir = _manifests_dir(store_dir)
+    if not os.path.isdir(manifests_dir):
+        return []
+    return [
+        os.path.join(manifests_dir, name)
+        for name in sorted(os.listdir(manifests_dir))
+        if name.endswith(".json")
+    ]
+
+
+@contextmanager
+def _store_lock(store_dir: str):
+    """
+    Exclusive use of the store by one backup, restore or prune, across
+    threads and processes: an exclusive transaction on store/lock.db.
+    SQLite releases it when the process dies, so no stale lock is left.
+    Raises sqlite3.OperationalError after STORE_LOCK_TIMEOUT seconds.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    conn = sqlite3.connect(
+        os.path.join(store_dir, "lock.db"),
+        timeout=STORE_LOCK_TIMEOUT,
+        isolation_level=None,
+    )
+    try:
+        conn.execute("BEGIN EXCLUSIVE")
+        yield
+    finally:
+        conn.close()
+
+
+def _compressor(compression: str, level: int) -> Callable[[bytes], bytes]:
+    """Block compressor for "deflate" or "zstd" (deflate without zstandard)."""
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            print("zstandard not installed, using deflate instead.")
+            print("Install with: pip install zstandard")
+        else:
+            return zstandard.ZstdCompressor(level=level).compress
+    return lambda data: zlib.compress(data, level)
+
+
+def _decompress(data: bytes) -> bytes:
+    if data.startswith(ZSTD_MAGIC):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def create_incremental_backup(
+    db_path: str,
+    store_dir: str = DEFAULT_STORE_DIR,
+    progress: Optional[Callable[[int, int], None]] = None,
+    compression: str = "deflate",
+    level: int = COMPRESS_LEVEL,
+) -> str | None:
+    """
+    Делает снимок базы и сохраняет в хранилище только новые блоки.
+
+    Если снимок совпадает с последним манифестом, новый манифест
+    не создаётся и возвращается путь последнего.
+
+    :param progress: Необязательный колбэк progress(done, total), в процентах
+    :param compression: "deflate" или "zstd" (нужен пакет zstandard,
+        без него используется deflate)
+    :param level: Уровень сжатия новых блоков (deflate 0-9, zstd 1-22)
+    :return: Путь к манифесту или None при ошибке
+    """
+    try:
+        with _store_lock(store_dir):
+            return _create_backup(db_path, store_dir, progress, compression, level)
+    except sqlite3.OperationalError as e:
+        print(f"Хранилище бэкапов занято: {e}")
+        return None
+
+
+def _create_backup(
+    db_path: str,
+    store_dir: str,
+    progress: Optional[Callable[[int, int], None]],
+    compression: str,
+    level: int,
+) -> str | None:
+    """create_incremental_backup() for a caller that holds the store lock."""
+    if not os.path.exists(db_path):
+        print(f"Ошибка: файл базы {db_path} не найден.")
+        return None
+
+    os.makedirs(_objects_dir(store_dir), exist_ok=True)
+    os.makedirs(_manifests_dir(store_dir), exist_ok=True)
+
+    def report(percent: int):
+        if progress is not None:
+            progress(percent, 100)
+
+    compress = _compressor(compression, level)
+    snapshot_fd, snapshot_path = tempfile.mkstemp(suffix=".db", dir=store_dir)
+    os.close(snapshot_fd)
+    try:
+        # Снимок — первая половина работы, запись блоков — вторая
+        check = snapshot_database(
+            db_path, snapshot_path, lambda done, total: report(done * 50 // total)
+        )
+        with closing(sqlite3.connect(snapshot_path)) as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+
+        size = os.path.getsize(snapshot_path)
+        chunk_size = page_size * CHUNK_PAGES
+        chunks = []
+        new_chunks = 0
+        stored_bytes = 0
+        with open(snapshot_path, "rb") as snapshot:
+            while chunk := snapshot.read(chunk_size):
+                digest = hashlib.sha256(chunk).hexdigest()
+                chunks.append(digest)
+                object_path = _object_path(store_dir, digest)
+                if not os.path.exists(object_path):
+                    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                    data = compress(chunk)
+                    # Пишем во временный файл, чтобы не оставить битый блок
+                    with open(object_path + ".tmp", "wb") as f:
+                        f.write(data)
+                    os.replace(object_path + ".tmp", object_path)
+                    new_chunks += 1
+                    stored_bytes += len(data)
+                report(50 + snapshot.tell() * 50 // max(size, 1))
+
+        backups = list_backups(store_dir)
+        if backups and _read_manifest(backups[-1])["chunks"] == chunks:
+            print("База не изменилась с последнего бэкапа.")
+            return backups[-1]
+
+        created_at = datetime.now()
+        manifest = {
+            "created_at": created_at.isoformat(timespec="seconds"),
+            "db_name": os.path.basename(db_path),
+            "source_path": os.path.abspath(db_path),
+            "page_size": page_size,
+            "chunk_pages": CHUNK_PAGES,
+            "size": size,
+            "integrity_check": check,
+            "chunks": chunks,
+        }
+        manifest_name = f"{created_at.strftime(MANIFEST_TIME_FORMAT)}.json"
+        manifest_path = os.path.join(_manifests_dir(store_dir), manifest_name)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        print(
+            f"Инкрементальный бэкап создан: {manifest_path} "
+            f"({new_chunks} из {len(chunks)} блоков новые, "
+            f"{stored_bytes / 1024:.1f} KB записано)"
+        )
+        return manifest_path
+
+    except Exception as e:
+        print(f"Ошибка при создании инкрементального бэкапа: {e}")
+        return None
+
+    finally:
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+
+def _release_database(path: str):
+    """
+    Prepares an existing database file to be replaced: raises
+    sqlite3.OperationalError if another connection has it open, otherwise
+    checkpoints it out of WAL mode and removes the -wal/-shm files, so
+    SQLite cannot replay a stale WAL into the restored file.
+    """
+    if os.path.exists(path):
+        # Выйти из WAL можно, только когда других соединений нет
+        with closing(sqlite3.connect(path, timeout=0)) as conn:
+            mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+        if mode != "delete":
+            raise sqlite3.OperationalError("database is in use")
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def restore_backup(
+    manifest_path: str, target_path: str, store_dir: str = DEFAULT_STORE_DIR
+) -> bool:
+    """
+    Собирает файл базы из блоков манифеста и проверяет его integrity_check.
+    Существующий target_path заменяется только после успешной проверки
+    и только если база не открыта (приложение нужно закрыть).
+    """
+    try:
+        manifest = _read_manifest(manifest_path)
+        restore_path = target_path + ".restore"
+        # Блоки не должна удалить очистка, идущая в это время
+        with _store_lock(store_dir), open(restore_path, "wb") as f:
+            for digest in manifest["chunks"]:
+                with open(_object_path(store_dir, digest), "rb") as chunk:
+                    data = _decompress(chunk.read())
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"Блок {digest} повреждён")
+                f.write(data)
+
+        with closing(sqlite3.connect(restore_path)) as conn:
+            check = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if check != "ok":
+            raise sqlite3.DatabaseError(f"integrity_check failed: {check}")
+
+        try:
+            _release_database(target_path)
+        except sqlite3.OperationalError as e:
+            raise sqlite3.OperationalError(
+                f"{target_path} is in use, close the application first ({e})"
+            )
+        os.replace(restore_path, target_path)
+        print(f"База восстановлена из {manifest_path} в {target_path}")
+        return True
+
+    except Exception as e:
+        print(f"Ошибка при восстановлении: {e}")
+        if os.path.exists(target_path + ".restore"):
+            os.remove(target_path + ".restore")
+        return False
+
+
+def select_retained(
+    created: List[datetime],
+    keep_daily: int = KEEP_DAILY,
+    keep_weekly: int = KEEP_WEEKLY,
+    keep_monthly: int = KEEP_MONTHLY,
+) -> set:
+    """
+    Returns the indexes of backups kept by the GFS policy: the newest backup
+    of each of the last keep_daily days, keep_weekly ISO weeks and
+    keep_monthly months. The newest backup is always kept.
+    """
+    if not created:
+        return set()
+    newest = max(created)
+    buckets = (
+        (keep_daily, lambda t: t.date(), newest.date() - timedelta(days=keep_daily)),
+        (
+            keep_weekly,
+            lambda t: t.isocalendar()[:2],
+            (newest - timedelta(weeks=keep_weekly)).isocalendar()[:2],
+        ),
+        (
+            keep_monthly,
+            lambda t: (t.year, t.month),
+            _months_back(newest, keep_monthly),
+        ),
+    )
+
+    keep = {created.index(newest)}
+    for count, bucket_of, oldest_excluded in buckets:
+        if count <= 0:
+            continue
+        newest_in_bucket = {}
+        for index, moment in enumerate(created):
+            bucket = bucket_of(moment)
+            if bucket <= oldest_excluded:
+                continue
+            best = newest_in_bucket.get(bucket)
+            if best is None or moment > created[best]:
+                newest_in_bucket[bucket] = index
+        keep.update(newest_in_bucket.values())
+    return keep
+
+
+def _months_back(moment: datetime, months: int) -> tuple:
+    month_index = moment.year * 12 + moment.month - 1 - months
+    return month_index // 12, month_index % 12 + 1
+
+
+def prune_backups(
+    store_dir: str = DEFAULT_STORE_DIR,
+    keep_daily: int = KEEP_DAILY,
+    keep_weekly: int = KEEP_WEEKLY,
+    keep_monthly: int = KEEP_MONTHLY,
+) -> int:
+    """
+    Удаляет манифесты вне политики хранения и блоки,
+    на которые больше не ссылается ни один манифест.
+
+    :return: Количество удалённых манифестов
+    """
+    with _store_lock(store_dir):
+        return _prune_backups(store_dir, keep_daily, keep_weekly, keep_monthly)
+
+
+def _prune_backups(
+    store_dir: str, keep_daily: int, keep_weekly: int, keep_monthly: int
+) -> int:
+    """prune_backups() for a caller that holds the store lock."""
+    # Блоки, записанные после начала очистки, могут принадлежать бэкапу,
+    # манифест которого ещё не записан
+    started = time.time()
+    backups = list_backups(store_dir)
+    created = [
+        datetime.strptime(os.path.basename(path)[:-5], MANIFEST_TIME_FORMAT)
+        for path in backups
+    ]
+    keep = select_retained(created, keep_daily, keep_weekly, keep_monthly)
+
+    removed = 0
+    referenced = set()
+    for index, path in enumerate(backups):
+        if index in keep:
+            referenced.update(_read_manifest(path)["chunks"])
+        else:
+            os.remove(path)
+            removed += 1
+
+    objects_dir = _objects_dir(store_dir)
+    if os.path.isdir(objects_dir):
+        for prefix in os.listdir(objects_dir):
+            prefix_dir = os.path.join(objects_dir, prefix)
+            for digest in os.listdir(prefix_dir):
+                path = os.path.join(prefix_dir, digest)
+                if (
+                    digest not in referenced
+                    and not digest.endswith(".tmp")
+                    and os.path.getmtime(path) < started
+                ):
+                    os.remove(path)
+    return removed
+
+
+def backup_and_prune(
+    db_path: str,
+    store_dir: str = DEFAULT_STORE_DIR,
+    progress: Optional[Callable[[int, int], None]] = None,
+    compression: str = "deflate",
+    level: int = COMPRESS_LEVEL,
+) -> str | None:
+    """
+    Creates an incremental backup, then applies the default retention policy,
+    holding the store lock for both.
+    """
+    try:
+        with _store_lock(store_dir):
+            manifest_path = _create_backup(
+                db_path, store_dir, progress, compression, level
+            )
+            if manifest_path is not None:
+                _prune_backups(store_dir, KEEP_DAILY, KEEP_WEEKLY, KEEP_MONTHLY)
+            return manifest_path
+    except sqlite3.OperationalError as e:
+        print(f"Хранилище бэкапов занято: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental database backups")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Backup store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup = subparsers.add_parser("backup", help="Create an incremental backup")
+    backup.add_argument("--db", default="WTBase.db")
+    backup.add_argument("--compression", choices=("deflate", "zstd"), default="deflate")
+    backup.add_argument("--level", type=int, default=COMPRESS_LEVEL)
+
+    subparsers.add_parser("list", help="List backups")
+
+    restore = subparsers.add_parser("restore", help="Restore a backup")
+    restore.add_argument("manifest", help="Manifest file or its timestamp")
+    restore.add_argument("target", help="Path of the restored database")
+
+    prune = subparsers.add_parser("prune", help="Apply the retention policy")
+    prune.add_argument("--daily", type=int, default=KEEP_DAILY)
+    prune.add_argument("--weekly", type=int, default=KEEP_WEEKLY)
+    prune.add_argument("--monthly", type=int, default=KEEP_MONTHLY)
+
+    args = parser.parse_args()
+    if args.command == "backup":
+        if (
+            create_incremental_backup(
+                args.db, args.store, compression=args.compression, level=args.level
+            )
+            is None
+        ):
+            raise SystemExit(1)
+    elif args.command == "list":
+        for path in list_backups(args.store):
+            manifest = _read_manifest(path)
+            print(f"{os.path.basename(path)[:-5]}  {manifest['size'] / 1024:10.1f} KB")
+    elif args.command == "restore":
+        manifest_path = args.manifest
+        if not os.path.exists(manifest_path):
+            manifest_path = os.path.join(
+                _manifests_dir(args.store), f"{args.manifest}.json"
+            )
+        if not restore_backup(manifest_path, args.target, args.store):
+            raise SystemExit(1)
+    elif args.command == "prune":
+        removed = prune_backups(args.store, args.daily, args.weekly, args.monthly)
+        print(f"Removed {removed} backups")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
+import time
+
+# Момент запуска: отсчёт для замера времени до первой отрисовки
+STARTED_AT = time.perf_counter()
+
 import sys
 import os
+from html import escape
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
     QTabWidget,
     QTextEdit,
+    QTextBrowser,
     QToolBar,
     QStatusBar,
     QMessageBox,
@@ -19,55 +26,546 @@ from PyQt6.QtWidgets import (
     QSpinBox,
     QComboBox,
     QLineEdit,
-    QPlainTextEdit,
+    QTableView,
+    QAbstractItemView,
+    QProgressDialog,
+    QInputDialog,
+    QTreeView,
+    QHeaderView,
+)
+from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QDate, QDateTime, QTimer
+
+import resources
+from charts import BarChart
+from database import (
+    MATCH_END,
+    MATCH_START,
+    TRACKERS,
+    DatabaseManager,
+    backup_database_to_zip,
+)
+from models import (
+    ComboBoxDelegate,
+    NoteDelegate,
+    PeriodReportModel,
+    ProjectListModel,
+    SpinBoxDelegate,
+    WorkDayModel,
 )
-from PyQt6.QtGui import QAction, QIcon
-from PyQt6.QtCore import Qt, QDate, QDateTime
+from reporting import (
+    dashboard,
+    day_cost,
+    format_minutes,
+    period_report_columns,
+    shift_report,
+)
+from workers import BackupScheduler, DbWorker, RunningTimer
+
+# Автоматические бэкапы: раз в час или после N записей, если база менялась.
+# Идут в инкрементальное хранилище, старые удаляются по политике GFS
+AUTO_BACKUP_INTERVAL_MINUTES = 60
+AUTO_BACKUP_EVERY_N_WRITES = 50
+# Сжатие новых блоков: "deflate" или "zstd" (нужен пакет zstandard)
+AUTO_BACKUP_COMPRESSION = "deflate"
+AUTO_BACKUP_LEVEL = 6
+
+# Пауза после смены дат периода перед пересчётом отчёта, мс
+PERIOD_DEBOUNCE_MS = 250
+
+# Результатов поиска по заметкам на странице и пауза после ввода, мс
+SEARCH_PAGE_SIZE = 50
+SEARCH_DEBOUNCE_MS = 300
+
+# Дашборд: {название: таблица сводок}, {название: сколько лет показывать}
+DASHBOARD_PERIODS = {"Weeks": "weekly_totals", "Months": "monthly_totals"}
+DASHBOARD_RANGES = {"Last year": 1, "Last 3 years": 3, "All time": None}
+
+# WORKTIME_STARTUP_TIMING=1: напечатать время до первой отрисовки и выйти
+STARTUP_TIMING = bool(os.environ.get("WORKTIME_STARTUP_TIMING"))
+
+
+class WorkDayTab(QScrollArea):
+    """
+    Вкладка рабочего дня: дата, таймер, таблица записей и итоги.
+    У каждой вкладки своя модель, таблица и дата, поэтому Save и Delete
+    работают со своей вкладкой, сколько бы их ни было открыто.
+    """
+
+    def __init__(self, app: "WorkTimeApp"):
+        super().__init__()
+        # Общие для всех вкладок: БД, проекты, фоновые задачи и таймер
+        self.app = app
+        self.db = app.db
+        self.projects = app.projects
+        self.timer = app.timer
+        # Загруженный день и время строки таймера, показанное в итогах
+        self.day_snapshot = None
+        self.day_timer_time = None
+        self.day_task_id = 0
+        self.setWidgetResizable(True)
+
+        content = QWidget()
+        layout = QVBoxLayout(content)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        date_label = QLabel("Дата:")
+        self.date_edit = QDateEdit()
+        self.date_edit.setDate(QDate.currentDate())
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDisplayFormat("dd.MM.yyyy")
+
+        self.date_indicator_label = QLabel("Today")
+        self.date_indicator_label.setStyleSheet("color: green; font-weight: bold;")
+        self.date_indicator_label.setVisible(True)
+
+        self.date_edit.dateChanged.connect(self.on_date_changed)
+        self.date_edit.dateChanged.connect(self.update_date_indicator)
+
+        date_layout = QHBoxLayout()
+        date_layout.addWidget(date_label)
+        date_layout.addWidget(self.date_edit)
+        date_layout.addWidget(self.date_indicator_label)
+        date_layout.addStretch()
+
+        layout.addLayout(date_layout)
+
+        # === Timer: time is added to the project's entry of the shown day ===
+        tracker_icons = resources.tracker_icons()
+        self.timer_project_combo = QComboBox()
+        self.timer_project_combo.setModel(self.projects)
+        self.timer_tracker_combo = QComboBox()
+        for tracker in TRACKERS:
+            self.timer_tracker_combo.addItem(tracker_icons.get(tracker), tracker)
+        self.timer_button = QPushButton()
+        self.timer_button.clicked.connect(self.toggle_timer)
+        self.timer_label = QLabel()
+        self.timer_label.setStyleSheet("font-weight: bold;")
+
+        timer_layout = QHBoxLayout()
+        timer_layout.addWidget(QLabel("Timer:"))
+        timer_layout.addWidget(self.timer_project_combo)
+        timer_layout.addWidget(self.timer_tracker_combo)
+        timer_layout.addWidget(self.timer_button)
+        timer_layout.addWidget(self.timer_label)
+        timer_layout.addStretch()
+        layout.addLayout(timer_layout)
+        layout.addSpacing(15)
+
+        # === Entries table, rows are filled by on_date_changed below ===
+        self.work_day_model = WorkDayModel(tracker_icons, self)
+        self.work_day_view = QTableView()
+        self.work_day_view.setModel(self.work_day_model)
+        self.work_day_view.setItemDelegateForColumn(
+            WorkDayModel.PROJECT, ComboBoxDelegate(self.projects, parent=self)
+        )
+        self.work_day_view.setItemDelegateForColumn(
+            WorkDayModel.HOURS, SpinBoxDelegate(0, 24, " ч", self)
+        )
+        self.work_day_view.setItemDelegateForColumn(
+            WorkDayModel.MINUTES, SpinBoxDelegate(0, 59, " мин", self)
+        )
+        self.work_day_view.setItemDelegateForColumn(
+            WorkDayModel.TRACKER,
+            ComboBoxDelegate(lambda: TRACKERS, tracker_icons, self),
+        )
+        self.work_day_view.setItemDelegateForColumn(
+            WorkDayModel.NOTE, NoteDelegate(self)
+        )
+        self.work_day_view.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.work_day_view.setSelectionMode(
+            QAbstractItemView.SelectionMode.SingleSelection
+        )
+        self.work_day_view.setEditTriggers(
+            QAbstractItemView.EditTrigger.DoubleClicked
+            | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.EditKeyPressed
+            | QAbstractItemView.EditTrigger.AnyKeyPressed
+        )
+        self.work_day_view.verticalHeader().setVisible(False)
+        self.work_day_view.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.work_day_view, 1)
+
+        # === Record buttons ===
+        buttons_layout = QHBoxLayout()
+        add_button = QPushButton("➕ new tracker or project")
+        add_button.clicked.connect(self.add_time_entry_row)
+        buttons_layout.addWidget(add_button)
+
+        save_button = QPushButton("💾 Save")
+        save_button.setToolTip("Save new and changed records")
+        save_button.clicked.connect(self.save_time_entries)
+        buttons_layout.addWidget(save_button)
+
+        delete_button = QPushButton("🗑️ Delete")
+        delete_button.setToolTip("Delete selected record")
+        delete_button.clicked.connect(self.delete_selected_time_entry)
+        buttons_layout.addWidget(delete_button)
+        buttons_layout.addStretch()
+        layout.addLayout(buttons_layout)
+
+        # === Total cost label ===
+        self.total_time_label = QLabel("Total time: 0ч 0м")
+        self.total_time_label.setStyleSheet(
+            "font-weight: bold; font-size: 12px; color: gray;"
+        )
+        layout.addWidget(self.total_time_label)
+
+        self.total_cost_label = QLabel("Total cost: ₽0.00")
+        self.total_cost_label.setStyleSheet(
+            "font-weight: bold; font-size: 14px; color: gray;"
+        )
+        layout.addWidget(self.total_cost_label)
+
+        # Packaging in a scrollable area
+        self.setWidget(content)
+
+    def add_time_entry_row(self):
+        """Adding a new row to the time entries."""
+        projects = self.projects.names()
+        self.work_day_model.add_empty_row(projects[0] if projects else "")
+
+    def reload(self):
+        """Reloads the shown day (after billing or projects changed)."""
+        self.on_date_changed(self.date_edit.date())
+
+    def toggle_timer(self):
+        """Starts the timer for the chosen project on the shown day, or stops it."""
+        if self.timer.is_running:
+            if not self.timer.stop():
+                QMessageBox.critical(self, "Error", "Failed to stop the timer.")
+            return
+        project_id = self.projects.project_id(self.timer_project_combo.currentText())
+        if project_id is None:
+            QMessageBox.warning(self, "Attention", "Choose a project for the timer.")
+            return
+        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
+        if not self.timer.start(
+            project_id, self.timer_tracker_combo.currentText(), date_int
+        ):
+            QMessageBox.critical(self, "Error", "Failed to start the timer.")
+
+    def show_timer_state(self):
+        """Shows the running timer (or its absence) in the work day tab."""
+        timer = self.timer.timer
+        running = timer is not None
+        self.timer_button.setText("■ Stop" if running else "▶ Start")
+        self.timer_project_combo.setEnabled(not running)
+        self.timer_tracker_combo.setEnabled(not running)
+        if running:
+            self.timer_project_combo.setCurrentText(timer["project_name"] or "")
+            self.timer_tracker_combo.setCurrentText(timer["tracker"])
+            self.on_timer_tick(self.timer.elapsed())
+        else:
+            self.timer_label.setText("")
+
+    def on_timer_changed(self, timer: dict):
+        """The timer was started or stopped: its entry was created or saved."""
+        self.show_timer_state()
+        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
+        if timer["date"] == date_int:
+            self.on_date_changed(self.date_edit.date())
+
+    def on_timer_tick(self, seconds: int):
+        """Updates only the timer label, and the totals when a minute passes."""
+        timer = self.timer.timer
+        minutes, secs = divmod(seconds, 60)
+        day = QDateTime.fromSecsSinceEpoch(timer["date"]).toString("dd.MM")
+        self.timer_label.setText(
+            f"{minutes // 60}:{minutes % 60:02d}:{secs:02d} ({day})"
+        )
+
+        snapshot = self.day_snapshot
+        if snapshot is None or snapshot.date_int != timer["date"]:
+            return
+        hours, minutes = divmod(self.timer.total_minutes(), 60)
+        if self.day_timer_time == (hours, minutes):
+            return
+        self.day_timer_time = (hours, minutes)
+        self.work_day_model.set_entry_time(timer["entry_id"], hours, minutes)
+        entries = [
+            (
+                dict(entry, hours=hours, minutes=minutes)
+                if entry["id"] == timer["entry_id"]
+                else entry
+            )
+            for entry in snapshot.entries
+        ]
+        self.show_day_totals(entries, snapshot.rates)
+
+    def update_date_indicator(self, date: QDate):
+        """Update the date indicator label based on selected date."""
+        current_date = QDate.currentDate()
+
+        if date == current_date:
+            self.date_indicator_label.setText("Today")
+            self.date_indicator_label.setStyleSheet("color: green; font-weight: bold;")
+            self.date_indicator_label.setVisible(True)
+        elif date > current_date:
+            self.date_indicator_label.setText("Future")
+            self.date_indicator_label.setStyleSheet(
+                "color: #800000; font-weight: bold;"
+            )
+            self.date_indicator_label.setVisible(True)
+        else:
+            # Для прошедших дат скрываем индикатор
+            self.date_indicator_label.setVisible(False)
+
+    def on_date_changed(self, date: QDate):
+        """Updates the tab title and loads data for the selected date."""
+        # Update the tab title with the new date
+        tab_title = "Working hours " + date.toString("dd.MM.yyyy")
+        index = self.app.tabs.indexOf(self)
+        if index != -1:
+            self.app.tabs.setTabText(index, tab_title)
+
+        # Cached days are shown at once, others are loaded in the background.
+        # Fast date changes are coalesced: only the last date is loaded.
+        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
+        snapshot = self.db.peek_day_snapshot(date_int)
+        if snapshot is not None:
+            self.app.worker.cancel(self.day_task_id)
+            self.show_day_snapshot(snapshot)
+        else:
+            self.day_task_id = self.app.worker.submit(
+                self.db.get_day_snapshot,
+                date_int,
+                # Своя задача у каждой вкладки: не отменяет загрузку других
+                key=f"work_day:{id(self)}",
+                on_result=self.show_day_snapshot,
+            )
+
+    def show_day_snapshot(self, snapshot):
+        """Shows the entries and totals of a loaded day."""
+        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
+        if snapshot.date_int != date_int:
+            # The date was changed while this day was loading
+            return
+
+        # Switching the date only resets the model
+        self.day_snapshot = snapshot
+        self.day_timer_time = None
+        self.work_day_model.set_entries(snapshot.entries)
+        if not snapshot.entries:
+            self.add_time_entry_row()
+        self.show_day_totals(snapshot.entries, snapshot.rates)
+        if self.timer.is_running:
+            # The snapshot may predate the timer's last minutes
+            self.on_timer_tick(self.timer.elapsed())
+
+    def show_day_totals(self, entries, rates):
+        """Updates the total time and cost labels of the work day."""
+        totals = day_cost(entries, rates)
+        cost, h, m = totals.cost, totals.hours, totals.minutes
+        if cost == 0:
+            self.total_cost_label.setStyleSheet(
+                "font-weight: bold; font-size: 14px; color: gray;"
+            )
+            self.total_time_label.setStyleSheet(
+                "font-weight: bold; font-size: 12px; color: gray;"
+            )
+        else:
+            self.total_cost_label.setStyleSheet(
+                "font-weight: bold; font-size: 14px; color: #2c6f2e;"
+            )
+
+            self.total_time_label.setStyleSheet(
+                "font-weight: bold; font-size: 12px; color: #2c6f2e;"
+            )
+
+        self.total_cost_label.setText(f"Total cost: ₽{cost:.2f}")
+        # self.total_time_label.setText(f"Total time: {h}ч {m}м")
+        base_text = f"Total time: {h}ч {m}м"
+
+        if h == 0 and m == 0:
+            self.total_time_label.setText(base_text)
+        else:
+            details = [f"{eh}ч {em}м" for eh, em in totals.entries]
+            details_str = ", ".join(details)
+
+            if details_str:
+                full_text = f"{base_text} \n({details_str})"
+            else:
+                full_text = base_text
+
+            self.total_time_label.setText(full_text)
+
+    def save_time_entries(self):
+        """Saves new and changed rows of the work-day table to the DB."""
+        timer = self.timer.timer
+        if timer is not None:
+            # Строка таймера сохраняется с текущим временем, а не с тем,
+            # что было при загрузке дня (если время не правили вручную)
+            self.work_day_model.set_entry_time(
+                timer["entry_id"], *divmod(self.timer.total_minutes(), 60)
+            )
+        entries = self.work_day_model.dirty_entries()
+        if not entries:
+            QMessageBox.information(self, "Info", "No changes to save.")
+            return
 
-from database import DatabaseManager, backup_database_to_zip
+        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
+        for entry in entries:
+            project_name = entry["project_name"]
+            project_id = self.projects.project_id(project_name)
+            if project_id is None:
+                QMessageBox.critical(
+                    self, "Error", f"Project '{project_name}' not found."
+                )
+                return
+
+            if "id" in entry:
+                success = self.db.update_time_worked(
+                    entry["id"],
+                    project_id,
+                    entry["hours"],
+                    entry["minutes"],
+                    entry["tracker"],
+                    entry["day_note"] or "",
+                )
+            else:
+                success = self.db.save_time_worked(
+                    project_id,
+                    entry["hours"],
+                    entry["minutes"],
+                    entry["tracker"],
+                    date_int,
+                    entry["day_note"] or "",
+                )
+            if not success:
+                QMessageBox.critical(self, "Error", "Failed to save record.")
+                self.on_date_changed(self.date_edit.date())
+                return
+
+        if timer is not None and any(
+            entry.get("id") == timer["entry_id"] for entry in entries
+        ):
+            # The running entry was edited: keep counting from the saved time
+            self.timer.rebase()
+        QMessageBox.information(self, "Success", "Records saved successfully!")
+        self.on_date_changed(self.date_edit.date())
 
+    def delete_selected_time_entry(self):
+        """Удаляет выбранную запись из БД."""
+        index = self.work_day_view.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(self, "Attention", "Select a record to delete.")
+            return
 
-def resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller"""
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
+        entry = self.work_day_model.entry(index.row())
+        if "id" not in entry:
+            # Запись ещё не сохранена — просто убираем строку
+            self.work_day_model.remove_row(index.row())
+            return
 
-    return os.path.join(base_path, relative_path)
+        reply = QMessageBox.question(
+            self,
+            "Confirm",
+            "Are you sure you want to delete this record?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            timer = self.timer.timer
+            if timer is not None and timer["entry_id"] == entry["id"]:
+                self.timer.stop()
+            success = self.db.delete_time_worked(entry["id"])
+            if success:
+                QMessageBox.information(self, "Success", "Record deleted successfully!")
+                self.on_date_changed(self.date_edit.date())
+            else:
+                QMessageBox.critical(self, "Error", "Failed to delete record.")
 
 
 class WorkTimeApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.period_report_label = None
-        self.total_cost_label = None
-        self.total_time_label = None
         self.setWindowTitle("Work time tracker")
         self.setMinimumSize(550, 400)
         self.minimumSize()
 
-        icon_path = resource_path("images/main_icon.png")
+        icon_path = resources.resource_path("images/main_icon.png")
         if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
+            self.setWindowIcon(resources.icon("images/main_icon.png"))
         else:
             print(f"Warning: Icon not found at {icon_path}")
 
-        self.db = DatabaseManager("WTBase.db")
+        # Created after the first paint, see finish_startup()
+        self.db = None
+        self.projects = None
+        self.backup_scheduler = None
+        self.timer = None
+        self.dashboard_widget = None
+        self._first_paint_done = False
+        # Runs DB queries, reports and backups off the GUI thread
+        self.worker = DbWorker(self)
+        self.day_task_id = 0
+        self.period_task_id = 0
 
         # === Central widget with tabs ===
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         self.setCentralWidget(self.tabs)
 
         self.create_menu()
         self.create_toolbar()
         self.setStatusBar(QStatusBar(self))
+        # Until finish_startup() opens the DB only Exit and About work
+        for action in self.db_actions:
+            action.setEnabled(False)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            # The window is on screen: open the DB and build the first tab
+            self._first_paint_done = True
+            if STARTUP_TIMING:
+                print(
+                    f"first paint: {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms"
+                )
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Opens the database and builds the first work day tab."""
+        self.db = DatabaseManager("WTBase.db")
+        # Shared by every project combo box
+        self.projects = ProjectListModel(self.db, self)
+
+        from incremental_backup import backup_and_prune
+
+        self.backup_scheduler = BackupScheduler(
+            self.db,
+            self.worker,
+            backup_and_prune,
+            AUTO_BACKUP_INTERVAL_MINUTES,
+            AUTO_BACKUP_EVERY_N_WRITES,
+            self,
+            compression=AUTO_BACKUP_COMPRESSION,
+            level=AUTO_BACKUP_LEVEL,
+        )
+        self.backup_scheduler.finished.connect(self.on_auto_backup_finished)
+        self.backup_scheduler.start()
+
+        # Project timer; a timer left running by the last session continues
+        self.timer = RunningTimer(self.db, self)
+        self.timer.ticked.connect(self.on_timer_tick)
+        self.timer.started.connect(self.on_timer_changed)
+        self.timer.stopped.connect(self.on_timer_changed)
 
         # Create the first tab by default
         self.new_work_day()
+        self.timer.restore()
+        for action in self.db_actions:
+            action.setEnabled(True)
+
+        if STARTUP_TIMING:
+            print(f"ready: {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms")
+            QTimer.singleShot(0, QApplication.quit)
 
     def create_menu(self):
         menubar = self.menuBar()
@@ -94,11 +592,63 @@ class WorkTimeApp(QMainWindow):
         period_cost_menu.triggered.connect(self.period_cost)
         file_menu.addAction(period_cost_menu)
 
+        dashboard_menu = QAction("&Dashboard", self)
+        dashboard_menu.setShortcut("Ctrl+D")
+        dashboard_menu.setStatusTip(
+            "Hours and revenue per week, month, project and tracker"
+        )
+        dashboard_menu.triggered.connect(self.open_dashboard)
+        file_menu.addAction(dashboard_menu)
+
+        search_menu = QAction("&Search notes", self)
+        search_menu.setShortcut("Ctrl+F")
+        search_menu.setStatusTip("Find work days by note or project name")
+        search_menu.triggered.connect(self.search_notes)
+        file_menu.addAction(search_menu)
+
+        export_menu = QAction("&Export…", self)
+        export_menu.setShortcut("Ctrl+E")
+        export_menu.setStatusTip("Export work records to CSV, JSON Lines or Parquet")
+        export_menu.triggered.connect(self.on_export_action)
+        file_menu.addAction(export_menu)
+
+        import_menu = QAction("&Import…", self)
+        import_menu.setStatusTip("Import work records from CSV or JSON Lines")
+        import_menu.triggered.connect(self.on_import_action)
+        file_menu.addAction(import_menu)
+
         backup_menu = QAction("&Backup", self)
         backup_menu.setShortcut("Ctrl+Shift+B")
         backup_menu.triggered.connect(self.on_backup_action)
         file_menu.addAction(backup_menu)
 
+        incremental_backup_menu = QAction("&Incremental backup", self)
+        incremental_backup_menu.setStatusTip(
+            "Store only changed pages and prune old backups"
+        )
+        incremental_backup_menu.triggered.connect(self.on_incremental_backup_action)
+        file_menu.addAction(incremental_backup_menu)
+
+        rebuild_totals_menu = QAction("&Rebuild totals", self)
+        rebuild_totals_menu.setStatusTip("Recompute daily totals from all records")
+        rebuild_totals_menu.triggered.connect(self.on_rebuild_totals_action)
+        file_menu.addAction(rebuild_totals_menu)
+
+        # Actions that need the database (see finish_startup)
+        self.db_actions = [
+            projects_config_menu,
+            billing_config_menu,
+            new_work_day_menu,
+            period_cost_menu,
+            dashboard_menu,
+            search_menu,
+            export_menu,
+            import_menu,
+            backup_menu,
+            incremental_backup_menu,
+            rebuild_totals_menu,
+        ]
+
         file_menu.addSeparator()
 
         exit_action = QAction("&Exit", self)
@@ -125,6 +675,7 @@ class WorkTimeApp(QMainWindow):
         period_cost_btn.setStatusTip("Calculate the cost for a period")
         period_cost_btn.triggered.connect(self.period_cost)
         toolbar.addAction(period_cost_btn)
+        self.db_actions += [new_work_day_btn, period_cost_btn]
 
     def refresh_billing_tab(self):
         """Refreshes the billing tab by recreating it."""
@@ -146,17 +697,26 @@ class WorkTimeApp(QMainWindow):
             row_widget.deleteLater()
             # Update the billing tab to reflect the new record
             # self.refresh_billing_tab()
-            self.on_date_changed(self.date_edit.date())
+            self.reload_work_days()
         else:
             QMessageBox.critical(self, "Error", "Failed to save record.")
 
-    def remove_billing_entry_row(self, row_widget):
-        """Delete a billing entry row from the UI."""
-        if self.billing_entries_layout.count() > 1:
-            self.billing_entries_layout.removeWidget(row_widget)
-            row_widget.deleteLater()
-        else:
-            QMessageBox.warning(self, "Attention", "At least one record should remain.")
+    def delete_billing_entry_row(self, record_id: int, row_widget):
+        """Deletes a billing record from the DB and its row from the UI."""
+        reply = QMessageBox.question(
+            self,
+            "Confirm",
+            "Are you sure you want to delete this billing record?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            success = self.db.delete_billing_record(record_id)
+            if success:
+                self.billing_entries_layout.removeWidget(row_widget)
+                row_widget.deleteLater()
+                self.reload_work_days()
+            else:
+                QMessageBox.critical(self, "Error", "Failed to delete record.")
 
     def add_billing_entry_row(self, record: dict = None):
         """Add a new row to the billing entries."""
@@ -166,7 +726,7 @@ class WorkTimeApp(QMainWindow):
         row_layout.setSpacing(8)
 
         tracker_combo = QComboBox()
-        tracker_combo.addItems(["LogWork", "UpWork"])
+        tracker_combo.addItems(TRACKERS)
         if record:
             tracker_combo.setCurrentText(record["tracker"])
 
@@ -208,7 +768,7 @@ class WorkTimeApp(QMainWindow):
             remove_btn.setFixedSize(30, 30)
             remove_btn.setToolTip("Delete record")
             remove_btn.clicked.connect(
-                lambda: self.remove_billing_entry_row(row_widget)
+                lambda: self.delete_billing_entry_row(record["id"], row_widget)
             )
             btn_widget = remove_btn
 
@@ -280,427 +840,63 @@ class WorkTimeApp(QMainWindow):
             "and calculate the payment for the time worked.",
         )
 
-    def remove_time_entry_row(self, row_widget):
-        """Удаляет указанную строку из интерфейса."""
-        if self.time_entries_layout.count() > 1:
-            self.time_entries_layout.removeWidget(row_widget)
-            row_widget.deleteLater()
-        else:
-            QMessageBox.warning(self, "Attention", "At least one record should be.")
-
-    def add_time_entry_row(self):
-        """Adding a new row to the time entries."""
-        self.add_time_entry_row_with_data()
-
     def new_work_day(self):
         """Create a new work day tab."""
-        # main container
+        tab = WorkDayTab(self)
+        index = self.tabs.addTab(
+            tab, "Working hours " + QDate.currentDate().toString("dd.MM.yyyy")
+        )
+        self.tabs.setCurrentIndex(index)
+        tab.show_timer_state()
+        tab.reload()
+        return tab
+
+    def work_day_tabs(self) -> list:
+        """Open work day tabs."""
+        return [
+            self.tabs.widget(index)
+            for index in range(self.tabs.count())
+            if isinstance(self.tabs.widget(index), WorkDayTab)
+        ]
+
+    def on_timer_tick(self, seconds: int):
+        for tab in self.work_day_tabs():
+            tab.on_timer_tick(seconds)
+
+    def on_timer_changed(self, timer: dict):
+        for tab in self.work_day_tabs():
+            tab.on_timer_changed(timer)
+
+    def reload_work_days(self):
+        """Reloads every open work day (rates or project names changed)."""
+        for tab in self.work_day_tabs():
+            tab.reload()
+
+    def period_cost(self):
+        """Open a new tab to calculate cost over a selected date range."""
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-
         content = QWidget()
         layout = QVBoxLayout(content)
         layout.setSpacing(10)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        date_label = QLabel("Дата:")
-        self.date_edit = QDateEdit()
-        self.date_edit.setDate(QDate.currentDate())
-        self.date_edit.setCalendarPopup(True)
-        self.date_edit.setDisplayFormat("dd.MM.yyyy")
-
-        self.date_indicator_label = QLabel("Today")
-        self.date_indicator_label.setStyleSheet("color: green; font-weight: bold;")
-        self.date_indicator_label.setVisible(True)
-
-        self.date_edit.dateChanged.connect(self.on_date_changed)
-        self.date_edit.dateChanged.connect(self.update_date_indicator)
+        layout.setContentsMargins(15, 15, 15, 15)
 
-        date_layout = QHBoxLayout()
-        date_layout.addWidget(date_label)
-        date_layout.addWidget(self.date_edit)
-        date_layout.addWidget(self.date_indicator_label)
-        date_layout.addStretch()
+        # === Date range selection ===
+        date_range_layout = QHBoxLayout()
 
-        layout.addLayout(date_layout)
-        layout.addSpacing(15)
+        start_label = QLabel("Start:")
+        self.period_start_edit = QDateEdit()
+        self.period_start_edit.setCalendarPopup(True)
+        self.period_start_edit.setDisplayFormat("dd.MM.yyyy")
 
-        self.time_entries_layout = QVBoxLayout()
-        self.time_entries_layout.setSpacing(8)
-        self.time_entries_widget = QWidget()
-        self.time_entries_widget.setLayout(self.time_entries_layout)
+        end_label = QLabel("End:")
+        self.period_end_edit = QDateEdit()
+        self.period_end_edit.setCalendarPopup(True)
+        self.period_end_edit.setDisplayFormat("dd.MM.yyyy")
 
-        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
-        records = self.db.get_time_worked_by_date(date_int)
-
-        if records:
-            for rec in records:
-                self.add_time_entry_row_with_data(rec)
-        else:
-            self.add_time_entry_row()
-
-        layout.addWidget(self.time_entries_widget)
-
-        # === Add record button ===
-        add_button = QPushButton("➕ new tracker or project")
-        add_button.clicked.connect(self.add_time_entry_row)
-        layout.addWidget(add_button)
-
-        # === Total cost label ===
-        self.total_time_label = QLabel("Total time: 0ч 0м")
-        self.total_time_label.setStyleSheet(
-            "font-weight: bold; font-size: 12px; color: gray;"
-        )
-        layout.addWidget(self.total_time_label)
-
-        self.total_cost_label = QLabel("Total cost: ₽0.00")
-        self.total_cost_label.setStyleSheet(
-            "font-weight: bold; font-size: 14px; color: gray;"
-        )
-        layout.addWidget(self.total_cost_label)
-
-        layout.addStretch()
-
-        # Packaging in a scrollable area
-        scroll.setWidget(content)
-
-        self.current_scroll_area = scroll
-
-        # Adding a new tab and setting it as the current one
-        index = self.tabs.addTab(
-            scroll, "Working hours " + QDate.currentDate().toString("dd.MM.yyyy")
-        )
-        self.tabs.setCurrentIndex(index)
-        self.on_date_changed(self.date_edit.date())
-
-    def update_date_indicator(self, date: QDate):
-        """Update the date indicator label based on selected date."""
-        current_date = QDate.currentDate()
-
-        if date == current_date:
-            self.date_indicator_label.setText("Today")
-            self.date_indicator_label.setStyleSheet("color: green; font-weight: bold;")
-            self.date_indicator_label.setVisible(True)
-        elif date > current_date:
-            self.date_indicator_label.setText("Future")
-            self.date_indicator_label.setStyleSheet(
-                "color: #800000; font-weight: bold;"
-            )
-            self.date_indicator_label.setVisible(True)
-        else:
-            # Для прошедших дат скрываем индикатор
-            self.date_indicator_label.setVisible(False)
-
-    def on_date_changed(self, date: QDate):
-        """Updates the tab title and loads data for the selected date."""
-        # Update the tab title with the new date
-        tab_title = "Working hours " + date.toString("dd.MM.yyyy")
-        index = self.tabs.indexOf(self.current_scroll_area)
-        if index != -1:
-            self.tabs.setTabText(index, tab_title)
-
-        # Load and display data for the selected date
-        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
-        records = self.db.get_time_worked_by_date(date_int)
-
-        # Clearing old rows before adding new ones
-        while self.time_entries_layout.count():
-            child = self.time_entries_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-        if records:
-            for rec in records:
-                self.add_time_entry_row_with_data(rec)
-        else:
-            self.add_time_entry_row()
-
-        cost, h, m, rows = self.calculate_daily_cost()
-        if cost == 0:
-            self.total_cost_label.setStyleSheet(
-                "font-weight: bold; font-size: 14px; color: gray;"
-            )
-            self.total_time_label.setStyleSheet(
-                "font-weight: bold; font-size: 12px; color: gray;"
-            )
-        else:
-            self.total_cost_label.setStyleSheet(
-                "font-weight: bold; font-size: 14px; color: #2c6f2e;"
-            )
-
-            self.total_time_label.setStyleSheet(
-                "font-weight: bold; font-size: 12px; color: #2c6f2e;"
-            )
-
-        self.total_cost_label.setText(f"Total cost: ₽{cost:.2f}")
-        # self.total_time_label.setText(f"Total time: {h}ч {m}м")
-        base_text = f"Total time: {h}ч {m}м"
-
-        if h == 0 and m == 0:
-            self.total_time_label.setText(base_text)
-        else:
-            details = [f"{row['h']}ч {row['m']}м" for row in rows]
-            details_str = ", ".join(details)
-
-            if details_str:
-                full_text = f"{base_text} \n({details_str})"
-            else:
-                full_text = base_text
-
-            self.total_time_label.setText(full_text)
-
-    def add_time_entry_row_with_data(self, data: dict = None):
-        """
-        Adds a row with data from the database or an empty row.
-        If data contains an 'id', then it is an existing record.
-        """
-        entry_container = QWidget()
-        entry_layout = QVBoxLayout(entry_container)
-        entry_layout.setContentsMargins(0, 0, 0, 0)
-        entry_layout.setSpacing(8)
-
-        row_widget = QWidget()
-        row_layout = QHBoxLayout(row_widget)
-        row_layout.setContentsMargins(0, 0, 0, 0)
-        row_layout.setSpacing(8)
-
-        project_combo = QComboBox()
-        project_combo.addItems(self.db.get_projects())
-        project_combo.setEditable(False)
-        if data and data.get("project_name"):
-            project_combo.setCurrentText(data["project_name"])
-
-        hours_spin = QSpinBox()
-        hours_spin.setRange(0, 24)
-        hours_spin.setSuffix(" ч")
-        hours_spin.setFixedWidth(80)
-        if data and data.get("hours") is not None:
-            hours_spin.setValue(int(data["hours"]))
-
-        minutes_spin = QSpinBox()
-        minutes_spin.setRange(0, 59)
-        minutes_spin.setSuffix(" мин")
-        minutes_spin.setFixedWidth(80)
-        if data and data.get("minutes") is not None:
-            minutes_spin.setValue(int(data["minutes"]))
-
-        tracker_combo = QComboBox()
-        tracker_combo.addItem(QIcon(resource_path("images/logWork.png")), "LogWork")
-        tracker_combo.addItem(QIcon(resource_path("images/upWork.png")), "UpWork")
-        tracker_combo.setEditable(False)
-        if data and data.get("tracker"):
-            tracker_combo.setCurrentText(data["tracker"])
-
-        row_layout.addWidget(project_combo)
-        row_layout.addWidget(hours_spin)
-        row_layout.addWidget(minutes_spin)
-        row_layout.addWidget(tracker_combo)
-
-        # Determine the type of button based on the data
-        if data and "id" in data:
-            # Существующая запись — кнопки Update и Delete
-            update_btn = QPushButton("🔄")
-            update_btn.setFixedSize(30, 30)
-            update_btn.setToolTip("Update this record")
-            update_btn.clicked.connect(
-                lambda: self.update_time_worked_entry(
-                    data["id"],
-                    project_combo.currentText(),
-                    hours_spin.value(),
-                    minutes_spin.value(),
-                    tracker_combo.currentText(),
-                    day_note_edit.toPlainText().strip(),
-                    row_widget,
-                )
-            )
-
-            delete_btn = QPushButton("🗑️")
-            delete_btn.setFixedSize(30, 30)
-            delete_btn.setToolTip("Delete record")
-            delete_btn.clicked.connect(
-                lambda: self.delete_time_worked_entry(data["id"], row_widget)
-            )
-
-            row_layout.addWidget(update_btn)
-            row_layout.addWidget(delete_btn)
-        else:
-            # Новая запись — кнопка Save
-            save_btn = QPushButton("💾")
-            save_btn.setFixedSize(30, 30)
-            save_btn.setToolTip("Save this record")
-            save_btn.clicked.connect(
-                lambda: self.save_new_time_worked_entry(
-                    project_combo.currentText(),
-                    hours_spin.value(),
-                    minutes_spin.value(),
-                    tracker_combo.currentText(),
-                    day_note_edit.toPlainText().strip(),
-                    row_widget,
-                )
-            )
-            row_layout.addWidget(save_btn)
-
-        row_layout.addStretch()
-        entry_layout.addWidget(row_widget)
-
-        note_label = QLabel("Note:")
-        note_label.setFixedWidth(40)
-
-        day_note_edit = QPlainTextEdit()
-        day_note_edit.setPlaceholderText("Note (optional)")
-        day_note_edit.setMaximumHeight(60)
-        day_note_edit.setTabChangesFocus(True)
-        if data and data.get("day_note"):
-            day_note_edit.setPlainText(data["day_note"])
-
-        note_layout = QHBoxLayout()
-        note_layout.addWidget(note_label)
-        note_layout.addWidget(day_note_edit)
-        note_layout.setContentsMargins(0, 0, 0, 0)
-        note_layout.setSpacing(8)
-
-        entry_layout.addLayout(note_layout)
-
-        self.time_entries_layout.addWidget(entry_container)
-
-    def save_new_time_worked_entry(
-        self,
-        project_name: str,
-        hours: int,
-        minutes: int,
-        tracker: str,
-        day_note: str,
-        row_widget,
-    ):
-        """Сохраняет новую запись в БД."""
-        # Получаем project_id по имени
-        project_id = self.db.get_project_id_by_name(project_name)
-        if project_id is None:
-            QMessageBox.critical(self, "Error", f"Project '{project_name}' not found.")
-            return
-
-        # Конвертируем дату в Unix timestamp
-        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
-
-        success = self.db.save_time_worked(
-            project_id, hours, minutes, tracker, date_int, day_note
-        )
-        if success:
-            QMessageBox.information(self, "Success", "Record saved successfully!")
-            self.time_entries_layout.removeWidget(row_widget)
-            row_widget.deleteLater()
-            self.on_date_changed(self.date_edit.date())
-        else:
-            QMessageBox.critical(self, "Error", "Failed to save record.")
-
-    def update_time_worked_entry(
-        self,
-        entry_id: int,
-        project_name: str,
-        hours: int,
-        minutes: int,
-        tracker: str,
-        day_note: str,
-        row_widget,
-    ):
-        """Обновляет существующую запись в БД."""
-        project_id = self.db.get_project_id_by_name(project_name)
-        if project_id is None:
-            QMessageBox.critical(self, "Error", f"Project '{project_name}' not found.")
-            return
-
-        success = self.db.update_time_worked(
-            entry_id, project_id, hours, minutes, tracker, day_note
-        )
-        if success:
-            QMessageBox.information(self, "Success", "Record updated successfully!")
-            self.on_date_changed(self.date_edit.date())
-        else:
-            QMessageBox.critical(self, "Error", "Failed to update record.")
-
-    def delete_time_worked_entry(self, entry_id: int, row_widget):
-        """Удаляет запись из БД."""
-        reply = QMessageBox.question(
-            self,
-            "Confirm",
-            "Are you sure you want to delete this record?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-        )
-        if reply == QMessageBox.StandardButton.Yes:
-            success = self.db.delete_time_worked(entry_id)
-            if success:
-                QMessageBox.information(self, "Success", "Record deleted successfully!")
-                self.time_entries_layout.removeWidget(row_widget)
-                row_widget.deleteLater()
-                self.on_date_changed(self.date_edit.date())
-            else:
-                QMessageBox.critical(self, "Error", "Failed to delete record.")
-
-    def calculate_daily_cost(self):
-        """Calculates total cost for the current date based on time entries and billing rates."""
-        date_int = self.date_edit.date().startOfDay().toSecsSinceEpoch()
-        time_records = self.db.get_time_worked_by_date(date_int)
-
-        # Получаем актуальные ставки: {tracker: hour_cost}
-        billing_rates = {}
-        for rec in self.db.get_billing():
-            # Берём самую свежую ставку для каждого трекера (по started_at DESC)
-            tracker = rec["tracker"]
-            if (
-                tracker not in billing_rates
-                or rec["started_at"] > billing_rates[tracker]["started_at"]
-            ):
-                billing_rates[tracker] = rec
-
-        total_cost = 0.0
-        total_hours = 0
-        total_minutes = 0
-        detailed_list = []
-
-        for rec in time_records:
-            tracker = rec["tracker"]
-            hours = rec["hours"] + rec["minutes"] / 60.0
-            rate_record = billing_rates.get(tracker)
-            if rate_record:
-                total_cost += hours * rate_record["hour_cost"]
-                total_hours += rec["hours"]
-                total_minutes += rec["minutes"]
-                detailed_list.append({"h": rec["hours"], "m": rec["minutes"]})
-
-        total_hours += total_minutes // 60
-        total_minutes = total_minutes % 60
-        return (
-            round(total_cost, 2),
-            total_hours,
-            total_minutes,
-            detailed_list,
-        )
-
-    def period_cost(self):
-        """Open a new tab to calculate cost over a selected date range."""
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        content = QWidget()
-        layout = QVBoxLayout(content)
-        layout.setSpacing(10)
-        layout.setContentsMargins(15, 15, 15, 15)
-
-        # === Date range selection ===
-        date_range_layout = QHBoxLayout()
-
-        start_label = QLabel("Start:")
-        self.period_start_edit = QDateEdit()
-        self.period_start_edit.setCalendarPopup(True)
-        self.period_start_edit.setDisplayFormat("dd.MM.yyyy")
-
-        end_label = QLabel("End:")
-        self.period_end_edit = QDateEdit()
-        self.period_end_edit.setCalendarPopup(True)
-        self.period_end_edit.setDisplayFormat("dd.MM.yyyy")
-
-        # Set defaults: end = today, start = Monday of previous week
-        today = QDate.currentDate()
-        self.period_end_edit.setDate(today)
+        # Set defaults: end = today, start = Monday of previous week
+        today = QDate.currentDate()
+        self.period_end_edit.setDate(today)
 
         # Find Monday of the previous week:
         # Go back 7 days to last week, then to its Monday
@@ -709,14 +905,33 @@ class WorkTimeApp(QMainWindow):
         prev_week_monday = last_monday.addDays(-7)
         self.period_start_edit.setDate(prev_week_monday)
 
-        # Connect to recalculate on change
-        self.period_start_edit.dateChanged.connect(self.update_period_report)
-        self.period_end_edit.dateChanged.connect(self.update_period_report)
+        # Recalculate once the dates stop changing (e.g. while spinning days)
+        self.period_timer = QTimer(self)
+        self.period_timer.setSingleShot(True)
+        self.period_timer.setInterval(PERIOD_DEBOUNCE_MS)
+        self.period_timer.timeout.connect(self.update_period_report)
+        self.period_start_edit.dateChanged.connect(self.period_timer.start)
+        self.period_end_edit.dateChanged.connect(self.period_timer.start)
+        # Last shown report, its range and the DB state it was built from
+        self.period_report = None
+        self.period_range = None
+        self.period_marker = None
 
         date_range_layout.addWidget(start_label)
         date_range_layout.addWidget(self.period_start_edit)
         date_range_layout.addWidget(end_label)
         date_range_layout.addWidget(self.period_end_edit)
+
+        self.period_cancel_button = QPushButton("Cancel")
+        self.period_cancel_button.setToolTip("Stop calculating the report")
+        self.period_cancel_button.clicked.connect(self.cancel_period_report)
+        self.period_cancel_button.setVisible(False)
+        date_range_layout.addWidget(self.period_cancel_button)
+
+        export_button = QPushButton("Export…")
+        export_button.setToolTip("Export records of the selected period")
+        export_button.clicked.connect(self.on_export_action)
+        date_range_layout.addWidget(export_button)
         date_range_layout.addStretch()
 
         layout.addLayout(date_range_layout)
@@ -729,7 +944,17 @@ class WorkTimeApp(QMainWindow):
         )
         layout.addWidget(self.period_report_label)
 
-        layout.addStretch()
+        # Days load while scrolling, entries of a day when it is expanded
+        self.period_model = PeriodReportModel(self)
+        self.period_tree = QTreeView()
+        self.period_tree.setModel(self.period_model)
+        self.period_tree.setUniformRowHeights(True)
+        self.period_tree.setAlternatingRowColors(True)
+        self.period_tree.header().setSectionResizeMode(
+            PeriodReportModel.DATE, QHeaderView.ResizeMode.Stretch
+        )
+        self.period_tree.header().setStretchLastSection(False)
+        layout.addWidget(self.period_tree, 1)
 
         scroll.setWidget(content)
         index = self.tabs.addTab(scroll, "Period Cost")
@@ -749,84 +974,322 @@ class WorkTimeApp(QMainWindow):
             )
             return
 
-        # Get all dates in range
-        current = QDate(start_date)
-        total_cost = 0.0
-        daily_lines = []
-        total_details = {}
-        total_lines = []
-
-        # Preload billing rates (most recent per tracker)
-        billing_rates = {}
-        for rec in self.db.get_billing():
-            tracker = rec["tracker"]
-            if (
-                tracker not in billing_rates
-                or rec["started_at"] > billing_rates[tracker]["started_at"]
-            ):
-                billing_rates[tracker] = rec
-
-        while current <= end_date:
-            date_int = current.startOfDay().toSecsSinceEpoch()
-            records = self.db.get_time_worked_by_date(date_int)
-
-            if records:
-                day_total = 0.0
-                day_details = []
-                for rec in records:
-                    hours = rec["hours"] + rec["minutes"] / 60.0
-                    rate_rec = billing_rates.get(rec["tracker"])
-                    cost = hours * rate_rec["hour_cost"] if rate_rec else 0
-                    day_total += cost
-                    proj = rec.get("project_name", "—")
-                    day_details.append(
-                        f"  • {proj} | {rec['tracker']} | {rec['hours']}ч {rec['minutes']}мин → ₽{cost:.2f}"
-                    )
-                    tracker = rec["tracker"]
-                    if tracker not in total_details:
-                        total_details[tracker] = {
-                            "hours": rec["hours"],
-                            "minutes": rec["minutes"],
-                        }
-                    else:
-                        total_details[tracker]["hours"] += rec["hours"]
-                        total_details[tracker]["minutes"] += rec["minutes"]
-
-                    if total_details[tracker]["minutes"] >= 60:
-                        additional_hours = total_details[tracker]["minutes"] // 60
-                        total_details[tracker]["hours"] += additional_hours
-                        total_details[tracker]["minutes"] = (
-                            total_details[tracker]["minutes"] % 60
-                        )
-
-                total_cost += day_total
-                date_str = current.toString("dd.MM.yyyy (ddd)")
-                daily_lines.append(f"<b>{date_str}</b>: ₽{day_total:.2f}")
-                daily_lines.extend(day_details)
-            else:
-                pass
-                # Optional: show empty days
-                # date_str = current.toString("dd.MM.yyyy (ddd)")
-                # daily_lines.append(f"<b>{date_str}</b>: no entries")
+        start_int = start_date.startOfDay().toSecsSinceEpoch()
+        end_int = end_date.startOfDay().toSecsSinceEpoch()
+
+        # Run in the background; a newer request replaces a pending one.
+        # If the data is unchanged, only days added at the edges are queried.
+        marker = self.db.change_marker()
+        base = self.period_report if marker == self.period_marker else None
+        self.period_report_label.setText("<i>Calculating…</i>")
+        self.period_cancel_button.setVisible(True)
+        self.period_task_id = self.worker.submit(
+            shift_report,
+            base,
+            self.period_range,
+            start_int,
+            end_int,
+            self.load_period_report,
+            key="period_report",
+            on_result=lambda report: self.show_period_report(
+                report, (start_int, end_int), marker
+            ),
+            on_error=lambda error: self.show_period_report(None),
+        )
 
-            current = current.addDays(1)
+    def cancel_period_report(self):
+        """Stops the running period report calculation."""
+        self.worker.cancel(self.period_task_id)
+        self.period_cancel_button.setVisible(False)
+        self.period_report_label.setText("<i>Calculation cancelled.</i>")
 
-        if daily_lines:
-            for total_tracker, time_details in total_details.items():
-                total_lines.append(
-                    f"{total_tracker}: {time_details['hours']}ч {time_details['minutes']}мин"
-                )
+    def load_period_report(self, start_int: int, end_int: int):
+        """Reads and totals the period (runs on the worker thread)."""
+        return period_report_columns(
+            *self.db.get_period_columns(start_int, end_int), self.db.get_rates()
+        )
+
+    def show_period_report(self, report_data, period_range=None, marker=None):
+        """Shows the totals header and the days of the calculated report."""
+        self.period_cancel_button.setVisible(False)
+        if report_data is None:
+            self.period_report = None
+            self.period_model.set_report(None)
+            self.period_report_label.setText("<b>Error:</b> Failed to load records.")
+            return
+        self.period_report = report_data
+        self.period_range = period_range
+        self.period_marker = marker
+
+        # Only the totals header is built here, days are shown by the tree
+        self.period_model.set_report(report_data)
+        if report_data.days:
+            total_lines = [
+                f"{tracker}: {format_minutes(minutes)}"
+                for tracker, minutes in report_data.tracker_minutes.items()
+            ]
             report = (
-                f"<h3>Total cost: ₽{total_cost:.2f}</h3>\n"
+                f"<h3>Total cost: ₽{report_data.total_cost:.2f}</h3>\n"
                 + "<br>".join(total_lines)
-                + "<br><br>"
-                + "<br>".join(daily_lines)
             )
         else:
             report = "<i>No work records found in the selected period.</i>"
 
         self.period_report_label.setText(report)
 
+    def search_notes(self):
+        """Open a tab to search notes and project names."""
+        content = QWidget()
+        layout = QVBoxLayout(content)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(
+            "Words to find in notes and project names (tick* for a prefix)"
+        )
+        self.search_edit.setClearButtonEnabled(True)
+        layout.addWidget(self.search_edit)
+
+        # Search once typing pauses, or at once on Enter
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(lambda: self.run_search(0))
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.search_edit.returnPressed.connect(lambda: self.run_search(0))
+        self.search_page = 0
+        self.search_total = 0
+
+        # Results link to their work day
+        self.search_results = QTextBrowser()
+        self.search_results.setOpenLinks(False)
+        self.search_results.anchorClicked.connect(
+            lambda url: self.open_work_day_at(int(url.path()))
+        )
+        layout.addWidget(self.search_results, 1)
+
+        pages_layout = QHBoxLayout()
+        self.search_prev_button = QPushButton("◀ Previous")
+        self.search_prev_button.clicked.connect(
+            lambda: self.run_search(self.search_page - 1)
+        )
+        self.search_next_button = QPushButton("Next ▶")
+        self.search_next_button.clicked.connect(
+            lambda: self.run_search(self.search_page + 1)
+        )
+        self.search_status_label = QLabel("")
+        pages_layout.addWidget(self.search_prev_button)
+        pages_layout.addWidget(self.search_status_label)
+        pages_layout.addWidget(self.search_next_button)
+        pages_layout.addStretch()
+        layout.addLayout(pages_layout)
+        self.search_prev_button.setEnabled(False)
+        self.search_next_button.setEnabled(False)
+
+        index = self.tabs.addTab(content, "Search")
+        self.tabs.setCurrentIndex(index)
+        self.search_edit.setFocus()
+
+    def run_search(self, page: int):
+        """Searches in the background and shows one page of results."""
+        self.search_timer.stop()
+        text = self.search_edit.text().strip()
+        if not text:
+            self.search_results.clear()
+            self.search_status_label.setText("")
+            self.search_prev_button.setEnabled(False)
+            self.search_next_button.setEnabled(False)
+            return
+        self.worker.submit(
+            self.db.search_notes,
+            text,
+            SEARCH_PAGE_SIZE,
+            page * SEARCH_PAGE_SIZE,
+            key="notes_search",
+            on_result=lambda result: self.show_search_results(page, *result),
+        )
+
+    def show_search_results(self, page: int, total: int, matches: list):
+        """Shows a page of search results with the matched words highlighted."""
+        self.search_page = page
+        self.search_total = total
+
+        def highlight(text):
+            return (
+                escape(text or "")
+                .replace(MATCH_START, '<span style="background-color: #fff59d;">')
+                .replace(MATCH_END, "</span>")
+            )
+
+        blocks = []
+        for match in matches:
+            day = QDateTime.fromSecsSinceEpoch(match.date_int).toString("dd.MM.yyyy")
+            time_text = format_minutes(match.hours * 60 + match.minutes)
+            note = highlight(match.note)
+            blocks.append(
+                f'<p><a href="day:{match.date_int}"><b>{day}</b></a> · '
+                f"{highlight(match.project_name)} · {match.tracker} · {time_text}"
+                + (f"<br>{note}" if note else "")
+                + "</p>"
+            )
+        self.search_results.setHtml(
+            "".join(blocks) or "<i>No matching records found.</i>"
+        )
+
+        first = page * SEARCH_PAGE_SIZE
+        if total > self.db.SEARCH_RANK_LIMIT:
+            count = f"more than {self.db.SEARCH_RANK_LIMIT} (newest first)"
+        else:
+            count = str(total)
+        self.search_status_label.setText(
+            f"{first + 1}–{first + len(matches)} of {count}" if matches else ""
+        )
+        self.search_prev_button.setEnabled(page > 0)
+        self.search_next_button.setEnabled(first + len(matches) < total)
+
+    def open_work_day_at(self, date_int: int):
+        """Shows the work day of a date, opening a work day tab if needed."""
+        tabs = self.work_day_tabs()
+        tab = tabs[-1] if tabs else self.new_work_day()
+        tab.date_edit.setDate(QDateTime.fromSecsSinceEpoch(date_int).date())
+        self.tabs.setCurrentWidget(tab)
+
+    def open_dashboard(self):
+        """Open a tab with charts of hours and revenue."""
+        index = self.tabs.indexOf(self.dashboard_widget)
+        if self.dashboard_widget is not None and index >= 0:
+            self.tabs.setCurrentIndex(index)
+            return
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        content = QWidget()
+        layout = QVBoxLayout(content)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        controls = QHBoxLayout()
+        self.dashboard_period_combo = QComboBox()
+        self.dashboard_period_combo.addItems(DASHBOARD_PERIODS)
+        self.dashboard_range_combo = QComboBox()
+        self.dashboard_range_combo.addItems(DASHBOARD_RANGES)
+        self.dashboard_metric_combo = QComboBox()
+        self.dashboard_metric_combo.addItems(["Hours", "Revenue"])
+        for combo in (self.dashboard_period_combo, self.dashboard_range_combo):
+            combo.currentIndexChanged.connect(self.update_dashboard)
+        # Switching hours/revenue only redraws the loaded data
+        self.dashboard_metric_combo.currentIndexChanged.connect(
+            lambda: self.show_dashboard(self.dashboard_data)
+        )
+        for label, combo in (
+            ("Group by:", self.dashboard_period_combo),
+            ("Range:", self.dashboard_range_combo),
+            ("Show:", self.dashboard_metric_combo),
+        ):
+            controls.addWidget(QLabel(label))
+            controls.addWidget(combo)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.dashboard_label = QLabel("")
+        layout.addWidget(self.dashboard_label)
+
+        self.dashboard_periods_chart = BarChart()
+        layout.addWidget(self.dashboard_periods_chart, 2)
+        breakdown = QHBoxLayout()
+        self.dashboard_projects_chart = BarChart("Projects")
+        self.dashboard_trackers_chart = BarChart("Trackers")
+        breakdown.addWidget(self.dashboard_projects_chart, 3)
+        breakdown.addWidget(self.dashboard_trackers_chart, 1)
+        layout.addLayout(breakdown, 1)
+
+        # Loaded data and the DB state it was read at
+        self.dashboard_data = None
+        self.dashboard_marker = None
+        scroll.setWidget(content)
+        index = self.tabs.addTab(scroll, "Dashboard")
+        self.tabs.setCurrentIndex(index)
+        self.dashboard_widget = scroll
+        self.update_dashboard()
+
+    def update_dashboard(self):
+        """Reads the weekly or monthly summaries in the background."""
+        table = DASHBOARD_PERIODS[self.dashboard_period_combo.currentText()]
+        years = DASHBOARD_RANGES[self.dashboard_range_combo.currentText()]
+        since = None
+        if years is not None:
+            first_day = QDate.currentDate().addYears(-years)
+            # Начало периода, в который попадает first_day
+            if table == "weekly_totals":
+                since = first_day.addDays(1 - first_day.dayOfWeek()).toString(
+                    "yyyy-MM-dd"
+                )
+            else:
+                since = first_day.toString("yyyy-MM")
+
+        self.dashboard_marker = self.db.change_marker()
+        self.dashboard_label.setText("<i>Loading…</i>")
+        self.worker.submit(
+            lambda: dashboard(self.db.get_rollups(table, since)),
+            key="dashboard",
+            on_result=self.show_dashboard,
+            on_error=lambda error: self.dashboard_label.setText(
+                f"<b>Error:</b> {escape(error)}"
+            ),
+        )
+
+    def show_dashboard(self, data):
+        """Draws the charts for the selected metric."""
+        self.dashboard_data = data
+        if data is None:
+            return
+        if self.dashboard_metric_combo.currentText() == "Hours":
+
+            def values(minutes, costs):
+                return [value / 60 for value in minutes]
+
+            def format_value(hours):
+                return f"{round(hours, 1):g} ч"
+
+        else:
+
+            def values(minutes, costs):
+                return list(costs)
+
+            def format_value(cost):
+                return f"₽{cost:,.0f}".replace(",", " ")
+
+        period = self.dashboard_period_combo.currentText().lower()
+        self.dashboard_periods_chart.set_title(f"By {period[:-1]}")
+        self.dashboard_periods_chart.set_data(
+            data.periods, values(data.period_minutes, data.period_costs), format_value
+        )
+        self.dashboard_projects_chart.set_data(
+            list(data.project_minutes),
+            values(data.project_minutes.values(), data.project_costs.values()),
+            format_value,
+        )
+        self.dashboard_trackers_chart.set_data(
+            list(data.tracker_minutes),
+            values(data.tracker_minutes.values(), data.tracker_costs.values()),
+            format_value,
+        )
+        self.dashboard_label.setText(
+            f"<b>Total:</b> {format_minutes(data.total_minutes)} · "
+            f"₽{data.total_cost:.2f}"
+            if data.periods
+            else "<i>No work records found in the selected range.</i>"
+        )
+
+    def on_tab_changed(self, index: int):
+        """Reloads the dashboard when it is shown again after data changed."""
+        widget = self.tabs.widget(index)
+        if widget is None or widget is not self.dashboard_widget:
+            return
+        if self.db.change_marker() != self.dashboard_marker:
+            self.update_dashboard()
+
     def projects_config(self):
         """Open a tab to manage projects."""
         scroll = QScrollArea()
@@ -918,7 +1381,7 @@ class WorkTimeApp(QMainWindow):
         if not name.strip():
             QMessageBox.warning(self, "Warning", "Project name cannot be empty.")
             return
-        success = self.db.add_project(name)
+        success = self.projects.add_project(name)
         if success:
             QMessageBox.information(self, "Success", "Project added successfully!")
             self.projects_entries_layout.removeWidget(row_widget)
@@ -934,10 +1397,11 @@ class WorkTimeApp(QMainWindow):
         if not new_name.strip():
             QMessageBox.warning(self, "Warning", "Project name cannot be empty.")
             return
-        success = self.db.update_project(proj_id, new_name)
+        success = self.projects.update_project(proj_id, new_name)
         if success:
             QMessageBox.information(self, "Success", "Project updated successfully!")
             self.refresh_projects_tab()
+            self.refresh_projects_in_combos()
         else:
             QMessageBox.critical(
                 self, "Error", "Failed to update project.\nName may already be in use."
@@ -951,7 +1415,11 @@ class WorkTimeApp(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
-            success = self.db.delete_project(proj_id)
+            # Записи проекта удаляются вместе с записью запущенного таймера
+            timer = self.timer.timer if self.timer is not None else None
+            if timer is not None and timer["project_id"] == proj_id:
+                self.timer.stop()
+            success = self.projects.delete_project(proj_id)
             if success:
                 QMessageBox.information(
                     self, "Success", "Project deleted successfully!"
@@ -972,18 +1440,177 @@ class WorkTimeApp(QMainWindow):
                 break
 
     def refresh_projects_in_combos(self):
-        """Optionally reload project lists in open work-day tabs (advanced)."""
-        # For simplicity, we skip dynamic update of other tabs.
-        # In real app, you might emit a signal or store references to combos.
-        pass
+        """Reloads the open work days after a project was renamed or deleted."""
+        # Combo boxes share self.projects and are already up to date,
+        # but table rows still show the old project names.
+        self.reload_work_days()
+
+    def closeEvent(self, event):
+        if self.timer is not None:
+            # The timer stays running and is resumed on the next start
+            self.timer.checkpoint()
+        if self.backup_scheduler is not None:
+            self.backup_scheduler.stop()
+        self.worker.shutdown()
+        if self.db is not None:
+            self.db.close()
+        super().closeEvent(event)
+
+    def on_rebuild_totals_action(self):
+        if self.db.rebuild_daily_totals():
+            QMessageBox.information(self, "Success", "Daily totals rebuilt.")
+        else:
+            QMessageBox.critical(self, "Error", "Failed to rebuild daily totals!")
 
-    def on_backup_action(self):
-        db_path = self.db.db_path
-        archive_path = backup_database_to_zip(db_path)
+    def on_auto_backup_finished(self, archive_path):
         if archive_path:
-            QMessageBox.information(self, "Success", f"Backup saved:\n{archive_path}")
+            self.statusBar().showMessage(f"Auto backup saved: {archive_path}", 10000)
         else:
-            QMessageBox.critical(self, "Error", "Failed to create backup!")
+            self.statusBar().showMessage("Auto backup failed!", 10000)
+
+    def on_backup_action(self):
+        self.start_backup(backup_database_to_zip)
+
+    def on_incremental_backup_action(self):
+        from incremental_backup import backup_and_prune
+
+        self.start_backup(backup_and_prune)
+
+    def on_export_action(self):
+        """Exports records of the open Period Cost range (or all) to a file."""
+        # Loaded on first use to keep startup fast
+        from export import export_records, format_for_path
+
+        start_int = end_int = None
+        period_open = getattr(self, "period_start_edit", None) is not None
+        try:
+            if period_open and self.period_start_edit.isVisibleTo(self):
+                start_int = (
+                    self.period_start_edit.date().startOfDay().toSecsSinceEpoch()
+                )
+                end_int = self.period_end_edit.date().startOfDay().toSecsSinceEpoch()
+        except RuntimeError:
+            # Вкладка периода уже закрыта
+            pass
+
+        output_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export records",
+            "worktime_export.csv",
+            "CSV (*.csv);;JSON Lines (*.jsonl);;Parquet (*.parquet)",
+        )
+        if not output_path:
+            return
+        if format_for_path(output_path) is None:
+            QMessageBox.warning(
+                self, "Export", "Use a .csv, .jsonl or .parquet file name."
+            )
+            return
+
+        def on_result(exported):
+            if exported is not None:
+                QMessageBox.information(
+                    self, "Success", f"Exported {exported} records to:\n{output_path}"
+                )
+            else:
+                QMessageBox.critical(self, "Error", "Failed to export records!")
+
+        self.run_with_progress(
+            "Export",
+            "Exporting records…",
+            on_result,
+            export_records,
+            self.db,
+            output_path,
+            start_int=start_int,
+            end_int=end_int,
+        )
+
+    def on_import_action(self):
+        """Imports work records from a CSV or JSON Lines file."""
+        from importer import import_records
+
+        input_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import records",
+            "",
+            "CSV or JSON Lines (*.csv *.jsonl)",
+        )
+        if not input_path:
+            return
+        tracker, ok = QInputDialog.getItem(
+            self, "Import", "Tracker for rows without one:", TRACKERS, 0, False
+        )
+        if not ok:
+            return
+
+        def on_result(result):
+            if result is None:
+                QMessageBox.critical(self, "Error", "Failed to import records!")
+                return
+            # Импорт мог добавить проекты и записи открытого дня
+            self.projects.reload()
+            self.refresh_projects_in_combos()
+            QMessageBox.information(
+                self,
+                "Success",
+                f"Imported {result.inserted} of {result.read} records.\n"
+                f"Duplicates: {result.duplicates}, skipped: {result.skipped}.\n"
+                f"{result.rows_per_sec:.0f} rows/s",
+            )
+
+        self.run_with_progress(
+            "Import",
+            "Importing records…",
+            on_result,
+            import_records,
+            self.db,
+            input_path,
+            tracker=tracker,
+        )
+
+    def start_backup(self, backup_func):
+        """Runs a backup function in the background with a progress dialog."""
+
+        def on_result(archive_path):
+            if archive_path:
+                QMessageBox.information(
+                    self, "Success", f"Backup saved:\n{archive_path}"
+                )
+            else:
+                QMessageBox.critical(self, "Error", "Failed to create backup!")
+
+        self.run_with_progress(
+            "Backup", "Creating backup…", on_result, backup_func, self.db.db_path
+        )
+
+    def run_with_progress(self, title, text, on_result, func, *args, **kwargs):
+        """
+        Runs func in the background with a cancellable progress dialog.
+        on_result gets the function result, or None on error.
+        """
+        progress_dialog = QProgressDialog(text, "Cancel", 0, 100, self)
+        progress_dialog.setWindowTitle(title)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+        progress_dialog.setValue(0)
+
+        def on_progress(done: int, total: int):
+            progress_dialog.setValue(int(done * 100 / total) if total else 100)
+
+        def on_done(result):
+            progress_dialog.close()
+            on_result(result)
+
+        task_id = self.worker.submit(
+            func,
+            *args,
+            on_result=on_done,
+            on_error=lambda error: on_done(None),
+            on_progress=on_progress,
+            **kwargs,
+        )
+        progress_dialog.canceled.connect(lambda: self.worker.cancel(task_id))
 
 
 if __name__ == "__main__":
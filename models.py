@@ -0,0 +1,433 @@
+from typing import Callable, Dict, List, Optional, Union
+
+from PyQt6.QtCore import (
+    QAbstractItemModel,
+    QAbstractTableModel,
+    QDateTime,
+    QModelIndex,
+    QStringListModel,
+    Qt,
+)
+from PyQt6.QtGui import QFont, QIcon
+from PyQt6.QtWidgets import (
+    QComboBox,
+    QPlainTextEdit,
+    QSpinBox,
+    QStyledItemDelegate,
+)
+
+from database import TRACKERS
+from reporting import PeriodReport, format_minutes
+
+
+class ProjectListModel(QStringListModel):
+    """
+    Каталог проектов в памяти: общий список для всех выпадающих списков
+    проектов и словарь имя → id. Загружается из БД один раз, дальше
+    обновляется по месту при добавлении, переименовании и удалении.
+    """
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self._db = db
+        self._ids: Dict[str, int] = {}
+        self.reload()
+
+    def reload(self):
+        """Reads all projects from the DB."""
+        projects = self._db.get_all_projects_with_ids()
+        self._ids = {proj["name"]: proj["id"] for proj in projects}
+        self.setStringList([proj["name"] for proj in projects])
+
+    def names(self) -> List[str]:
+        return self.stringList()
+
+    def project_id(self, name: str) -> Optional[int]:
+        """Returns the project ID by name without querying the DB."""
+        return self._ids.get(name)
+
+    def add_project(self, name: str) -> bool:
+        """Adds a project to the DB and appends it to the list."""
+        if not self._db.add_project(name):
+            return False
+        name = name.strip()
+        self._ids[name] = self._db.get_project_id_by_name(name)
+        row = self.rowCount()
+        self.insertRows(row, 1)
+        self.setData(self.index(row), name)
+        return True
+
+    def update_project(self, project_id: int, new_name: str) -> bool:
+        """Renames a project in the DB and in the list."""
+        if not self._db.update_project(project_id, new_name):
+            return False
+        old_name = self._name_by_id(project_id)
+        if old_name is None:
+            self.reload()
+            return True
+        new_name = new_name.strip()
+        del self._ids[old_name]
+        self._ids[new_name] = project_id
+        self.setData(self.index(self.names().index(old_name)), new_name)
+        return True
+
+    def delete_project(self, project_id: int) -> bool:
+        """Deletes a project from the DB and from the list."""
+        if not self._db.delete_project(project_id):
+            return False
+        name = self._name_by_id(project_id)
+        if name is not None:
+            del self._ids[name]
+            self.removeRows(self.names().index(name), 1)
+        return True
+
+    def _name_by_id(self, project_id: int) -> Optional[str]:
+        for name, known_id in self._ids.items():
+            if known_id == project_id:
+                return name
+        return None
+
+
+class WorkDayModel(QAbstractTableModel):
+    """
+    Таблица записей одного рабочего дня.
+    Строки — словари из DaySnapshot.entries; новые строки не имеют "id".
+    Изменённые пользователем строки помечаются как несохранённые.
+    """
+
+    PROJECT, HOURS, MINUTES, TRACKER, NOTE = range(5)
+    HEADERS = ["Project", "Hours", "Minutes", "Tracker", "Note"]
+    KEYS = ["project_name", "hours", "minutes", "tracker", "day_note"]
+
+    def __init__(self, tracker_icons: Dict[str, QIcon] = None, parent=None):
+        super().__init__(parent)
+        self._rows: List[dict] = []
+        # {номер строки: изменённые пользователем ключи}
+        self._dirty: Dict[int, set] = {}
+        self._tracker_icons = tracker_icons or {}
+
+    def set_entries(self, entries: List[dict]):
+        """Replaces all rows with the entries of another day."""
+        self.beginResetModel()
+        self._rows = [dict(entry) for entry in entries]
+        self._dirty = {}
+        self.endResetModel()
+
+    def add_empty_row(self, project_name: str = "", tracker: str = TRACKERS[0]):
+        """Appends an unsaved row with default values."""
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append(
+            {
+                "project_name": project_name,
+                "hours": 0,
+                "minutes": 0,
+                "tracker": tracker,
+                "day_note": "",
+            }
+        )
+        self.endInsertRows()
+
+    def remove_row(self, row: int):
+        """Removes a row from the model only (the DB is not touched)."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._dirty = {
+            (r if r < row else r - 1): keys
+            for r, keys in self._dirty.items()
+            if r != row
+        }
+        self.endRemoveRows()
+
+    def entry(self, row: int) -> dict:
+        return self._rows[row]
+
+    def set_entry_time(self, entry_id: int, hours: int, minutes: int):
+        """
+        Updates the time of a saved row (running timer) unless the user
+        edited its hours or minutes; other edits of the row are kept.
+        """
+        for row, entry in enumerate(self._rows):
+            if entry.get("id") == entry_id:
+                if not self._dirty.get(row, set()) & {"hours", "minutes"}:
+                    entry["hours"], entry["minutes"] = hours, minutes
+                    self.dataChanged.emit(
+                        self.index(row, self.HOURS), self.index(row, self.MINUTES)
+                    )
+                return
+
+    def dirty_entries(self) -> List[dict]:
+        """Rows changed by the user since the last set_entries()."""
+        return [self._rows[row] for row in sorted(self._dirty)]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return (
+            Qt.ItemFlag.ItemIsEnabled
+            | Qt.ItemFlag.ItemIsSelectable
+            | Qt.ItemFlag.ItemIsEditable
+        )
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        value = row.get(self.KEYS[column])
+
+        if role == Qt.ItemDataRole.EditRole:
+            return value
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.HOURS:
+                return f"{value or 0} ч"
+            if column == self.MINUTES:
+                return f"{value or 0} мин"
+            return value or ""
+        if role == Qt.ItemDataRole.DecorationRole and column == self.TRACKER:
+            return self._tracker_icons.get(value)
+        if role == Qt.ItemDataRole.ToolTipRole and column == self.NOTE:
+            return value or None
+        if role == Qt.ItemDataRole.FontRole and index.row() in self._dirty:
+            # Несохранённые изменения выделяем курсивом
+            font = QFont()
+            font.setItalic(True)
+            return font
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        row = self._rows[index.row()]
+        key = self.KEYS[index.column()]
+        if row.get(key) == value:
+            return False
+        row[key] = value
+        self._dirty.setdefault(index.row(), set()).add(key)
+        first = self.index(index.row(), 0)
+        last = self.index(index.row(), self.columnCount() - 1)
+        self.dataChanged.emit(first, last)
+        return True
+
+
+class PeriodReportModel(QAbstractItemModel):
+    """
+    Отчёт за период в виде дерева: дни → строки по проектам и трекерам.
+
+    Дни подгружаются порциями по DAY_BATCH при прокрутке, строки дня
+    создаются только при его раскрытии (canFetchMore/fetchMore), так что
+    отчёт за несколько лет открывается сразу.
+    """
+
+    DAY_BATCH = 200
+    DATE, TRACKER, TIME, COST = range(4)
+    HEADERS = ["Date / Project", "Tracker", "Time", "Cost"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._report: Optional[PeriodReport] = None
+        self._loaded_days = 0
+        # {номер дня: строки дня}, заполняется при раскрытии дня
+        self._lines: Dict[int, list] = {}
+
+    def set_report(self, report: Optional[PeriodReport]):
+        self.beginResetModel()
+        self._report = report
+        self._loaded_days = 0
+        self._lines = {}
+        self.endResetModel()
+
+    def _days(self) -> list:
+        return self._report.days if self._report is not None else []
+
+    # Дни — элементы верхнего уровня с internalId 0,
+    # у строк дня internalId = номер дня + 1.
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._loaded_days
+        if parent.internalId() == 0 and parent.column() == 0:
+            return len(self._lines.get(parent.row(), ()))
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._days())
+        if parent.internalId() == 0 and parent.column() == 0:
+            day = self._days()[parent.row()]
+            return day.end > day.start
+        return False
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return self._loaded_days < len(self._days())
+        if parent.internalId() == 0:
+            return parent.row() not in self._lines
+        return False
+
+    def fetchMore(self, parent):
+        if not parent.isValid():
+            first = self._loaded_days
+            last = min(first + self.DAY_BATCH, len(self._days())) - 1
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._loaded_days = last + 1
+            self.endInsertRows()
+        elif parent.internalId() == 0 and parent.row() not in self._lines:
+            lines = self._report.day_lines(self._days()[parent.row()])
+            self.beginInsertRows(parent, 0, len(lines) - 1)
+            self._lines[parent.row()] = lines
+            self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if index.internalId() == 0:
+            day = self._days()[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                if column == self.DATE:
+                    date = QDateTime.fromSecsSinceEpoch(day.date_int).date()
+                    return date.toString("dd.MM.yyyy (ddd)")
+                if column == self.TIME:
+                    return format_minutes(
+                        sum(self._report.minutes[day.start : day.end])
+                    )
+                if column == self.COST:
+                    return f"₽{day.cost:.2f}"
+                return None
+            if role == Qt.ItemDataRole.FontRole:
+                font = QFont()
+                font.setBold(True)
+                return font
+            return None
+
+        line = self._lines[index.internalId() - 1][index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.DATE:
+                return line.project_name
+            if column == self.TRACKER:
+                return line.tracker
+            if column == self.TIME:
+                return format_minutes(line.minutes)
+            return f"₽{line.cost:.2f}"
+        return None
+
+
+class ComboBoxDelegate(QStyledItemDelegate):
+    """
+    Редактор ячейки в виде выпадающего списка.
+    Элементы задаются функцией, возвращающей список строк,
+    или общей моделью, которую редактор подключает через setModel.
+    """
+
+    def __init__(
+        self,
+        items: Union[Callable[[], List[str]], QAbstractItemModel],
+        icons: Optional[Dict[str, QIcon]] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._items = items
+        self._icons = icons or {}
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        if isinstance(self._items, QAbstractItemModel):
+            combo.setModel(self._items)
+        else:
+            for text in self._items():
+                icon = self._icons.get(text)
+                if icon is not None:
+                    combo.addItem(icon, text)
+                else:
+                    combo.addItem(text)
+        # Сохраняем выбор сразу, не дожидаясь потери фокуса
+        combo.activated.connect(lambda: self.commitData.emit(combo))
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole) or "")
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+
+
+class SpinBoxDelegate(QStyledItemDelegate):
+    """Редактор ячейки в виде QSpinBox."""
+
+    def __init__(self, minimum: int, maximum: int, suffix: str = "", parent=None):
+        super().__init__(parent)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._suffix = suffix
+
+    def createEditor(self, parent, option, index):
+        spin = QSpinBox(parent)
+        spin.setRange(self._minimum, self._maximum)
+        spin.setSuffix(self._suffix)
+        return spin
+
+    def setEditorData(self, editor, index):
+        editor.setValue(int(index.data(Qt.ItemDataRole.EditRole) or 0))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.ItemDataRole.EditRole)
+
+
+class NoteDelegate(QStyledItemDelegate):
+    """Многострочный редактор заметки."""
+
+    def createEditor(self, parent, option, index):
+        edit = QPlainTextEdit(parent)
+        edit.setPlaceholderText("Note (optional)")
+        edit.setTabChangesFocus(True)
+        return edit
+
+    def updateEditorGeometry(self, editor, option, index):
+        # Даём редактору место под несколько строк
+        rect = option.rect
+        rect.setHeight(max(rect.height(), 60))
+        editor.setGeometry(rect)
+
+    def setEditorData(self, editor, index):
+        editor.setPlainText(index.data(Qt.ItemDataRole.EditRole) or "")
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.toPlainText().strip(), Qt.ItemDataRole.EditRole)
@@ -0,0 +1,405 @@
+"""
+Расчёт стоимости рабочего дня и отчёта за период.
+
+Чистые функции над обычными структурами данных, без Qt и без обращений
+к базе: их вызывают GUI, CLI и бенчмарки. Если установлен NumPy,
+отчёт за период по колонкам считается векторно.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+# С этого числа строк отчёт по умолчанию считается через NumPy;
+# на меньших периодах цикл быстрее импорта NumPy и подготовки массивов
+NUMPY_MIN_ROWS = 5000
+
+
+@lru_cache(maxsize=None)
+def numpy_module():
+    """NumPy if installed, else None. Imported on first use (keeps CLI start fast)."""
+    try:
+        import numpy
+    except ImportError:
+        # NumPy необязателен: без него работает обычный цикл
+        return None
+    return numpy
+
+
+def split_minutes(total_minutes: int) -> tuple:
+    """Minutes → (hours, minutes)."""
+    return divmod(total_minutes, 60)
+
+
+def format_minutes(total_minutes: int) -> str:
+    hours, minutes = split_minutes(total_minutes)
+    return f"{hours}ч {minutes}мин"
+
+
+@dataclass
+class DayCost:
+    """Итог одного дня: стоимость, время и время каждой оплачиваемой записи."""
+
+    cost: float
+    hours: int
+    minutes: int
+    # (hours, minutes) записей, у трекера которых есть ставка
+    entries: List[tuple] = field(default_factory=list)
+
+
+@dataclass
+class PeriodLine:
+    """Сумма по одному проекту и трекеру за день."""
+
+    tracker: str
+    project_name: str
+    minutes: int
+    cost: float
+
+
+@dataclass
+class PeriodDay:
+    date_int: int
+    cost: float
+    # Строки дня — позиции [start, end) в колонках PeriodReport
+    start: int
+    end: int
+
+
+@dataclass
+class PeriodReport:
+    """
+    Отчёт за период. Строки хранятся колонками, а PeriodLine создаются
+    только для запрошенного дня — так большой отчёт не плодит объекты.
+    """
+
+    days: List[PeriodDay]
+    total_cost: float
+    # {tracker: minutes} и {project: minutes} за весь период
+    tracker_minutes: Dict[str, int]
+    project_minutes: Dict[str, int]
+    trackers: List[str]
+    projects: List[str]
+    minutes: List[int]
+    costs: List[float]
+
+    @property
+    def total_minutes(self) -> int:
+        return sum(self.tracker_minutes.values())
+
+    def day_lines(self, day: PeriodDay) -> List[PeriodLine]:
+        return list(
+            map(
+                PeriodLine,
+                self.trackers[day.start : day.end],
+                self.projects[day.start : day.end],
+                self.minutes[day.start : day.end],
+                self.costs[day.start : day.end],
+            )
+        )
+
+
+def day_cost(entries: Iterable[dict], rates: Dict[str, Optional[int]]) -> DayCost:
+    """
+    Стоимость дня по записям DaySnapshot.entries и ставкам трекеров.
+    Записи трекеров без ставки не учитываются ни в стоимости, ни во времени.
+    """
+    total_cost = 0.0
+    total_minutes = 0
+    billed = []
+    for rec in entries:
+        hour_cost = rates.get(rec["tracker"])
+        if hour_cost is None:
+            continue
+        minutes = rec["hours"] * 60 + rec["minutes"]
+        total_cost += minutes * hour_cost / 60
+        total_minutes += minutes
+        billed.append((rec["hours"], rec["minutes"]))
+
+    hours, minutes = split_minutes(total_minutes)
+    return DayCost(round(total_cost, 2), hours, minutes, billed)
+
+
+def period_report(records: Iterable[dict]) -> PeriodReport:
+    """
+    Собирает отчёт за период из строк get_time_worked_by_range,
+    отсортированных по дате (стоимость в строках уже посчитана).
+    """
+    days: List[PeriodDay] = []
+    tracker_minutes: Dict[str, int] = {}
+    project_minutes: Dict[str, int] = {}
+    trackers, projects, minutes_column, costs = [], [], [], []
+    total_cost = 0.0
+
+    day = None
+    for rec in records:
+        if day is None or rec["date"] != day.date_int:
+            day = PeriodDay(rec["date"], 0.0, len(costs), len(costs))
+            days.append(day)
+        minutes = rec["hours"] * 60 + rec["minutes"]
+        project_name = rec.get("project_name") or "—"
+        trackers.append(rec["tracker"])
+        projects.append(project_name)
+        minutes_column.append(minutes)
+        costs.append(rec["cost"])
+        day.end += 1
+        day.cost += rec["cost"]
+        total_cost += rec["cost"]
+        tracker_minutes[rec["tracker"]] = (
+            tracker_minutes.get(rec["tracker"], 0) + minutes
+        )
+        project_minutes[project_name] = project_minutes.get(project_name, 0) + minutes
+
+    return PeriodReport(
+        days,
+        total_cost,
+        tracker_minutes,
+        project_minutes,
+        trackers,
+        projects,
+        minutes_column,
+        costs,
+    )
+
+
+def trim_report(report: PeriodReport, start_int: int, end_int: int) -> PeriodReport:
+    """
+    Оставляет в отчёте дни из [start_int, end_int]; строки отброшенных дней
+    вычитаются из итогов, без пересчёта оставшихся. Трекер или проект
+    остаётся в итогах, пока у него есть строки (как при полном пересчёте,
+    даже если его время 0 минут).
+    """
+    dates = [day.date_int for day in report.days]
+    first, last = bisect_left(dates, start_int), bisect_right(dates, end_int)
+    if first == 0 and last == len(dates):
+        return report
+    kept = report.days[first:last]
+    row_start = kept[0].start if kept else 0
+    row_end = kept[-1].end if kept else 0
+
+    total_cost = report.total_cost
+    tracker_minutes = dict(report.tracker_minutes)
+    project_minutes = dict(report.project_minutes)
+    for row in (*range(row_start), *range(row_end, len(report.costs))):
+        total_cost -= report.costs[row]
+        tracker_minutes[report.trackers[row]] -= report.minutes[row]
+        project_minutes[report.projects[row]] -= report.minutes[row]
+
+    trackers = report.trackers[row_start:row_end]
+    projects = report.projects[row_start:row_end]
+    kept_trackers, kept_projects = set(trackers), set(projects)
+    return PeriodReport(
+        [
+            PeriodDay(
+                day.date_int, day.cost, day.start - row_start, day.end - row_start
+            )
+            for day in kept
+        ],
+        total_cost if kept else 0.0,
+        {
+            name: minutes
+            for name, minutes in tracker_minutes.items()
+            if name in kept_trackers
+        },
+        {
+            name: minutes
+            for name, minutes in project_minutes.items()
+            if name in kept_projects
+        },
+        trackers,
+        projects,
+        report.minutes[row_start:row_end],
+        report.costs[row_start:row_end],
+    )
+
+
+def concat_reports(reports: Sequence[PeriodReport]) -> PeriodReport:
+    """Объединяет отчёты за идущие подряд периоды (по порядку дат), суммируя итоги."""
+    if len(reports) == 1:
+        return reports[0]
+    result = PeriodReport([], 0.0, {}, {}, [], [], [], [])
+    for report in reports:
+        offset = len(result.costs)
+        result.days.extend(
+            PeriodDay(day.date_int, day.cost, day.start + offset, day.end + offset)
+            for day in report.days
+        )
+        result.total_cost += report.total_cost
+        for totals, other in (
+            (result.tracker_minutes, report.tracker_minutes),
+            (result.project_minutes, report.project_minutes),
+        ):
+            for name, minutes in other.items():
+                totals[name] = totals.get(name, 0) + minutes
+        result.trackers.extend(report.trackers)
+        result.projects.extend(report.projects)
+        result.minutes.extend(report.minutes)
+        result.costs.extend(report.costs)
+    return result
+
+
+def shift_report(
+    base: Optional[PeriodReport],
+    base_range: Optional[tuple],
+    start_int: int,
+    end_int: int,
+    load: Callable[[int, int], PeriodReport],
+) -> PeriodReport:
+    """
+    Отчёт за [start_int, end_int] на основе отчёта base за base_range.
+    Если периоды пересекаются, load(start, end) вызывается только для дней,
+    добавленных по краям, а убранные по краям дни вычитаются из итогов.
+    Без base или без пересечения загружается весь период.
+    """
+    if base is None or base_range[1] < start_int or end_int < base_range[0]:
+        return load(start_int, end_int)
+    old_start, old_end = base_range
+    parts = []
+    if start_int < old_start:
+        parts.append(load(start_int, old_start - 1))
+    parts.append(trim_report(base, start_int, end_int))
+    if end_int > old_end:
+        parts.append(load(old_end + 1, end_int))
+    return concat_reports(parts)
+
+
+@dataclass
+class Dashboard:
+    """Суммы для дашборда: по периодам (в порядке времени), проектам и трекерам."""
+
+    periods: List[str]
+    period_minutes: List[int]
+    period_costs: List[float]
+    project_minutes: Dict[str, int]
+    project_costs: Dict[str, float]
+    tracker_minutes: Dict[str, int]
+    tracker_costs: Dict[str, float]
+
+    @property
+    def total_minutes(self) -> int:
+        return sum(self.period_minutes)
+
+    @property
+    def total_cost(self) -> float:
+        return sum(self.period_costs)
+
+
+def dashboard(rows: Iterable[dict]) -> Dashboard:
+    """
+    Собирает дашборд из строк DatabaseManager.get_rollups(),
+    отсортированных по периоду.
+    """
+    result = Dashboard([], [], [], {}, {}, {}, {})
+    for row in rows:
+        if not result.periods or result.periods[-1] != row["period"]:
+            result.periods.append(row["period"])
+            result.period_minutes.append(0)
+            result.period_costs.append(0.0)
+        result.period_minutes[-1] += row["minutes"]
+        result.period_costs[-1] += row["cost"]
+        for minutes, costs, name in (
+            (result.project_minutes, result.project_costs, row["project_name"]),
+            (result.tracker_minutes, result.tracker_costs, row["tracker"]),
+        ):
+            minutes[name] = minutes.get(name, 0) + row["minutes"]
+            costs[name] = costs.get(name, 0.0) + row["cost"]
+    return result
+
+
+def period_report_columns(
+    dates: Sequence[int],
+    trackers: Sequence[str],
+    projects: Sequence[str],
+    minutes: Sequence[int],
+    rates,
+    use_numpy: Optional[bool] = None,
+) -> PeriodReport:
+    """
+    Отчёт за период по колонкам daily_totals (DatabaseManager.get_period_columns).
+    Ставки берутся из RateResolver. С NumPy стоимость, итоги дней, трекеров
+    и проектов считаются над массивами, без NumPy — через period_report().
+
+    :param use_numpy: None — NumPy от NUMPY_MIN_ROWS строк, True — всегда
+        (если установлен), False — никогда
+    """
+    if use_numpy is None:
+        use_numpy = len(dates) >= NUMPY_MIN_ROWS
+    np = numpy_module() if use_numpy and dates else None
+    if np is None:
+        records = (
+            {
+                "date": date_int,
+                "tracker": tracker,
+                "project_name": project_name,
+                "hours": total // 60,
+                "minutes": total % 60,
+                "cost": total * (rates.rate_for(tracker, date_int) or 0) / 60.0,
+            }
+            for date_int, tracker, project_name, total in zip(
+                dates, trackers, projects, minutes
+            )
+        )
+        return period_report(records)
+
+    date_array = np.asarray(dates, dtype=np.int64)
+    minute_array = np.asarray(minutes, dtype=np.int64)
+    tracker_names, tracker_codes = _encode(trackers)
+    project_names_column = [project or "—" for project in projects]
+    project_names, project_codes = _encode(project_names_column)
+
+    # Ставка каждой строки: двоичный поиск по расписанию ставок трекера
+    hour_costs = np.zeros(len(date_array))
+    for code, tracker in enumerate(tracker_names):
+        started_at, costs = rates.schedule(tracker)
+        if not started_at:
+            continue
+        rows = tracker_codes == code
+        index = np.searchsorted(started_at, date_array[rows], side="right") - 1
+        hour_costs[rows] = np.asarray(costs, dtype=np.float64)[np.maximum(index, 0)]
+    cost_array = minute_array * hour_costs / 60.0
+
+    # Строки отсортированы по дате: границы дней и суммы по дням
+    day_starts = np.flatnonzero(np.r_[True, date_array[1:] != date_array[:-1]])
+    day_costs = np.add.reduceat(cost_array, day_starts)
+    tracker_totals = np.bincount(
+        tracker_codes, weights=minute_array, minlength=len(tracker_names)
+    )
+    project_totals = np.bincount(
+        project_codes, weights=minute_array, minlength=len(project_names)
+    )
+
+    bounds = day_starts.tolist() + [len(date_array)]
+    days = list(
+        map(
+            PeriodDay,
+            date_array[day_starts].tolist(),
+            day_costs.tolist(),
+            bounds[:-1],
+            bounds[1:],
+        )
+    )
+    return PeriodReport(
+        days,
+        float(cost_array.sum()),
+        dict(zip(tracker_names, map(int, tracker_totals.tolist()))),
+        dict(zip(project_names, map(int, project_totals.tolist()))),
+        [tracker_names[code] for code in tracker_codes.tolist()],
+        project_names_column,
+        minute_array.tolist(),
+        cost_array.tolist(),
+    )
+
+
+def _encode(values: Sequence[str]) -> tuple:
+    """
+    Strings → (names, codes) with names in order of first appearance,
+    so totals keep the same order as in period_report().
+    """
+    index: Dict[str, int] = {}
+    codes = numpy_module().fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype="int64",
+        count=len(values),
+    )
+    return list(index), codes
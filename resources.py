@@ -0,0 +1,45 @@
+import os
+import sys
+from functools import lru_cache
+from typing import Dict
+
+from PyQt6.QtGui import QIcon, QPixmap
+
+from database import TRACKERS
+
+# Иконки трекеров: {tracker: путь к картинке}; картинка названа как трекер,
+# но со строчной первой буквой (LogWork -> images/logWork.png)
+TRACKER_ICON_PATHS = {
+    tracker: f"images/{tracker[0].lower()}{tracker[1:]}.png" for tracker in TRACKERS
+}
+
+
+@lru_cache(maxsize=None)
+def _base_path() -> str:
+    # PyInstaller creates a temp folder and stores path in _MEIPASS
+    return getattr(sys, "_MEIPASS", os.path.abspath("."))
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    return os.path.join(_base_path(), relative_path)
+
+
+@lru_cache(maxsize=None)
+def icon(relative_path: str) -> QIcon:
+    """
+    Returns a shared QIcon for a resource.
+    The image is loaded on first use and reused afterwards.
+    """
+    return QIcon(pixmap(relative_path))
+
+
+@lru_cache(maxsize=None)
+def pixmap(relative_path: str) -> QPixmap:
+    """Returns a shared QPixmap for a resource, decoded once."""
+    return QPixmap(resource_path(relative_path))
+
+
+def tracker_icons() -> Dict[str, QIcon]:
+    """Icons of all trackers, {tracker: QIcon}."""
+    return {tracker: icon(path) for tracker, path in TRACKER_ICON_PATHS.items()}
@@ -0,0 +1,43 @@
+from database import DatabaseManager
+
+DAY = 1735689600
+
+
+def add_entry(db, minutes):
+    project_id = db.get_all_projects_with_ids()[0]["id"]
+    assert db.save_time_worked(project_id, 0, minutes, "LogWork", DAY)
+
+
+def test_day_cache_sees_other_process_writes(db):
+    db.add_project("Alpha")
+    add_entry(db, 10)
+    assert len(db.get_day_snapshot(DAY).entries) == 1
+
+    # Например, cli.py log из cron при открытом GUI
+    other = DatabaseManager(db.db_path)
+    try:
+        add_entry(other, 20)
+    finally:
+        other.close()
+
+    assert db.peek_day_snapshot(DAY) is None
+    assert len(db.get_day_snapshot(DAY).entries) == 2
+
+
+def test_snapshot_read_during_write_is_not_cached(db, monkeypatch):
+    db.add_project("Alpha")
+    add_entry(db, 10)
+    read_day = db.get_time_worked_by_date
+
+    def read_then_write(date_int):
+        entries = read_day(date_int)
+        # Запись из другого потока, пока снимок ещё не попал в кэш
+        add_entry(db, 20)
+        return entries
+
+    monkeypatch.setattr(db, "get_time_worked_by_date", read_then_write)
+    assert len(db.get_day_snapshot(DAY).entries) == 1
+    monkeypatch.undo()
+
+    assert db.peek_day_snapshot(DAY) is None
+    assert len(db.get_day_snapshot(DAY).entries) == 2
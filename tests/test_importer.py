@@ -0,0 +1,26 @@
+import json
+
+from importer import import_records
+
+
+def write_jsonl(path, records, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+    return str(path)
+
+
+def test_import_after_failed_import(db, tmp_path):
+    record = {"date": "2024-03-01", "project": "Alpha", "tracker": "LogWork"}
+    bad = write_jsonl(tmp_path / "bad.jsonl", [dict(record, hours=1)], "{broken\n")
+    good = write_jsonl(tmp_path / "good.jsonl", [dict(record, hours=2)])
+
+    assert import_records(db, bad) is None
+    # Неудачный импорт откатывается целиком, вместе с новым проектом
+    assert db.get_all_projects_with_ids() == []
+
+    result = import_records(db, good)
+    assert result is not None and result.inserted == 1
+    rows = db.get_connection().execute("SELECT hours FROM time_worked").fetchall()
+    assert rows == [(2,)]
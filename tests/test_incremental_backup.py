@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from contextlib import closing
+
+import pytest
+
+from incremental_backup import (
+    create_incremental_backup,
+    list_backups,
+    prune_backups,
+    restore_backup,
+)
+
+# Пишет в базу в режиме WAL и «падает», не закрыв соединение: -wal остаётся
+CRASH_SCRIPT = """
+import os, sqlite3, sys
+conn = sqlite3.connect(sys.argv[1])
+conn.execute("PRAGMA wal_autocheckpoint = 0")
+conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(2000)])
+conn.commit()
+os._exit(0)
+"""
+
+
+def make_db(path):
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE t (x)")
+        conn.execute("INSERT INTO t VALUES (-1)")
+        conn.commit()
+
+
+def test_restore_over_stale_wal(tmp_path):
+    db_path, store = str(tmp_path / "w.db"), str(tmp_path / "store")
+    make_db(db_path)
+    manifest = create_incremental_backup(db_path, store)
+    subprocess.run([sys.executable, "-c", CRASH_SCRIPT, db_path], check=True)
+    assert (tmp_path / "w.db-wal").stat().st_size > 0
+
+    assert restore_backup(manifest, db_path, store)
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT x FROM t").fetchall() == [(-1,)]
+
+
+def test_restore_refused_while_open(tmp_path):
+    db_path, store = str(tmp_path / "w.db"), str(tmp_path / "store")
+    make_db(db_path)
+    manifest = create_incremental_backup(db_path, store)
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+        assert not restore_backup(manifest, db_path, store)
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+    assert not (tmp_path / "w.db.restore").exists()
+
+
+def test_restore_mixed_codecs(tmp_path):
+    pytest.importorskip("zstandard")
+    db_path, store = str(tmp_path / "w.db"), str(tmp_path / "store")
+    make_db(db_path)
+    create_incremental_backup(db_path, store)
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(5000)])
+        conn.commit()
+    manifest = create_incremental_backup(db_path, store, compression="zstd", level=3)
+
+    objects = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(os.path.join(store, "objects"))
+        for name in names
+    ]
+    heads = set()
+    for path in objects:
+        with open(path, "rb") as f:
+            heads.add(f.read(4) == b"\x28\xb5\x2f\xfd")
+    assert heads == {True, False}
+
+    restored = str(tmp_path / "r.db")
+    assert restore_backup(manifest, restored, store)
+    with closing(sqlite3.connect(restored)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 5001
+
+
+def test_prune_waits_for_running_backup(tmp_path):
+    db_path, store = str(tmp_path / "w.db"), str(tmp_path / "store")
+    make_db(db_path)
+    create_incremental_backup(db_path, store)
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(5000)])
+        conn.commit()
+
+    # Бэкап останавливается, когда блоки записаны, а манифест ещё нет
+    blocks_written, release = threading.Event(), threading.Event()
+
+    def progress(done, total):
+        if done == 100:
+            blocks_written.set()
+            release.wait(10)
+
+    backup = threading.Thread(
+        target=create_incremental_backup, args=(db_path, store, progress)
+    )
+    backup.start()
+    assert blocks_written.wait(10)
+    prune = threading.Thread(target=prune_backups, args=(store, 0, 0, 0))
+    prune.start()
+    prune.join(0.3)
+    assert prune.is_alive()
+    release.set()
+    backup.join(10)
+    prune.join(10)
+
+    manifests = list_backups(store)
+    assert manifests
+    for manifest in manifests:
+        with open(manifest, encoding="utf-8") as f:
+            for digest in json.load(f)["chunks"]:
+                assert os.path.exists(
+                    os.path.join(store, "objects", digest[:2], digest)
+                )
@@ -0,0 +1,11 @@
+import pytest
+
+from benchmark import INDEXED_QUERIES
+
+
+@pytest.mark.parametrize("name", INDEXED_QUERIES)
+def test_hot_query_uses_indexes(db, name):
+    query, params = INDEXED_QUERIES[name]
+    plan = db.get_connection().execute(f"EXPLAIN QUERY PLAN {query}", params)
+    scans = [row[3] for row in plan if row[3].startswith("SCAN ")]
+    assert scans == [], f"{name}: full table scan"
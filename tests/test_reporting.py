@@ -0,0 +1,70 @@
+import random
+from datetime import timedelta
+
+import pytest
+
+from benchmark import build_synthetic_db, day_to_int, reports_match
+from database import TRACKERS, DatabaseManager
+from reporting import period_report, period_report_columns, shift_report
+
+
+@pytest.fixture
+def synthetic_db(tmp_path):
+    """A year of random entries with several rate changes."""
+    db_path = str(tmp_path / "synthetic.db")
+    first_day, last_day = build_synthetic_db(db_path, 1, 4)
+    db = DatabaseManager(db_path)
+    rng = random.Random(7)
+    for _ in range(10):
+        day = first_day + timedelta(days=rng.randint(-30, 365))
+        db.add_billing_record(
+            rng.choice(TRACKERS), day_to_int(day), rng.randint(500, 3000)
+        )
+    yield db, day_to_int(first_day), day_to_int(last_day)
+    db.close()
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_column_report_matches_sql(synthetic_db, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    db, start_int, end_int = synthetic_db
+    reference = period_report(db.get_time_worked_by_range(start_int, end_int))
+    report = period_report_columns(
+        *db.get_period_columns(start_int, end_int),
+        db.get_rates(),
+        use_numpy=use_numpy,
+    )
+    assert reference.days
+    assert reports_match(reference, report)
+
+
+def test_shifted_report_keeps_zero_minute_entries():
+    def record(day, tracker, project, minutes):
+        return {
+            "date": day * 86400,
+            "tracker": tracker,
+            "project_name": project,
+            "hours": 0,
+            "minutes": minutes,
+            "cost": 0.0,
+        }
+
+    records = [
+        record(1, "LogWork", "Alpha", 30),
+        record(1, "Idle", "Timer", 0),
+        record(2, "Idle", "Timer", 0),
+        record(3, "LogWork", "Alpha", 45),
+    ]
+
+    def load(start_int, end_int):
+        return period_report(
+            rec for rec in records if start_int <= rec["date"] <= end_int
+        )
+
+    report, report_range = None, None
+    for start, end in ((1, 3), (2, 3), (3, 3), (2, 3)):
+        period_range = (start * 86400, end * 86400)
+        report = shift_report(report, report_range, *period_range, load)
+        report_range = period_range
+        assert reports_match(load(*period_range), report, ordered=False)
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from benchmark import synthetic_records
+from reporting import day_cost, period_report
+
+pytest.importorskip("pytest_benchmark")
+
+RATES = {"LogWork": 1000, "UpWork": 1500}
+ENTRIES_PER_DAY = 8
+
+# 10M записей занимают несколько гигабайт памяти, поэтому только по запросу:
+# BENCH_10M=1 python -m pytest tests/test_reporting_benchmark.py
+SIZES = [
+    10_000,
+    1_000_000,
+    pytest.param(
+        10_000_000,
+        marks=pytest.mark.skipif(
+            not os.environ.get("BENCH_10M"), reason="set BENCH_10M=1 to run"
+        ),
+    ),
+]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}")
+def records(request):
+    return synthetic_records(request.param, ENTRIES_PER_DAY)
+
+
+def test_day_cost_throughput(benchmark, records):
+    days = [
+        records[i : i + ENTRIES_PER_DAY]
+        for i in range(0, len(records), ENTRIES_PER_DAY)
+    ]
+
+    def all_day_costs():
+        return [day_cost(entries, RATES) for entries in days]
+
+    costs = benchmark.pedantic(all_day_costs, rounds=3)
+    assert len(costs) == len(days)
+    benchmark.extra_info["entries_per_s"] = len(records) / benchmark.stats["min"]
+
+
+def test_period_report_throughput(benchmark, records):
+    report = benchmark.pedantic(period_report, args=(records,), rounds=3)
+    assert len(report.days) == -(-len(records) // ENTRIES_PER_DAY)
+    benchmark.extra_info["entries_per_s"] = len(records) / benchmark.stats["min"]
@@ -0,0 +1,360 @@
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task from its progress callback once it was cancelled."""
+
+
+class _TaskSignals(QObject):
+    # task id, status ("ok" | "error" | "cancelled"), result or error text
+    completed = pyqtSignal(int, str, object)
+    # task id, done, total
+    progress = pyqtSignal(int, int, int)
+
+
+class DbTask(QRunnable):
+    """Одна функция, выполняемая в пуле потоков."""
+
+    def __init__(
+        self,
+        task_id: int,
+        signals: _TaskSignals,
+        func: Callable,
+        args: tuple,
+        kwargs: dict,
+        with_progress: bool,
+    ):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self._signals = signals
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._with_progress = with_progress
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self):
+        status, payload = "cancelled", None
+        try:
+            if not self.is_cancelled():
+                if self._with_progress:
+                    self._kwargs["progress"] = self._report_progress
+                payload = self._func(*self._args, **self._kwargs)
+                status = "cancelled" if self.is_cancelled() else "ok"
+        except TaskCancelled:
+            status = "cancelled"
+        except Exception as e:
+            status, payload = "error", str(e)
+        self._signals.completed.emit(self.task_id, status, payload)
+
+    def _report_progress(self, done: int, total: int):
+        """Progress callback passed to the task function as `progress`."""
+        if self.is_cancelled():
+            raise TaskCancelled()
+        self._signals.progress.emit(self.task_id, done, total)
+
+
+class DbWorker(QObject):
+    """
+    Выполняет запросы к БД вне GUI-потока.
+
+    Результаты возвращаются через сигналы и вызывают колбэки уже в GUI-потоке.
+    Задачи с одинаковым ключом схлопываются: новая задача отменяет
+    предыдущую, так что при быстрой смене даты выполняется только последняя.
+    """
+
+    def __init__(self, parent=None, max_threads: int = 2):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._signals = _TaskSignals()
+        self._signals.completed.connect(self._on_completed)
+        self._signals.progress.connect(self._on_progress)
+        self._ids = itertools.count(1)
+        # {task id: (task, key, on_result, on_error, on_progress)}
+        self._tasks: Dict[int, tuple] = {}
+        # {key: task id} последней задачи с этим ключом
+        self._keys: Dict[str, int] = {}
+
+    def submit(
+        self,
+        func: Callable,
+        *args,
+        key: Optional[str] = None,
+        on_result: Optional[Callable] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Runs func(*args, **kwargs) in the pool and returns the task id.
+        With on_progress the function also receives a `progress(done, total)`
+        callback, which raises TaskCancelled once the task is cancelled.
+        """
+        if key is not None and key in self._keys:
+            self.cancel(self._keys[key])
+
+        task_id = next(self._ids)
+        task = DbTask(
+            task_id, self._signals, func, args, kwargs, on_progress is not None
+        )
+        self._tasks[task_id] = (task, key, on_result, on_error, on_progress)
+        if key is not None:
+            self._keys[key] = task_id
+        self._pool.start(task)
+        return task_id
+
+    def cancel(self, task_id: int):
+        """Cancels a task; a queued task is dropped, a running one is ignored."""
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return
+        task = entry[0]
+        task.cancel()
+        if self._pool.tryTake(task):
+            self._forget(task_id)
+
+    def shutdown(self, msecs: int = 5000):
+        """Cancels everything and waits for running tasks (on app exit)."""
+        for task_id in list(self._tasks):
+            self.cancel(task_id)
+        self._pool.waitForDone(msecs)
+
+    def _forget(self, task_id: int):
+        task, key, *_ = self._tasks.pop(task_id)
+        if key is not None and self._keys.get(key) == task_id:
+            del self._keys[key]
+
+    def _on_completed(self, task_id: int, status: str, payload):
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return
+        task, key, on_result, on_error, on_progress = entry
+        self._forget(task_id)
+        if task.is_cancelled():
+            # Cancelled after the result was already queued
+            return
+        if status == "ok" and on_result is not None:
+            on_result(payload)
+        elif status == "error":
+            print(f"Background task error: {payload}")
+            if on_error is not None:
+                on_error(payload)
+
+    def _on_progress(self, task_id: int, done: int, total: int):
+        entry = self._tasks.get(task_id)
+        if entry is None or entry[0].is_cancelled():
+            return
+        on_progress = entry[4]
+        if on_progress is not None:
+            on_progress(done, total)
+
+
+class BackupScheduler(QObject):
+    """
+    Автоматические резервные копии в фоне.
+
+    Бэкап запускается, когда прошло interval_minutes или накопилось
+    every_n_writes записей с прошлого бэкапа. Если база не менялась
+    (счётчик записей и PRAGMA data_version те же), запуск пропускается.
+    Сжатие выполняется в пуле DbWorker, а не в GUI-потоке.
+    """
+
+    CHECK_INTERVAL_MS = 30_000
+
+    # путь к архиву или None при ошибке
+    finished = pyqtSignal(object)
+
+    def __init__(
+        self,
+        db,
+        worker: DbWorker,
+        backup_func: Callable,
+        interval_minutes: int = 60,
+        every_n_writes: int = 50,
+        parent=None,
+        **backup_kwargs,
+    ):
+        super().__init__(parent)
+        self._db = db
+        self._worker = worker
+        self._backup_func = backup_func
+        self._backup_kwargs = backup_kwargs
+        self._interval = interval_minutes * 60
+        self._every_n_writes = every_n_writes
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.check)
+        self._task_id: Optional[int] = None
+        # Состояние базы на момент последнего бэкапа (или запуска)
+        self._last_run = time.monotonic()
+        self._last_marker = self._marker()
+
+    def start(self):
+        self._timer.start(self.CHECK_INTERVAL_MS)
+
+    def stop(self):
+        self._timer.stop()
+        if self._task_id is not None:
+            self._worker.cancel(self._task_id)
+            self._task_id = None
+
+    def check(self):
+        """Starts a backup if one is due and the database has changed."""
+        if self._task_id is not None:
+            # Предыдущий бэкап ещё выполняется
+            return
+        writes = self._db.change_count - self._last_marker[0]
+        elapsed = time.monotonic() - self._last_run
+        if writes < self._every_n_writes and elapsed < self._interval:
+            return
+        marker = self._marker()
+        if marker == self._last_marker:
+            self._last_run = time.monotonic()
+            return
+        self.run_now(marker)
+
+    def run_now(self, marker: Optional[tuple] = None):
+        """Starts a backup immediately, even if nothing changed."""
+        if self._task_id is not None:
+            return
+        marker = marker or self._marker()
+        self._task_id = self._worker.submit(
+            self._backup_func,
+            self._db.db_path,
+            on_result=lambda path: self._on_done(marker, path),
+            on_error=lambda error: self._on_done(None, None),
+            **self._backup_kwargs,
+        )
+
+    def _marker(self) -> tuple:
+        return self._db.change_marker()
+
+    def _on_done(self, marker: Optional[tuple], archive_path):
+        self._task_id = None
+        self._last_run = time.monotonic()
+        if archive_path:
+            self._last_marker = marker
+        self.finished.emit(archive_path)
+
+
+class RunningTimer(QObject):
+    """
+    Таймер работы над проектом: время копится в строке time_worked.
+
+    Тик раз в секунду только сообщает прошедшее время (для подписей),
+    в базу пишется не чаще раза в CHECKPOINT_SECONDS и только если
+    набралась новая минута — одна UPDATE. Запущенный таймер хранится
+    в таблице running_timer, restore() продолжает его после перезапуска
+    или сбоя; теряется не больше одного интервала.
+    """
+
+    TICK_MS = 1000
+    CHECKPOINT_SECONDS = 60
+
+    # секунды с запуска
+    ticked = pyqtSignal(int)
+    # таймер (dict из DatabaseManager) при запуске и остановке
+    started = pyqtSignal(dict)
+    stopped = pyqtSignal(dict)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self._db = db
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self.timer: Optional[dict] = None
+        self._saved_minutes = 0
+        self._saved_at = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self.timer is not None
+
+    def elapsed(self) -> int:
+        """Seconds since the timer was started (or resumed)."""
+        if self.timer is None:
+            return 0
+        return max(int(time.time()) - self.timer["started_at"], 0)
+
+    def elapsed_minutes(self) -> int:
+        """
+        Elapsed time rounded to the nearest minute: truncating would drop
+        the last partial minute of every session.
+        """
+        return (self.elapsed() + 30) // 60
+
+    def total_minutes(self) -> int:
+        """Current time of the timer's entry, including unsaved minutes."""
+        if self.timer is None:
+            return 0
+        return self.timer["base_minutes"] + self.elapsed_minutes()
+
+    def restore(self) -> bool:
+        """Continues a timer left running by the previous session."""
+        return self._run(self._db.resume_timer(int(time.time())))
+
+    def start(self, project_id: int, tracker: str, date_int: int) -> bool:
+        if self.timer is not None:
+            self.stop()
+        return self._run(
+            self._db.start_timer(project_id, tracker, date_int, int(time.time()))
+        )
+
+    def rebase(self) -> bool:
+        """Restarts counting from the entry's saved time (after it was edited)."""
+        if self.timer is None:
+            return False
+        self._timer.stop()
+        return self._run(self._db.resume_timer(int(time.time())))
+
+    def stop(self) -> bool:
+        if self.timer is None:
+            return False
+        timer = self.timer
+        if not self._db.stop_timer(timer, self.elapsed_minutes()):
+            return False
+        self._timer.stop()
+        self.timer = None
+        self.stopped.emit(timer)
+        return True
+
+    def checkpoint(self) -> bool:
+        """Saves unsaved minutes now (e.g. on exit); the timer keeps running."""
+        if self.timer is None:
+            return False
+        minutes = self.elapsed_minutes()
+        if minutes == self._saved_minutes:
+            return True
+        if not self._db.checkpoint_timer(self.timer, minutes):
+            return False
+        self._saved_minutes = minutes
+        self._saved_at = time.monotonic()
+        return True
+
+    def _run(self, timer: Optional[dict]) -> bool:
+        if timer is None:
+            return False
+        self.timer = timer
+        self._saved_minutes = 0
+        self._saved_at = time.monotonic()
+        self._timer.start(self.TICK_MS)
+        self.started.emit(timer)
+        return True
+
+    def _tick(self):
+        elapsed = self.elapsed()
+        self.ticked.emit(elapsed)
+        if time.monotonic() - self._saved_at >= self.CHECKPOINT_SECONDS:
+            self.checkpoint()